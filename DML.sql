@@ -1,10 +1,10 @@
 USE veterinaria;
 INSERT INTO usuarios (nombre, email, password, rol, telefono) VALUES 
-('Dr. Juan Pérez', 'juan.perez@vetclinic.com', '$2y$10$92IXUNpkjO0rOQ5byMi.Ye4oKoEa3Ro9llC/.og/at2.uheWG/igi', 'admin', '3874-123456'),
-('Dra. María González', 'maria.gonzalez@vetclinic.com', '$2y$10$92IXUNpkjO0rOQ5byMi.Ye4oKoEa3Ro9llC/.og/at2.uheWG/igi', 'veterinario', '3874-234567'),
-('Dr. Carlos Rodríguez', 'carlos.rodriguez@vetclinic.com', '$2y$10$92IXUNpkjO0rOQ5byMi.Ye4oKoEa3Ro9llC/.og/at2.uheWG/igi', 'veterinario', '3874-345678'),
-('Ana Martínez', 'ana.martinez@vetclinic.com', '$2y$10$92IXUNpkjO0rOQ5byMi.Ye4oKoEa3Ro9llC/.og/at2.uheWG/igi', 'recepcionista', '3874-456789'),
-('Laura Fernández', 'laura.fernandez@vetclinic.com', '$2y$10$92IXUNpkjO0rOQ5byMi.Ye4oKoEa3Ro9llC/.og/at2.uheWG/igi', 'recepcionista', '3874-567890');
+('Dr. Juan Pérez', 'juan.perez@vetclinic.com', 'bcrypt_php$$2y$10$92IXUNpkjO0rOQ5byMi.Ye4oKoEa3Ro9llC/.og/at2.uheWG/igi', 'admin', '3874-123456'),
+('Dra. María González', 'maria.gonzalez@vetclinic.com', 'bcrypt_php$$2y$10$92IXUNpkjO0rOQ5byMi.Ye4oKoEa3Ro9llC/.og/at2.uheWG/igi', 'veterinario', '3874-234567'),
+('Dr. Carlos Rodríguez', 'carlos.rodriguez@vetclinic.com', 'bcrypt_php$$2y$10$92IXUNpkjO0rOQ5byMi.Ye4oKoEa3Ro9llC/.og/at2.uheWG/igi', 'veterinario', '3874-345678'),
+('Ana Martínez', 'ana.martinez@vetclinic.com', 'bcrypt_php$$2y$10$92IXUNpkjO0rOQ5byMi.Ye4oKoEa3Ro9llC/.og/at2.uheWG/igi', 'recepcionista', '3874-456789'),
+('Laura Fernández', 'laura.fernandez@vetclinic.com', 'bcrypt_php$$2y$10$92IXUNpkjO0rOQ5byMi.Ye4oKoEa3Ro9llC/.og/at2.uheWG/igi', 'recepcionista', '3874-567890');
 
 INSERT INTO clientes (nombre, apellido, dni, email, telefono, direccion) VALUES 
 ('Roberto', 'López', '25123456', 'roberto.lopez@gmail.com', '3874-111222', 'Av. Belgrano 123, Salta Capital'),
@@ -4,8 +4,9 @@ Configuración del Django Admin para Sistema Veterinaria
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db.models import Count
 from django.utils.html import format_html
-from .models import Usuario, Cliente, Mascota, Cita, Consulta, Vacuna
+from .models import Usuario, Cliente, Mascota, Cita, Consulta, Vacuna, RecordatorioVacuna, EstadoVacunacion
 
 
 # =============================================
@@ -68,11 +69,15 @@ class ClienteAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        """Anota el total de mascotas para no consultar por cada fila"""
+        return super().get_queryset(request).annotate(_total_mascotas=Count('mascotas'))
+    
     def total_mascotas(self, obj):
         """Cuenta las mascotas del cliente"""
-        count = obj.mascotas.count()
-        return format_html('<strong>{}</strong>', count)
+        return format_html('<strong>{}</strong>', obj._total_mascotas)
     total_mascotas.short_description = 'Mascotas'
+    total_mascotas.admin_order_field = '_total_mascotas'
 
 
 # =============================================
@@ -234,6 +239,12 @@ class VacunaAdmin(admin.ModelAdmin):
     readonly_fields = ['fecha_registro']
     autocomplete_fields = ['mascota']
     
+    def save_model(self, request, obj, form, change):
+        if change:
+            # Para recalcular también el estado de vacunación de la mascota anterior
+            obj._mascota_id_original = form.initial.get('mascota')
+        super().save_model(request, obj, form, change)
+    
     def estado_dosis(self, obj):
         """Muestra el estado de la próxima dosis"""
         if obj.proxima_dosis:
@@ -245,6 +256,47 @@ class VacunaAdmin(admin.ModelAdmin):
     estado_dosis.short_description = 'Estado'
 
 
+# =============================================
+# ADMIN: RECORDATORIO DE VACUNA
+# =============================================
+
+@admin.register(RecordatorioVacuna)
+class RecordatorioVacunaAdmin(admin.ModelAdmin):
+    """Admin para la cola de recordatorios de vacunas"""
+    
+    list_display = ['proxima_dosis', 'vacuna', 'cliente', 'estado', 'intentos', 'fecha_envio']
+    list_filter = ['estado', 'proxima_dosis']
+    search_fields = ['cliente__nombre', 'cliente__apellido', 'vacuna__nombre_vacuna']
+    ordering = ['proxima_dosis']
+    date_hierarchy = 'proxima_dosis'
+    list_select_related = ['vacuna__mascota', 'cliente']
+    readonly_fields = ['fecha_creacion', 'fecha_envio', 'intentos', 'error']
+    raw_id_fields = ['vacuna', 'cliente']
+
+
+# =============================================
+# ADMIN: ESTADO DE VACUNACIÓN
+# =============================================
+
+@admin.register(EstadoVacunacion)
+class EstadoVacunacionAdmin(admin.ModelAdmin):
+    """Admin de solo lectura para el estado de vacunación precalculado"""
+    
+    list_display = ['mascota', 'tipo_vacuna', 'fecha_aplicacion', 'proxima_dosis', 'estado_dosis']
+    list_filter = ['mascota__especie', 'proxima_dosis']
+    search_fields = ['tipo_vacuna', 'mascota__nombre']
+    ordering = ['proxima_dosis']
+    list_select_related = ['mascota']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    estado_dosis = VacunaAdmin.estado_dosis
+
+
 # Configuración del Admin Site
 admin.site.site_header = "Administración Veterinaria"
 admin.site.site_title = "Veterinaria Admin"
@@ -0,0 +1,259 @@
+"""
+Agenda de veterinarios: cálculo de turnos libres
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .filters import inicio_del_dia
+from .models import Usuario, Cita
+
+
+# =============================================
+# CONFIGURACIÓN DE LA AGENDA
+# =============================================
+
+# Horario de atención (hora local) y días laborales (0 = lunes)
+AGENDA_HORA_INICIO = getattr(settings, 'AGENDA_HORA_INICIO', time(9, 0))
+AGENDA_HORA_FIN = getattr(settings, 'AGENDA_HORA_FIN', time(18, 0))
+AGENDA_DIAS_LABORALES = getattr(settings, 'AGENDA_DIAS_LABORALES', [0, 1, 2, 3, 4, 5])
+
+# Los turnos empiezan en múltiplos de este intervalo (09:00, 09:15, ...)
+AGENDA_INTERVALO_MINUTOS = getattr(settings, 'AGENDA_INTERVALO_MINUTOS', 15)
+
+# Cuánto antes del rango se buscan citas que puedan seguir en curso
+AGENDA_DURACION_MAXIMA = timedelta(minutes=getattr(settings, 'AGENDA_DURACION_MAXIMA_MINUTOS', 480))
+
+ESTADOS_QUE_OCUPAN = ['pendiente', 'confirmada', 'en_curso', 'completada']
+
+
+# =============================================
+# INTERVALOS
+# =============================================
+
+def fusionar_intervalos(intervalos):
+    """
+    Fusiona intervalos [inicio, fin) ordenados por inicio.
+    Los que se superponen o se tocan quedan como uno solo.
+    """
+    fusionados = []
+    for inicio, fin in intervalos:
+        if fusionados and inicio <= fusionados[-1][1]:
+            if fin > fusionados[-1][1]:
+                fusionados[-1][1] = fin
+        else:
+            fusionados.append([inicio, fin])
+    return [(inicio, fin) for inicio, fin in fusionados]
+
+
+def huecos(ventana_inicio, ventana_fin, ocupados):
+    """Intervalos libres de la ventana, dados los ocupados ya fusionados"""
+    libres = []
+    cursor = ventana_inicio
+    for inicio, fin in ocupados:
+        if fin <= cursor:
+            continue
+        if inicio >= ventana_fin:
+            break
+        if inicio > cursor:
+            libres.append((cursor, inicio))
+        cursor = max(cursor, fin)
+    if cursor < ventana_fin:
+        libres.append((cursor, ventana_fin))
+    return libres
+
+
+def _alinear(momento, intervalo):
+    """Redondea hacia arriba al próximo múltiplo del intervalo"""
+    local = timezone.localtime(momento)
+    minutos = local.hour * 60 + local.minute
+    resto = minutos % intervalo
+    if resto == 0 and local.second == 0 and local.microsecond == 0:
+        return momento
+    return momento.replace(second=0, microsecond=0) + timedelta(minutes=intervalo - resto)
+
+
+def turnos(libres, duracion, intervalo=AGENDA_INTERVALO_MINUTOS):
+    """Parte los intervalos libres en turnos consecutivos de `duracion`"""
+    resultado = []
+    for inicio, fin in libres:
+        actual = _alinear(inicio, intervalo)
+        while actual + duracion <= fin:
+            resultado.append((actual, actual + duracion))
+            actual += duracion
+    return resultado
+
+
+def ventanas_de_atencion(desde, hasta):
+    """Ventanas de atención [apertura, cierre) de cada día laboral en [desde, hasta)"""
+    dia = desde
+    while dia < hasta:
+        if dia.weekday() in AGENDA_DIAS_LABORALES:
+            yield (
+                timezone.make_aware(datetime.combine(dia, AGENDA_HORA_INICIO)),
+                timezone.make_aware(datetime.combine(dia, AGENDA_HORA_FIN)),
+            )
+        dia += timedelta(days=1)
+
+
+# =============================================
+# DISPONIBILIDAD
+# =============================================
+
+def ocupacion_por_veterinario(veterinario_ids, inicio, fin):
+    """
+    Intervalos ocupados y fusionados de cada veterinario entre inicio y fin.
+    Es una sola consulta por rango sobre el índice (veterinario, fecha_hora).
+    """
+    citas = Cita.objects.filter(
+        veterinario_id__in=veterinario_ids,
+        fecha_hora__gte=inicio - AGENDA_DURACION_MAXIMA,
+        fecha_hora__lt=fin,
+        estado__in=ESTADOS_QUE_OCUPAN,
+    ).order_by('veterinario_id', 'fecha_hora').values_list(
+        'veterinario_id', 'fecha_hora', 'duracion_minutos'
+    )
+
+    ocupados = {vet_id: [] for vet_id in veterinario_ids}
+    for vet_id, fecha_hora, duracion in citas:
+        ocupados[vet_id].append((fecha_hora, fecha_hora + timedelta(minutes=duracion)))
+    return {vet_id: fusionar_intervalos(intervalos) for vet_id, intervalos in ocupados.items()}
+
+
+def calcular_disponibilidad(veterinarios, desde, hasta, duracion_minutos):
+    """
+    Turnos libres de cada veterinario entre las fechas desde (inclusive)
+    y hasta (exclusive). No se ofrecen turnos que ya empezaron.
+    """
+    duracion = timedelta(minutes=duracion_minutos)
+    ahora = timezone.now()
+    ventanas = [
+        (max(apertura, ahora), cierre)
+        for apertura, cierre in ventanas_de_atencion(desde, hasta)
+        if cierre > ahora
+    ]
+
+    ocupados = ocupacion_por_veterinario(
+        [vet.id for vet in veterinarios], inicio_del_dia(desde), inicio_del_dia(hasta)
+    )
+
+    resultado = []
+    for vet in veterinarios:
+        libres = []
+        for apertura, cierre in ventanas:
+            libres.extend(turnos(huecos(apertura, cierre, ocupados[vet.id]), duracion))
+        resultado.append({
+            'veterinario': vet.id,
+            'veterinario_nombre': vet.nombre,
+            'turnos': [
+                {'inicio': timezone.localtime(inicio), 'fin': timezone.localtime(fin)}
+                for inicio, fin in libres
+            ],
+        })
+    return resultado
+
+
+# =============================================
+# SUPERPOSICIÓN DE CITAS
+# =============================================
+
+class TurnoOcupado(APIException):
+    """La cita se superpone con otra del mismo veterinario (HTTP 409)"""
+    status_code = status.HTTP_409_CONFLICT
+    default_code = 'turno_ocupado'
+
+    def __init__(self, cita, conflicto):
+        inicio = timezone.localtime(conflicto[0])
+        fin = timezone.localtime(conflicto[1])
+        self.mensaje = (
+            f'El veterinario ya tiene una cita de {inicio:%d/%m/%Y %H:%M} a {fin:%H:%M}'
+        )
+        detalle = {'error': self.mensaje, 'fecha_hora': timezone.localtime(cita.fecha_hora).isoformat()}
+        if conflicto[2] is not None:
+            detalle['cita_superpuesta'] = conflicto[2]
+        super().__init__(detalle)
+
+
+@contextmanager
+def agenda_bloqueada(veterinario_ids):
+    """
+    Abre una transacción y bloquea (SELECT ... FOR UPDATE) la fila de cada
+    veterinario involucrado. Dos reservas del mismo veterinario se ejecutan
+    una después de la otra; las de veterinarios distintos no se esperan.
+    Los ids se bloquean en orden para evitar deadlocks.
+    """
+    with transaction.atomic():
+        list(
+            Usuario.objects.select_for_update()
+            .filter(pk__in=set(veterinario_ids))
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        yield
+
+
+def validar_duracion(minutos):
+    """Mensaje de error si la duración no sirve para la agenda, o None"""
+    if minutos <= 0:
+        return 'La duración debe ser mayor que cero.'
+    if timedelta(minutes=minutos) > AGENDA_DURACION_MAXIMA:
+        return f'La duración no puede superar los {AGENDA_DURACION_MAXIMA.total_seconds() // 60:.0f} minutos.'
+    return None
+
+
+def _intervalo(cita):
+    return cita.fecha_hora, cita.fecha_hora + timedelta(minutes=cita.duracion_minutos)
+
+
+def verificar_turnos(citas):
+    """
+    Verifica que las citas (nuevas o modificadas, sin guardar) no se superpongan
+    entre sí ni con las existentes. Hace una consulta por rango sobre el índice
+    (veterinario, fecha_hora) por veterinario. Lanza TurnoOcupado.
+
+    Debe llamarse dentro de agenda_bloqueada() para que no haya carreras.
+    """
+    por_veterinario = {}
+    for cita in citas:
+        if cita.estado in ESTADOS_QUE_OCUPAN:
+            por_veterinario.setdefault(cita.veterinario_id, []).append(cita)
+
+    for vet_id, nuevas in por_veterinario.items():
+        intervalos_nuevos = [_intervalo(cita) for cita in nuevas]
+        inicio = min(i for i, _ in intervalos_nuevos)
+        fin = max(f for _, f in intervalos_nuevos)
+        excluir = [cita.pk for cita in nuevas if cita.pk is not None]
+
+        existentes = Cita.objects.filter(
+            veterinario_id=vet_id,
+            fecha_hora__gte=inicio - AGENDA_DURACION_MAXIMA,
+            fecha_hora__lt=fin,
+            estado__in=ESTADOS_QUE_OCUPAN,
+        ).exclude(pk__in=excluir).values_list('pk', 'fecha_hora', 'duracion_minutos')
+
+        # (inicio, fin, pk, cita nueva o None), barrido ordenado por inicio
+        eventos = [
+            (fecha_hora, fecha_hora + timedelta(minutes=duracion), pk, None)
+            for pk, fecha_hora, duracion in existentes
+        ]
+        eventos += [(i, f, cita.pk, cita) for (i, f), cita in zip(intervalos_nuevos, nuevas)]
+        eventos.sort(key=lambda evento: evento[0])
+
+        # Fin máximo visto entre todas las citas y entre las nuevas
+        fin_todas = fin_nuevas = None
+        for evento in eventos:
+            inicio_evento, fin_evento, _, cita = evento
+            if cita is not None and fin_todas and inicio_evento < fin_todas[1]:
+                raise TurnoOcupado(cita, fin_todas)
+            if cita is None and fin_nuevas and inicio_evento < fin_nuevas[1]:
+                raise TurnoOcupado(fin_nuevas[3], evento)
+            if fin_todas is None or fin_evento > fin_todas[1]:
+                fin_todas = evento
+            if cita is not None and (fin_nuevas is None or fin_evento > fin_nuevas[1]):
+                fin_nuevas = evento
@@ -1,5 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from rest_framework_simplejwt.views import TokenRefreshView
 
 from .views import (
     UsuarioViewSet, ClienteViewSet, MascotaViewSet,
@@ -19,6 +20,7 @@ urlpatterns = [
     # Endpoints de autenticación API (JWT)
     path('login/', api_login, name='api_login'),
     path('logout/', api_logout, name='api_logout'),
+    path('token/refresh/', TokenRefreshView.as_view(), name='api_token_refresh'),
     path('me/', api_me, name='api_me'),
 
     # Todos los CRUD REST automáticos
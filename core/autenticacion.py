@@ -0,0 +1,167 @@
+"""
+Autenticación JWT con el usuario cacheado
+
+JWTAuthentication hace un SELECT a usuarios en cada request. Acá el
+usuario se busca primero en una cache LRU del proceso, después en una
+cache compartida opcional (AUTH_USUARIO_CACHE_COMPARTIDA, el alias de una
+entrada de CACHES) y recién entonces en la base. Las señales de Usuario
+borran la entrada al guardar o eliminar; en los otros procesos la copia
+local dura como mucho AUTH_USUARIO_CACHE_TTL segundos.
+
+Los tokens llevan además rol, estado, nombre y email como claims firmados.
+Un token emitido para un usuario desactivado se rechaza sin consultar la
+base, y con JWT_USUARIO_DESDE_CLAIMS el usuario se arma desde el token
+cuando no está en cache. Esto último implica que un cambio de rol o una
+desactivación tarda hasta el vencimiento del access token en aplicarse,
+por eso viene apagado.
+
+El refresh (RefreshRotativoSerializer) usa la misma cache y la lista negra
+en memoria de core/lista_negra.py.
+"""
+
+import copy
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache_local import CacheLRU
+from .lista_negra import RefreshTokenRotativo
+from .models import Usuario
+
+
+AUTH_USUARIO_CACHE_TTL = getattr(settings, 'AUTH_USUARIO_CACHE_TTL', 30)
+AUTH_USUARIO_CACHE_COMPARTIDA = getattr(settings, 'AUTH_USUARIO_CACHE_COMPARTIDA', None)
+AUTH_USUARIO_CACHE_COMPARTIDA_TTL = getattr(settings, 'AUTH_USUARIO_CACHE_COMPARTIDA_TTL', 300)
+JWT_USUARIO_DESDE_CLAIMS = getattr(settings, 'JWT_USUARIO_DESDE_CLAIMS', False)
+
+USUARIO_CACHE_KEY = 'auth:usuario:{}'
+
+CLAIMS_USUARIO = ['rol', 'estado', 'nombre', 'email']
+
+cache_usuarios = CacheLRU(maximo=getattr(settings, 'AUTH_USUARIO_CACHE_MAXIMO', 1024), ttl=AUTH_USUARIO_CACHE_TTL)
+
+
+# =============================================
+# TOKENS
+# =============================================
+
+def tokens_para_usuario(usuario):
+    """RefreshToken con los datos del usuario como claims (el access los hereda)"""
+    refresh = RefreshTokenRotativo.for_user(usuario)
+    for claim in CLAIMS_USUARIO:
+        refresh[claim] = getattr(usuario, claim)
+    return refresh
+
+
+# =============================================
+# CACHE DE USUARIOS
+# =============================================
+
+def _clave(user_id):
+    # El claim puede venir como texto ("7") y el pk como entero
+    return ('usuario', str(user_id))
+
+
+def _cache_compartida():
+    return caches[AUTH_USUARIO_CACHE_COMPARTIDA] if AUTH_USUARIO_CACHE_COMPARTIDA else None
+
+
+def usuario_cacheado(user_id):
+    usuario = cache_usuarios.get(_clave(user_id))
+    if usuario is None and (compartida := _cache_compartida()) is not None:
+        usuario = compartida.get(USUARIO_CACHE_KEY.format(user_id))
+        if usuario is not None:
+            cache_usuarios.set(_clave(user_id), usuario)
+    return usuario
+
+
+def cachear_usuario(usuario):
+    cache_usuarios.set(_clave(usuario.pk), usuario)
+    if (compartida := _cache_compartida()) is not None:
+        compartida.set(USUARIO_CACHE_KEY.format(usuario.pk), usuario, AUTH_USUARIO_CACHE_COMPARTIDA_TTL)
+
+
+def invalidar_usuario(user_id):
+    cache_usuarios.borrar(_clave(user_id))
+    if (compartida := _cache_compartida()) is not None:
+        compartida.delete(USUARIO_CACHE_KEY.format(user_id))
+
+
+# =============================================
+# AUTHENTICATION CLASS
+# =============================================
+
+class UsuarioCacheadoJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication que resuelve el usuario sin consultar la base en el caso común"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        if validated_token.get('estado') is False:
+            raise AuthenticationFailed('Usuario desactivado', code='user_inactive')
+
+        usuario = usuario_cacheado(user_id)
+        if usuario is None and JWT_USUARIO_DESDE_CLAIMS and all(c in validated_token for c in CLAIMS_USUARIO):
+            usuario = self.usuario_desde_claims(user_id, validated_token)
+        if usuario is None:
+            usuario = super().get_user(validated_token)
+            cachear_usuario(usuario)
+
+        self.verificar(usuario, validated_token)
+        # Copia: la instancia cacheada se comparte entre requests
+        return copy.copy(usuario)
+
+    def usuario_desde_claims(self, user_id, validated_token):
+        """Usuario armado con los claims del token; no tiene teléfono ni fechas"""
+        usuario = Usuario(
+            id=Usuario._meta.pk.to_python(user_id),
+            is_active=True,
+            **{claim: validated_token[claim] for claim in CLAIMS_USUARIO}
+        )
+        usuario._state.adding = False
+        usuario.desde_token = True
+        return usuario
+
+    def verificar(self, usuario, validated_token):
+        """Los mismos controles de JWTAuthentication.get_user, más el estado propio de Usuario"""
+        if api_settings.CHECK_USER_IS_ACTIVE and not usuario.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if not usuario.estado:
+            raise AuthenticationFailed('Usuario desactivado', code='user_inactive')
+        if getattr(api_settings, 'CHECK_REVOKE_TOKEN', False) and not getattr(usuario, 'desde_token', False):
+            from rest_framework_simplejwt.utils import get_md5_hash_password
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(usuario.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+
+
+# =============================================
+# REFRESH
+# =============================================
+
+class RefreshRotativoSerializer(TokenRefreshSerializer):
+    """
+    Refresh con el usuario cacheado y la lista negra en memoria. Los claims
+    del usuario se actualizan en cada rotación.
+    """
+    token_class = RefreshTokenRotativo
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        usuario = UsuarioCacheadoJWTAuthentication().get_user(refresh)
+        if not getattr(usuario, 'desde_token', False):
+            for claim in CLAIMS_USUARIO:
+                refresh[claim] = getattr(usuario, claim)
+
+        data = {'access': str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh.rotar()
+            data['refresh'] = str(refresh)
+        return data
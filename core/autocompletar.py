@@ -0,0 +1,93 @@
+"""
+Autocompletado de clientes, mascotas y veterinarios para los formularios
+"""
+
+from django.conf import settings
+
+from .busqueda import buscar, normalizar
+from .cache_local import CacheLRU
+from .models import Usuario, Cliente, Mascota
+
+
+AUTOCOMPLETAR_LIMITE = 10
+AUTOCOMPLETAR_LIMITE_MAXIMO = 50
+
+# Letras que debe tener el término más largo para buscar clientes o
+# mascotas: un prefijo de una letra coincide con buena parte del índice
+AUTOCOMPLETAR_MINIMO = getattr(settings, 'AUTOCOMPLETAR_MINIMO', 2)
+
+
+# Cache de los prefijos más pedidos ('go', 'gon', 'gonz'...)
+cache_autocompletar = CacheLRU(
+    maximo=getattr(settings, 'AUTOCOMPLETAR_CACHE_MAXIMO', 512),
+    ttl=getattr(settings, 'AUTOCOMPLETAR_CACHE_TTL', 60),
+)
+
+
+# =============================================
+# OPCIONES POR TIPO
+# =============================================
+
+def _clientes(texto, limite):
+    ids = buscar('cliente', texto, limite * 2)
+    filas = Cliente.objects.filter(pk__in=ids, estado=True).values_list(
+        'pk', 'nombre', 'apellido', 'dni'
+    ) if ids else []
+    por_id = {fila[0]: fila for fila in filas}
+    opciones = []
+    for pk in ids:
+        if pk in por_id:
+            _, nombre, apellido, dni = por_id[pk]
+            opciones.append({'id': pk, 'texto': f"{nombre} {apellido}" + (f" ({dni})" if dni else '')})
+    return opciones[:limite]
+
+
+def _mascotas(texto, limite):
+    ids = buscar('mascota', texto, limite * 2)
+    filas = Mascota.objects.filter(pk__in=ids, estado='activo').values_list(
+        'pk', 'nombre', 'cliente__nombre', 'cliente__apellido'
+    ) if ids else []
+    por_id = {fila[0]: fila for fila in filas}
+    opciones = []
+    for pk in ids:
+        if pk in por_id:
+            _, nombre, nombre_dueno, apellido_dueno = por_id[pk]
+            opciones.append({'id': pk, 'texto': f"{nombre} - {nombre_dueno} {apellido_dueno}"})
+    return opciones[:limite]
+
+
+def _veterinarios(texto, limite):
+    """Son pocos: se filtra en memoria sobre los activos, sin importar acentos"""
+    terminos = normalizar(texto).split()
+    veterinarios = Usuario.objects.filter(
+        rol='veterinario', estado=True, is_active=True
+    ).order_by('nombre').values_list('pk', 'nombre')
+    opciones = []
+    for pk, nombre in veterinarios:
+        palabras = normalizar(nombre).split()
+        if all(any(p.startswith(t) for p in palabras) for t in terminos):
+            opciones.append({'id': pk, 'texto': nombre})
+            if len(opciones) == limite:
+                break
+    return opciones
+
+
+TIPOS = {
+    'clientes': _clientes,
+    'mascotas': _mascotas,
+    'veterinarios': _veterinarios,
+}
+
+
+def autocompletar(tipo, texto, limite=AUTOCOMPLETAR_LIMITE):
+    """Hasta `limite` opciones {'id', 'texto'} que coinciden con el texto"""
+    texto = ' '.join(normalizar(texto).split())
+    if tipo != 'veterinarios' and max(map(len, texto.split()), default=0) < AUTOCOMPLETAR_MINIMO:
+        return []
+
+    clave = (tipo, texto, limite)
+    opciones = cache_autocompletar.get(clave)
+    if opciones is None:
+        opciones = TIPOS[tipo](texto, limite)
+        cache_autocompletar.set(clave, opciones)
+    return opciones
@@ -0,0 +1,88 @@
+"""
+Backend MySQL con pool de conexiones por proceso
+
+Igual que django.db.backends.mysql, pero con OPTIONS['pool'] las conexiones
+se toman de un PoolConexiones (core/conexiones.py) en lugar de abrirse, y
+close() las devuelve. Como con el pool de PostgreSQL de Django, requiere
+CONN_MAX_AGE = 0: Django "cierra" la conexión al terminar cada request y
+el pool la conserva abierta.
+
+    'OPTIONS': {
+        'pool': {'max_size': 10, 'timeout': 10, 'max_lifetime': 3600},
+    }
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.mysql import base as mysql
+from django.utils.asyncio import async_unsafe
+
+from core.conexiones import PoolConexiones, metricas
+
+
+class DatabaseWrapper(mysql.DatabaseWrapper):
+    _pools = {}
+    _reutilizada = False
+
+    @property
+    def pool(self):
+        opciones = self.settings_dict['OPTIONS'].get('pool')
+        if not opciones:
+            return None
+        if self.alias not in self._pools:
+            if self.settings_dict.get('CONN_MAX_AGE', 0) != 0:
+                raise ImproperlyConfigured('El pool de conexiones no admite conexiones persistentes (CONN_MAX_AGE)')
+            if opciones is True:
+                opciones = {}
+            pool = PoolConexiones(**opciones)
+            if not self.settings_dict['CONN_HEALTH_CHECKS']:
+                pool.verificar_despues = float('inf')
+            self._pools.setdefault(self.alias, pool)
+            metricas.pools[self.alias] = self._pools[self.alias]
+        return self._pools[self.alias]
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        if self.pool is None:
+            return super().get_new_connection(conn_params)
+        try:
+            conexion = self.pool.tomar(
+                lambda: super(DatabaseWrapper, self).get_new_connection(conn_params),
+                _viva,
+            )
+        except TimeoutError as e:
+            raise mysql.Database.OperationalError(str(e))
+        self._reutilizada = getattr(conexion, '_estado_inicializado', False)
+        return conexion
+
+    def init_connection_state(self):
+        if self.pool is not None and self._reutilizada:
+            # Los SET de sesión ya se ejecutaron cuando se abrió la conexión
+            return
+        super().init_connection_state()
+        if self.pool is not None:
+            self.connection._estado_inicializado = True
+
+    def _close(self):
+        if self.connection is None or self.pool is None:
+            return super()._close()
+        # Una conexión con una transacción abierta o errores no se reutiliza
+        descartar = (
+            self.in_atomic_block or self.needs_rollback or self.errors_occurred
+            or not self.get_autocommit()
+        )
+        with self.wrap_database_errors:
+            self.pool.devolver(self.connection, descartar=descartar)
+            self.connection = None
+
+
+def _viva(conexion):
+    try:
+        conexion.ping()
+    except mysql.Database.Error:
+        return False
+    return True
@@ -0,0 +1,171 @@
+"""
+Búsqueda de clientes y mascotas sobre un índice de tokens normalizados
+
+Cada cliente y mascota se guarda en indice_busqueda como una fila por
+palabra (minúsculas, sin acentos). Un término de búsqueda coincide con
+los tokens que empiezan con él; la condición se arma como rango
+token >= 'gon' AND token < 'goo', que usa el índice (tipo, token) igual
+en MySQL y en SQLite (LIKE 'gon%' no lo usa en SQLite).
+"""
+
+import unicodedata
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Max, Q, Value, When
+
+from .models import Cliente, Mascota, IndiceBusqueda
+
+
+# =============================================
+# CONFIGURACIÓN
+# =============================================
+
+# Por tipo: modelo y campos indexados con su peso. Los campos numéricos
+# (dni, teléfono) se indexan además con solo sus dígitos: '30.123.456'
+# también se encuentra buscando '30123456'.
+INDICES = {
+    'cliente': {
+        'model': Cliente,
+        'campos': [('nombre', 3), ('apellido', 3), ('dni', 2), ('telefono', 2), ('email', 1)],
+        'numericos': ['dni', 'telefono'],
+    },
+    'mascota': {
+        'model': Mascota,
+        'campos': [('nombre', 3), ('raza', 1), ('cliente__nombre', 2), ('cliente__apellido', 2)],
+        'numericos': [],
+    },
+}
+
+LARGO_TOKEN = IndiceBusqueda._meta.get_field('token').max_length
+MAXIMO_TERMINOS = 6
+MAXIMO_RESULTADOS = 200
+
+
+# =============================================
+# NORMALIZACIÓN
+# =============================================
+
+def normalizar(texto):
+    """Minúsculas, sin acentos y con todo lo que no es letra o dígito como espacio"""
+    texto = unicodedata.normalize('NFKD', str(texto))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+    return ''.join(c if c.isalnum() else ' ' for c in texto)
+
+
+def tokens(texto):
+    return [token[:LARGO_TOKEN] for token in normalizar(texto).split()]
+
+
+def _tokens_de_fila(config, valores):
+    """{token: peso} de un registro; si un token aparece en varios campos vale el mayor peso"""
+    resultado = {}
+    for campo, peso in config['campos']:
+        valor = valores.get(campo)
+        if not valor:
+            continue
+        encontrados = tokens(valor)
+        if campo in config['numericos']:
+            digitos = ''.join(c for c in str(valor) if c.isdigit())
+            if digitos:
+                encontrados.append(digitos[:LARGO_TOKEN])
+        for token in encontrados:
+            resultado[token] = max(peso, resultado.get(token, 0))
+    return resultado
+
+
+# =============================================
+# MANTENIMIENTO DEL ÍNDICE
+# =============================================
+
+def indexar(tipo, ids):
+    """Regenera las filas del índice de los registros indicados (los borrados quedan sin filas)"""
+    ids = {pk for pk in ids if pk is not None}
+    if not ids:
+        return
+    config = INDICES[tipo]
+    campos = [campo for campo, _ in config['campos']]
+    registros = config['model'].objects.filter(pk__in=ids).values('pk', *campos)
+
+    filas = [
+        IndiceBusqueda(tipo=tipo, objeto_id=registro['pk'], token=token, peso=peso)
+        for registro in registros.iterator()
+        for token, peso in _tokens_de_fila(config, registro).items()
+    ]
+    with transaction.atomic():
+        IndiceBusqueda.objects.filter(tipo=tipo, objeto_id__in=ids).delete()
+        IndiceBusqueda.objects.bulk_create(filas, batch_size=1000)
+
+
+def desindexar(tipo, ids):
+    IndiceBusqueda.objects.filter(tipo=tipo, objeto_id__in=list(ids)).delete()
+
+
+# =============================================
+# BÚSQUEDA
+# =============================================
+
+def _siguiente(prefijo):
+    """
+    Menor cadena mayor que todas las que empiezan con el prefijo, o None.
+    Los tokens son letras y dígitos en minúscula, así que 'z' se arrastra
+    ('abz' -> 'ac') y '9' pasa a 'a' (en cualquier collation los dígitos
+    van antes que las letras).
+    """
+    while prefijo:
+        ultimo = prefijo[-1]
+        if ultimo == 'z':
+            prefijo = prefijo[:-1]
+            continue
+        return prefijo[:-1] + ('a' if ultimo == '9' else chr(ord(ultimo) + 1))
+    return None
+
+
+def _con_prefijo(termino):
+    """token LIKE 'termino%' expresado como rango, para que use el índice"""
+    condicion = Q(token__gte=termino)
+    limite = _siguiente(termino)
+    if limite is not None:
+        condicion &= Q(token__lt=limite)
+    return condicion
+
+
+def buscar(tipo, texto, limite=MAXIMO_RESULTADOS):
+    """
+    Ids de los registros que coinciden con todos los términos, del más
+    relevante al menos. Cada término suma el peso del campo donde aparece,
+    el doble si coincide con la palabra completa y no solo con el comienzo.
+    Es una sola consulta agrupada por objeto sobre el índice (tipo, token).
+    """
+    terminos = list(dict.fromkeys(tokens(texto)))[:MAXIMO_TERMINOS]
+    if not terminos:
+        return []
+
+    condicion = Q()
+    anotaciones = {}
+    for i, termino in enumerate(terminos):
+        prefijo = _con_prefijo(termino)
+        condicion |= prefijo
+        anotaciones[f'p{i}'] = Max(Case(
+            When(token=termino, then=F('peso') * 2),
+            When(prefijo, then=F('peso')),
+            default=0,
+            output_field=IntegerField(),
+        ))
+
+    # El término más largo suele ser el más selectivo: acota los candidatos
+    # antes de agrupar, en lugar de agrupar todas las coincidencias de 'ana'
+    candidatos = IndiceBusqueda.objects.filter(
+        _con_prefijo(max(terminos, key=len)), tipo=tipo
+    ).values('objeto_id')
+
+    puntaje = sum((F(alias) for alias in anotaciones), Value(0))
+    resultados = (
+        IndiceBusqueda.objects.filter(condicion, tipo=tipo, objeto_id__in=candidatos)
+        .values('objeto_id')
+        .annotate(**anotaciones)
+        .filter(**{f'{alias}__gt': 0 for alias in anotaciones})
+        .annotate(puntaje=puntaje)
+        .order_by('-puntaje', 'objeto_id')
+        .values_list('objeto_id', flat=True)
+    )
+    return list(resultados[:limite])
@@ -0,0 +1,77 @@
+"""
+Caches en memoria del proceso
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+CACHE_LOCAL_TTL = getattr(settings, 'CACHE_LOCAL_TTL', 30)
+
+
+def cache_compartida(alias='default'):
+    """True si todos los procesos ven la misma cache (no LocMemCache ni DummyCache)"""
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
+
+
+def ttl_invalidable(ttl):
+    """
+    Timeout para datos que invalidan las señales. Con una cache por proceso
+    la invalidación solo llega al proceso que guardó, así que en los demás
+    el dato puede quedar viejo: se acota a CACHE_LOCAL_TTL segundos.
+    """
+    if cache_compartida():
+        return ttl
+    return CACHE_LOCAL_TTL if ttl is None else min(ttl, CACHE_LOCAL_TTL)
+
+
+class CacheLRU:
+    """
+    Cache chica en memoria del proceso. Cada entrada vive `ttl` segundos:
+    las señales limpian la cache del proceso que guarda, el TTL acota lo
+    que tarda en verse el cambio en los demás procesos.
+    """
+
+    def __init__(self, maximo=512, ttl=60):
+        self.maximo = maximo
+        self.ttl = ttl
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            vence, valor = entrada
+            if vence < time.monotonic():
+                del self._datos[clave]
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def set(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + self.ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+
+    def borrar(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def limpiar(self, tipo=None):
+        """Borra todo, o solo las entradas cuya clave (una tupla) empieza con `tipo`"""
+        with self._lock:
+            if tipo is None:
+                self._datos.clear()
+            else:
+                for clave in [clave for clave in self._datos if clave[0] == tipo]:
+                    del self._datos[clave]
@@ -0,0 +1,153 @@
+"""
+Conexiones a la base: pool acotado y métricas de reutilización
+
+Hay dos modos, elegidos en settings:
+
+    persistentes  CONN_MAX_AGE > 0 y CONN_HEALTH_CHECKS. Cada hilo conserva
+                  su conexión entre requests (WSGI con procesos).
+    pool          DB_POOL_MAX > 0, backend core.backends.mysql. Las
+                  conexiones se comparten entre los hilos del proceso, como
+                  mucho DB_POOL_MAX (despliegues con hilos o ASGI).
+
+En los dos modos la conexión nueva, con su init_command, queda fuera de la
+mayoría de las requests. Las métricas son del proceso que atiende la
+request: ver /api/sistema/conexiones/.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+# =============================================
+# MÉTRICAS
+# =============================================
+
+class MetricasConexiones:
+    """Contadores del proceso, protegidos con un lock"""
+
+    CONTADORES = ['requests', 'abiertas', 'reutilizadas', 'descartadas', 'esperas', 'agotadas']
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._valores = dict.fromkeys(self.CONTADORES, 0)
+        self.pools = {}
+
+    def sumar(self, contador, cantidad=1):
+        with self._lock:
+            self._valores[contador] += cantidad
+
+    def resumen(self):
+        with self._lock:
+            valores = dict(self._valores)
+        requests = valores['requests']
+        valores['conexiones_por_request'] = round(valores['abiertas'] / requests, 4) if requests else None
+        valores['pools'] = {alias: pool.estado() for alias, pool in self.pools.items()}
+        return valores
+
+    def reiniciar(self):
+        with self._lock:
+            self._valores = dict.fromkeys(self.CONTADORES, 0)
+
+
+metricas = MetricasConexiones()
+
+
+# =============================================
+# POOL
+# =============================================
+
+class PoolConexiones:
+    """
+    Pool de conexiones DB-API del proceso, con como mucho `max_size`
+    conexiones en uso o libres. Las libres se reutilizan en orden LIFO, así
+    las que sobran quedan ociosas y vencen. Antes de reutilizar una conexión
+    que estuvo ociosa más de `verificar_despues` segundos se le hace ping.
+    Las que superan `max_lifetime` se cierran (debe ser menor que el
+    wait_timeout de MySQL).
+    """
+
+    def __init__(self, max_size, timeout=10, max_lifetime=3600, verificar_despues=30):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.verificar_despues = verificar_despues
+        self._cupos = threading.BoundedSemaphore(max_size)
+        self._libres = deque()
+        self._lock = threading.Lock()
+        self._en_uso = 0
+        # Momento de creación de cada conexión (por id)
+        self._creadas = {}
+
+    def tomar(self, crear, viva):
+        """
+        Devuelve una conexión libre o una nueva hecha con crear(). viva(conexion)
+        es el health check. Lanza TimeoutError si no se libera un cupo a tiempo.
+        """
+        if not self._cupos.acquire(blocking=False):
+            metricas.sumar('esperas')
+            if not self._cupos.acquire(timeout=self.timeout):
+                metricas.sumar('agotadas')
+                raise TimeoutError(
+                    f'No hay conexiones libres después de {self.timeout} s (máximo {self.max_size})'
+                )
+        try:
+            conexion = self._libre(viva)
+            if conexion is None:
+                conexion = crear()
+                with self._lock:
+                    self._creadas[id(conexion)] = time.monotonic()
+                metricas.sumar('abiertas')
+            else:
+                metricas.sumar('reutilizadas')
+        except BaseException:
+            self._cupos.release()
+            raise
+        with self._lock:
+            self._en_uso += 1
+        return conexion
+
+    def _libre(self, viva):
+        ahora = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._libres:
+                    return None
+                conexion, devuelta = self._libres.pop()
+            vencida = ahora - self._creadas.get(id(conexion), ahora) > self.max_lifetime
+            if not vencida and (ahora - devuelta < self.verificar_despues or viva(conexion)):
+                return conexion
+            self._cerrar(conexion)
+
+    def devolver(self, conexion, descartar=False):
+        """Devuelve la conexión al pool, o la cierra si está en un estado dudoso"""
+        with self._lock:
+            self._en_uso -= 1
+        try:
+            if descartar:
+                self._cerrar(conexion)
+            else:
+                with self._lock:
+                    self._libres.append((conexion, time.monotonic()))
+        finally:
+            self._cupos.release()
+
+    def _cerrar(self, conexion):
+        with self._lock:
+            self._creadas.pop(id(conexion), None)
+        metricas.sumar('descartadas')
+        try:
+            conexion.close()
+        except Exception:
+            pass
+
+    def cerrar_libres(self):
+        with self._lock:
+            libres = [conexion for conexion, _ in self._libres]
+            self._libres.clear()
+        for conexion in libres:
+            self._cerrar(conexion)
+
+    def estado(self):
+        with self._lock:
+            return {'max': self.max_size, 'en_uso': self._en_uso, 'libres': len(self._libres)}
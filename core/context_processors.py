@@ -0,0 +1,25 @@
+"""
+Context processors del Sistema Veterinaria
+"""
+
+from .cache_local import ttl_invalidable
+from .fragmentos import FRAGMENTOS_CACHE_TIMEOUT
+
+
+SECCIONES = ['clientes', 'mascotas', 'citas', 'usuarios']
+
+
+def navegacion(request):
+    """
+    Sección activa del menú. Se calcula acá para que el menú lateral pueda
+    cachearse por sección y rol sin depender de request.path.
+    """
+    seccion = 'inicio' if request.path == '/' else ''
+    for nombre in SECCIONES:
+        if nombre in request.path:
+            seccion = nombre
+            break
+    return {
+        'seccion_activa': seccion,
+        'fragmentos_timeout': ttl_invalidable(FRAGMENTOS_CACHE_TIMEOUT),
+    }
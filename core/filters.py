@@ -0,0 +1,169 @@
+"""
+Filtros para la API REST del Sistema Veterinaria
+"""
+
+from datetime import date, datetime, time, timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+
+from .busqueda import buscar
+
+
+# =============================================
+# RANGOS DE FECHAS (semiabiertos, zona horaria local)
+# =============================================
+
+def inicio_del_dia(dia):
+    """Primer instante del día en la zona horaria del proyecto"""
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+def rango_dia(dia):
+    """Rango [dia, dia + 1)"""
+    return dia, dia + timedelta(days=1)
+
+
+def rango_semana(dia):
+    """Rango de la semana (lunes a domingo) que contiene al día"""
+    lunes = dia - timedelta(days=dia.weekday())
+    return lunes, lunes + timedelta(days=7)
+
+
+def rango_mes(dia):
+    """Rango del mes calendario que contiene al día"""
+    inicio = dia.replace(day=1)
+    if inicio.month == 12:
+        fin = inicio.replace(year=inicio.year + 1, month=1)
+    else:
+        fin = inicio.replace(month=inicio.month + 1)
+    return inicio, fin
+
+
+def filtro_rango(campo, desde=None, hasta=None, model=None):
+    """
+    Arma los kwargs de un filtro semiabierto [desde, hasta) sobre un campo.
+    Si el campo es DateTimeField, las fechas se convierten a instantes locales,
+    así la consulta compara la columna directamente y puede usar el índice.
+    """
+    es_datetime = True
+    if model is not None:
+        es_datetime = isinstance(model._meta.get_field(campo), models.DateTimeField)
+
+    filtros = {}
+    if desde is not None:
+        filtros[f'{campo}__gte'] = inicio_del_dia(desde) if es_datetime else desde
+    if hasta is not None:
+        filtros[f'{campo}__lt'] = inicio_del_dia(hasta) if es_datetime else hasta
+    return filtros
+
+
+def parsear_fecha(valor, parametro):
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise serializers.ValidationError({parametro: 'Fecha inválida, use el formato AAAA-MM-DD'})
+
+
+def parsear_mes(valor, parametro):
+    try:
+        return datetime.strptime(valor, '%Y-%m').date()
+    except ValueError:
+        raise serializers.ValidationError({parametro: 'Mes inválido, use el formato AAAA-MM'})
+
+
+def rango_desde_parametros(params):
+    """
+    Convierte ?fecha, ?semana, ?mes o ?desde/?hasta en un rango de fechas
+    semiabierto (desde, hasta). Cualquiera de los extremos puede ser None.
+    """
+    desde = hasta = None
+    if params.get('fecha'):
+        desde, hasta = rango_dia(parsear_fecha(params['fecha'], 'fecha'))
+    elif params.get('semana'):
+        desde, hasta = rango_semana(parsear_fecha(params['semana'], 'semana'))
+    elif params.get('mes'):
+        desde, hasta = rango_mes(parsear_mes(params['mes'], 'mes'))
+    else:
+        if params.get('desde'):
+            desde = parsear_fecha(params['desde'], 'desde')
+        if params.get('hasta'):
+            hasta = parsear_fecha(params['hasta'], 'hasta') + timedelta(days=1)
+    return desde, hasta
+
+
+# =============================================
+# FILTER BACKEND
+# =============================================
+
+class RangoFechasFilter(BaseFilterBackend):
+    """
+    Filtra por rango de fechas sobre el campo `date_range_field` del ViewSet.
+
+    Parámetros aceptados:
+        ?fecha=AAAA-MM-DD          un día
+        ?semana=AAAA-MM-DD         la semana que contiene ese día
+        ?mes=AAAA-MM               un mes calendario
+        ?desde=AAAA-MM-DD&hasta=AAAA-MM-DD   rango arbitrario (ambos inclusive)
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        campo = getattr(view, 'date_range_field', None)
+        if not campo:
+            return queryset
+
+        desde, hasta = rango_desde_parametros(request.query_params)
+        if desde is None and hasta is None:
+            return queryset
+
+        return queryset.filter(**filtro_rango(campo, desde, hasta, model=queryset.model))
+
+
+class CamposFilter(BaseFilterBackend):
+    """
+    Filtro por igualdad sobre los campos de `filterset_fields` del ViewSet:
+    ?especie=perro&cliente=3. Los valores se validan con el campo del modelo.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        filtros = {}
+        for campo in getattr(view, 'filterset_fields', []):
+            valor = request.query_params.get(campo)
+            if valor in (None, ''):
+                continue
+            field = queryset.model._meta.get_field(campo)
+            if field.is_relation:
+                field = field.target_field
+            try:
+                filtros[campo] = field.to_python(valor)
+            except ValidationError:
+                raise serializers.ValidationError({campo: 'Valor inválido'})
+            if field.choices and filtros[campo] not in dict(field.flatchoices):
+                raise serializers.ValidationError({campo: 'Valor inválido'})
+        return queryset.filter(**filtros) if filtros else queryset
+
+
+class BusquedaFilter(BaseFilterBackend):
+    """
+    ?search=texto sobre el índice de búsqueda del tipo `search_index` del
+    ViewSet ('cliente' o 'mascota'). Los resultados salen ordenados por
+    relevancia. Ver core/busqueda.py.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        tipo = getattr(view, 'search_index', None)
+        texto = request.query_params.get('search', '').strip()
+        if not tipo or not texto:
+            return queryset
+
+        ids = buscar(tipo, texto)
+        if not ids:
+            return queryset.none()
+        relevancia = models.Case(
+            *[models.When(pk=pk, then=posicion) for posicion, pk in enumerate(ids)],
+            output_field=models.IntegerField(),
+        )
+        return queryset.filter(pk__in=ids).order_by(relevancia)
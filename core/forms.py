@@ -1,5 +1,6 @@
 # core/forms.py
 from django import forms
+from .agenda import validar_duracion
 from .models import Cita
 
 class CitaForm(forms.ModelForm):
@@ -18,3 +19,10 @@ class CitaForm(forms.ModelForm):
             'fecha_hora': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
             'observaciones': forms.Textarea(attrs={'rows': 3}),
         }
+
+    def clean_duracion_minutos(self):
+        duracion = self.cleaned_data['duracion_minutos']
+        error = validar_duracion(duracion)
+        if error:
+            raise forms.ValidationError(error)
+        return duracion
@@ -0,0 +1,73 @@
+"""
+Versiones por objeto para el cache de fragmentos de las plantillas
+
+Cada fila de un listado se cachea con {% cache %} bajo una clave que
+incluye la versión de todos los objetos que muestra (la cita, su mascota,
+el dueño y el veterinario). Las señales cambian la versión del objeto
+guardado, así la próxima vez la clave es otra y la fila se vuelve a
+renderizar; los fragmentos viejos expiran solos.
+
+Sin cache compartida las versiones y los fragmentos vencen a los
+CACHE_LOCAL_TTL segundos: la invalidación solo llega al proceso que guardó.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache_local import ttl_invalidable
+
+
+FRAGMENTOS_CACHE_TIMEOUT = getattr(settings, 'FRAGMENTOS_CACHE_TIMEOUT', 60 * 60 * 24)
+
+FILA_VERSION_KEY = 'fila:version:{}:{}'
+
+
+def _clave(model, pk):
+    return FILA_VERSION_KEY.format(model._meta.label_lower, pk)
+
+
+def _resolver(obj, ruta):
+    for atributo in ruta.split('.'):
+        if obj is None:
+            return None
+        obj = getattr(obj, atributo)
+    return obj
+
+
+def anotar_versiones(objetos, *relaciones):
+    """
+    Agrega `version_fila` a cada objeto: las versiones del objeto y de las
+    relaciones indicadas ('mascota', 'mascota.cliente', ...), que deben
+    venir cargadas. Es un solo get_many para toda la página.
+    """
+    claves_por_objeto = []
+    for obj in objetos:
+        relacionados = [obj] + [_resolver(obj, ruta) for ruta in relaciones]
+        claves_por_objeto.append([
+            _clave(type(relacionado), relacionado.pk) if relacionado is not None else None
+            for relacionado in relacionados
+        ])
+
+    claves = {clave for claves in claves_por_objeto for clave in claves if clave}
+    versiones = cache.get_many(claves)
+    faltantes = claves - versiones.keys()
+    if faltantes:
+        # Una versión recreada después de una expulsión nunca coincide con una anterior
+        nueva = time.time_ns()
+        cache.set_many({clave: nueva for clave in faltantes}, ttl_invalidable(None))
+        versiones.update({clave: nueva for clave in faltantes})
+
+    for obj, claves_obj in zip(objetos, claves_por_objeto):
+        obj.version_fila = '.'.join(str(versiones[clave]) if clave else '-' for clave in claves_obj)
+    return objetos
+
+
+def invalidar_filas(model, pks):
+    """Cambia la versión de los objetos indicados"""
+    version = time.time_ns()
+    cache.set_many(
+        {_clave(model, pk): version for pk in set(pks) if pk is not None},
+        ttl_invalidable(None)
+    )
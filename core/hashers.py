@@ -0,0 +1,39 @@
+"""
+Hashers de contraseñas del Sistema Veterinaria
+
+El primero de PASSWORD_HASHERS es el objetivo (PASSWORD_HASHER_OBJETIVO).
+Cuando un usuario inicia sesión con una contraseña guardada con otro
+hasher, u otro factor de trabajo, Django la vuelve a hashear con el
+objetivo. Para elegir el objetivo y su factor de trabajo ver el comando
+benchmark_hashers.
+"""
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    BCryptPasswordHasher, BCryptSHA256PasswordHasher, PBKDF2PasswordHasher,
+)
+
+
+class PBKDF2ConfigurablePasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 con las iteraciones de PASSWORD_PBKDF2_ITERACIONES"""
+    iterations = getattr(settings, 'PASSWORD_PBKDF2_ITERACIONES', None) or PBKDF2PasswordHasher.iterations
+
+
+class BCryptSHA256ConfigurablePasswordHasher(BCryptSHA256PasswordHasher):
+    """bcrypt (con SHA-256 previo) con las rondas de PASSWORD_BCRYPT_RONDAS"""
+    rounds = getattr(settings, 'PASSWORD_BCRYPT_RONDAS', None) or BCryptSHA256PasswordHasher.rounds
+
+
+class BCryptLegadoPasswordHasher(BCryptPasswordHasher):
+    """
+    Hashes bcrypt de PHP ($2y$) del sistema anterior, guardados como
+    bcrypt_php$$2y$10$... (la migración 0009 agrega el prefijo). Solo
+    sirve para verificarlos: no debe ser el objetivo. Como PHP, usa los
+    primeros 72 bytes de la contraseña.
+    """
+    algorithm = 'bcrypt_php'
+
+    def encode(self, password, salt):
+        bcrypt = self._load_library()
+        data = bcrypt.hashpw(password.encode()[:72], salt)
+        return '%s$%s' % (self.algorithm, data.decode('ascii'))
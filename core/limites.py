@@ -0,0 +1,135 @@
+"""
+Límite de intentos de login (token bucket)
+
+Cada intento de login cuesta un token del bucket de la IP y otro del bucket
+del email. Los buckets se recargan a un ritmo fijo hasta su capacidad, así
+se admiten ráfagas cortas (un usuario que se equivoca dos veces) pero no un
+script probando contraseñas. El control se hace antes de authenticate(), de
+modo que un intento rechazado no calcula ningún hash.
+
+La IP es la de get_ident() de DRF: REMOTE_ADDR, o con NUM_PROXIES la que
+agregó el último proxy confiable a X-Forwarded-For. Sin proxies el header
+se ignora, si no bastaría con cambiarlo en cada intento.
+
+Los buckets viven en memoria del proceso. Con LOGIN_LIMITE_CACHE_COMPARTIDA
+(un alias de CACHES) se controla además un bucket compartido entre procesos;
+ese bucket se actualiza con get/set, sin atomicidad, así que el límite
+compartido es aproximado.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+
+# (capacidad, intentos recargados por minuto)
+LOGIN_LIMITE_IP = (
+    getattr(settings, 'LOGIN_LIMITE_IP_RAFAGA', 20),
+    getattr(settings, 'LOGIN_LIMITE_IP_POR_MINUTO', 10),
+)
+LOGIN_LIMITE_EMAIL = (
+    getattr(settings, 'LOGIN_LIMITE_EMAIL_RAFAGA', 5),
+    getattr(settings, 'LOGIN_LIMITE_EMAIL_POR_MINUTO', 2),
+)
+LOGIN_LIMITE_CACHE_COMPARTIDA = getattr(settings, 'LOGIN_LIMITE_CACHE_COMPARTIDA', None)
+
+LIMITE_CACHE_KEY = 'login:bucket:{}:{}'
+
+
+# =============================================
+# TOKEN BUCKETS
+# =============================================
+
+def _recargar(tokens, actualizado, ahora, capacidad, por_segundo):
+    return min(capacidad, tokens + (ahora - actualizado) * por_segundo)
+
+
+class TokenBuckets:
+    """
+    Buckets en memoria del proceso. Se guardan como mucho `maximo`; cuando
+    se llena se descarta el menos usado, que en el peor caso le devuelve la
+    capacidad completa a una clave.
+    """
+
+    def __init__(self, maximo=10000):
+        self.maximo = maximo
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consumir(self, clave, capacidad, por_minuto):
+        """Consume un token. Devuelve 0 si había, o los segundos hasta que haya uno"""
+        por_segundo = por_minuto / 60
+        ahora = time.monotonic()
+        with self._lock:
+            tokens, actualizado = self._buckets.get(clave, (capacidad, ahora))
+            tokens = _recargar(tokens, actualizado, ahora, capacidad, por_segundo)
+            if tokens >= 1:
+                self._buckets[clave] = (tokens - 1, ahora)
+                espera = 0
+            else:
+                self._buckets[clave] = (tokens, ahora)
+                espera = (1 - tokens) / por_segundo
+            self._buckets.move_to_end(clave)
+            while len(self._buckets) > self.maximo:
+                self._buckets.popitem(last=False)
+        return espera
+
+    def limpiar(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+buckets_login = TokenBuckets()
+
+
+def consumir_compartido(cache, clave, capacidad, por_minuto):
+    """Igual que TokenBuckets.consumir sobre una cache de Django (reloj de pared)"""
+    por_segundo = por_minuto / 60
+    ahora = time.time()
+    tokens, actualizado = cache.get(clave) or (capacidad, ahora)
+    tokens = _recargar(tokens, actualizado, ahora, capacidad, por_segundo)
+    espera = 0 if tokens >= 1 else (1 - tokens) / por_segundo
+    if not espera:
+        tokens -= 1
+    # Pasado este tiempo el bucket estaría lleno de nuevo
+    cache.set(clave, (tokens, ahora), int((capacidad - tokens) / por_segundo) + 1)
+    return espera
+
+
+# =============================================
+# THROTTLE
+# =============================================
+
+class LoginThrottle(BaseThrottle):
+    """
+    Throttle de DRF para los endpoints de login. También se usa desde
+    login_view: allow_request() solo necesita request.META y el email.
+    """
+
+    def allow_request(self, request, view):
+        datos = getattr(request, 'data', request.POST)
+        email = str(datos.get('email') or '').strip().lower() if hasattr(datos, 'get') else ''
+
+        limites = [('ip', self.get_ident(request), LOGIN_LIMITE_IP)]
+        if email:
+            limites.append(('email', email, LOGIN_LIMITE_EMAIL))
+
+        compartida = caches[LOGIN_LIMITE_CACHE_COMPARTIDA] if LOGIN_LIMITE_CACHE_COMPARTIDA else None
+        self.espera = 0
+        for tipo, valor, (capacidad, por_minuto) in limites:
+            espera = buckets_login.consumir((tipo, valor), capacidad, por_minuto)
+            if not espera and compartida is not None:
+                espera = consumir_compartido(
+                    compartida, LIMITE_CACHE_KEY.format(tipo, valor), capacidad, por_minuto
+                )
+            if espera:
+                self.espera = espera
+                return False
+        return True
+
+    def wait(self):
+        return self.espera
@@ -0,0 +1,151 @@
+"""
+Lista negra de refresh tokens en memoria
+
+Con ROTATE_REFRESH_TOKENS y BLACKLIST_AFTER_ROTATION cada refresh pasa a la
+lista negra el token usado, y simplejwt consulta la tabla de tokens
+bloqueados en cada refresh. Acá esa consulta se reemplaza por un conjunto
+en memoria con los jti bloqueados que todavía no vencieron. El conjunto se
+completa leyendo solo las filas nuevas (id mayor al último visto), como
+mucho cada TOKENS_LISTA_NEGRA_SINCRONIZACION segundos.
+
+El conjunto puede atrasarse respecto de la base, pero al rotar el token se
+bloquea con get_or_create: si la fila ya existía, el token ya se había
+usado y el refresh se rechaza. La base sigue siendo la que decide.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+
+TOKENS_LISTA_NEGRA_SINCRONIZACION = getattr(settings, 'TOKENS_LISTA_NEGRA_SINCRONIZACION', 5)
+
+
+# =============================================
+# CONJUNTO EN MEMORIA
+# =============================================
+
+class ListaNegra:
+    """jti bloqueados y no vencidos, con su vencimiento (epoch)"""
+
+    def __init__(self, intervalo=TOKENS_LISTA_NEGRA_SINCRONIZACION):
+        self.intervalo = intervalo
+        self._jtis = {}
+        self._ultimo_id = None
+        self._proxima = 0
+        self._lock = threading.Lock()
+
+    def contiene(self, jti):
+        if time.monotonic() >= self._proxima:
+            self.sincronizar()
+        return jti in self._jtis
+
+    def agregar(self, jti, exp):
+        with self._lock:
+            self._jtis[jti] = exp
+
+    def sincronizar(self):
+        """Trae las filas bloqueadas desde la última lectura y descarta las vencidas"""
+        with self._lock:
+            ahora = timezone.now()
+            bloqueados = BlacklistedToken.objects.filter(token__expires_at__gt=ahora)
+            if self._ultimo_id is not None:
+                bloqueados = bloqueados.filter(id__gt=self._ultimo_id)
+            for pk, jti, expira in bloqueados.order_by('id').values_list(
+                'id', 'token__jti', 'token__expires_at'
+            ).iterator():
+                self._jtis[jti] = expira.timestamp()
+                self._ultimo_id = pk
+            if self._ultimo_id is None:
+                # Base vacía: la próxima vez se lee desde el principio
+                self._ultimo_id = 0
+
+            limite = ahora.timestamp()
+            for jti in [jti for jti, exp in self._jtis.items() if exp <= limite]:
+                del self._jtis[jti]
+            self._proxima = time.monotonic() + self.intervalo
+
+    def limpiar(self):
+        with self._lock:
+            self._jtis.clear()
+            self._ultimo_id = None
+            self._proxima = 0
+
+
+lista_negra = ListaNegra()
+
+
+# =============================================
+# REFRESH TOKEN
+# =============================================
+
+def _rotacion_activa():
+    return api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION
+
+
+class RefreshTokenRotativo(RefreshToken):
+    """
+    RefreshToken que consulta la lista negra en memoria y registra los
+    tokens con el user_id del claim, sin cargar el usuario.
+    """
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if lista_negra.contiene(jti):
+            raise TokenError(_('Token is blacklisted'))
+        if not _rotacion_activa():
+            # Sin rotación no hay un get_or_create posterior que lo confirme
+            super().check_blacklist()
+
+    def _pendiente(self):
+        """OutstandingToken del token, creándolo si no existe"""
+        token, creado = OutstandingToken.objects.get_or_create(
+            jti=self.payload[api_settings.JTI_CLAIM],
+            defaults={
+                'user_id': self.payload.get(api_settings.USER_ID_CLAIM),
+                'created_at': self.current_time,
+                'token': str(self),
+                'expires_at': datetime_from_epoch(self.payload['exp']),
+            },
+        )
+        return token
+
+    def blacklist(self):
+        with transaction.atomic():
+            resultado = BlacklistedToken.objects.get_or_create(token=self._pendiente())
+        lista_negra.agregar(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        return resultado
+
+    def outstand(self):
+        # Recién rotado: el jti es nuevo, alcanza con un INSERT
+        return OutstandingToken.objects.create(
+            jti=self.payload[api_settings.JTI_CLAIM],
+            user_id=self.payload.get(api_settings.USER_ID_CLAIM),
+            created_at=self.current_time,
+            token=str(self),
+            expires_at=datetime_from_epoch(self.payload['exp']),
+        )
+
+    def rotar(self):
+        """
+        Bloquea este token y lo convierte en uno nuevo (jti, exp e iat
+        nuevos). Lanza TokenError si el token ya estaba bloqueado, o sea
+        si alguien lo usó antes.
+        """
+        if api_settings.BLACKLIST_AFTER_ROTATION:
+            bloqueado, creado = self.blacklist()
+            if not creado:
+                raise TokenError(_('Token is blacklisted'))
+        self.set_jti()
+        self.set_exp()
+        self.set_iat()
+        self.outstand()
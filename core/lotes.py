@@ -0,0 +1,49 @@
+"""
+Altas masivas que dejan el id en cada objeto
+
+En MySQL un INSERT de varias filas no devuelve los ids, así que después de
+bulk_create los objetos quedan con pk None. crear_lote() los recupera con
+una consulta: las filas con id mayor al último id leído antes de insertar,
+emparejadas con los objetos por el valor de sus campos.
+"""
+
+from django.db import connection
+from django.db.models import Max
+
+
+def _clave(campos, valores):
+    """Valores normalizados, para comparar los del objeto con los leídos"""
+    return tuple(field.to_python(valor) for field, valor in zip(campos, valores))
+
+
+def crear_lote(model, objetos, batch_size=None, **opciones):
+    """
+    bulk_create(objetos) con el pk asignado a cada objeto insertado. Con
+    ignore_conflicts los objetos que no se insertaron quedan con pk None.
+    Devuelve los objetos.
+    """
+    if not objetos or connection.features.can_return_rows_from_bulk_insert:
+        return model.objects.bulk_create(objetos, batch_size=batch_size, **opciones)
+
+    ultimo = model.objects.aggregate(ultimo=Max('pk'))['ultimo']
+    model.objects.bulk_create(objetos, batch_size=batch_size, **opciones)
+
+    # Las filas de otro proceso que entren en el rango no coinciden campo
+    # a campo con los objetos y se descartan
+    campos = [f for f in model._meta.concrete_fields if not f.primary_key]
+    sin_pk = {}
+    for obj in objetos:
+        clave = _clave(campos, [getattr(obj, f.attname) for f in campos])
+        sin_pk.setdefault(clave, []).append(obj)
+
+    nuevas = model._base_manager.order_by('pk')
+    if ultimo is not None:
+        nuevas = nuevas.filter(pk__gt=ultimo)
+    for pk, *valores in nuevas.values_list('pk', *[f.attname for f in campos]):
+        candidatos = sin_pk.get(_clave(campos, valores))
+        if candidatos:
+            obj = candidatos.pop(0)
+            obj.pk = pk
+            obj._state.adding = False
+            obj._state.db = nuevas.db
+    return objetos
@@ -0,0 +1,117 @@
+"""
+Mide el costo de CPU de verificar una contraseña con cada hasher candidato
+
+Uso:
+    python manage.py benchmark_hashers
+    python manage.py benchmark_hashers --iteraciones 600000,1000000 --rondas 10,12
+    python manage.py benchmark_hashers --pico 300 --repeticiones 10
+
+Cada login exitoso hace una verificación, así que el tiempo de CPU por
+verificación es el costo de un login. Con --pico (logins por minuto en la
+hora de mayor demanda) se calcula cuántos núcleos ocupa solo el hashing,
+para dimensionar los workers. Los hashers cuya librería no está instalada
+(argon2-cffi, bcrypt) se informan y se saltean. No toca la base.
+"""
+
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher, PBKDF2PasswordHasher, ScryptPasswordHasher, get_hasher,
+)
+from django.core.management.base import BaseCommand, CommandError
+
+from core.hashers import BCryptLegadoPasswordHasher, BCryptSHA256ConfigurablePasswordHasher
+
+
+def _enteros(valor, opcion):
+    try:
+        numeros = [int(parte) for parte in valor.split(',') if parte.strip()]
+    except ValueError:
+        raise CommandError(f'{opcion} debe ser una lista de enteros separados por coma')
+    if not numeros or min(numeros) < 1:
+        raise CommandError(f'{opcion} debe tener al menos un valor mayor que cero')
+    return numeros
+
+
+class Command(BaseCommand):
+    help = 'Benchmark de los hashers de contraseñas y sus factores de trabajo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeticiones', type=int, default=5,
+            help='Verificaciones por candidato (default: 5)'
+        )
+        parser.add_argument(
+            '--iteraciones', default=f'260000,600000,{PBKDF2PasswordHasher.iterations}',
+            help='Iteraciones de PBKDF2 a medir, separadas por coma'
+        )
+        parser.add_argument(
+            '--rondas', default='10,11,12',
+            help='Rondas de bcrypt a medir, separadas por coma'
+        )
+        parser.add_argument(
+            '--pico', type=int, default=0,
+            help='Logins por minuto en hora pico, para estimar los núcleos necesarios'
+        )
+
+    def candidatos(self, options):
+        """(nombre, factor, hasher) a medir"""
+        for iteraciones in _enteros(options['iteraciones'], '--iteraciones'):
+            hasher = PBKDF2PasswordHasher()
+            hasher.iterations = iteraciones
+            yield 'pbkdf2_sha256', f'{iteraciones} iter', hasher
+        for rondas in _enteros(options['rondas'], '--rondas'):
+            hasher = BCryptSHA256ConfigurablePasswordHasher()
+            hasher.rounds = rondas
+            yield 'bcrypt_sha256', f'{rondas} rondas', hasher
+        argon2 = Argon2PasswordHasher()
+        yield 'argon2', f't={argon2.time_cost} m={argon2.memory_cost}', argon2
+        scrypt = ScryptPasswordHasher()
+        yield 'scrypt', f'n={scrypt.work_factor}', scrypt
+        yield 'bcrypt_php', '10 rondas', BCryptLegadoPasswordHasher()
+
+    def handle(self, *args, **options):
+        repeticiones = options['repeticiones']
+        if repeticiones < 1:
+            raise CommandError('--repeticiones debe ser mayor que cero')
+
+        objetivo = get_hasher('default')
+        self.stdout.write(f'Objetivo actual: {settings.PASSWORD_HASHERS[0]}\n')
+        self.stdout.write(
+            f'{"hasher":<16}{"factor":<18}{"CPU ms":>10}{"real ms":>10}{"logins/s":>10}'
+            + (f'{"núcleos":>10}' if options['pico'] else '')
+        )
+
+        password = 'benchmark-Contraseña-1'
+        for nombre, factor, hasher in self.candidatos(options):
+            try:
+                if nombre == 'bcrypt_php':
+                    salt = hasher._load_library().gensalt(10).replace(b'$2b$', b'$2y$')
+                else:
+                    salt = hasher.salt()
+                encoded = hasher.encode(password, salt)
+            except ValueError as e:
+                self.stdout.write(f'{nombre:<16}{factor:<18}  salteado: {e}')
+                continue
+
+            cpu, real = [], []
+            for _ in range(repeticiones):
+                inicio_cpu, inicio_real = time.process_time(), time.perf_counter()
+                if not hasher.verify(password, encoded):
+                    raise CommandError(f'{nombre} no verificó su propio hash')
+                cpu.append((time.process_time() - inicio_cpu) * 1000)
+                real.append((time.perf_counter() - inicio_real) * 1000)
+
+            cpu_ms = statistics.median(cpu)
+            linea = (
+                f'{nombre:<16}{factor:<18}{cpu_ms:>10.1f}{statistics.median(real):>10.1f}'
+                f'{1000 / cpu_ms if cpu_ms else float("inf"):>10.1f}'
+            )
+            if options['pico']:
+                # Segundos de CPU por segundo de reloj en la hora pico
+                linea += f'{options["pico"] / 60 * cpu_ms / 1000:>10.2f}'
+            if hasher.algorithm == objetivo.algorithm and not objetivo.must_update(encoded):
+                linea += '  <- objetivo'
+            self.stdout.write(linea)
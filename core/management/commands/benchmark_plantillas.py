@@ -0,0 +1,104 @@
+"""
+Mide el tiempo de render de las páginas HTML principales
+
+Uso:
+    python manage.py benchmark_plantillas
+    python manage.py benchmark_plantillas --repeticiones 200 --usuario admin@vet.com
+
+Cada página se sirve con tres configuraciones:
+
+    sin cache     la plantilla se vuelve a compilar y no hay cache de fragmentos
+    compiladas    loader con cache, sin cache de fragmentos
+    fragmentos    loader con cache y fragmentos cacheados (producción)
+
+El snapshot del dashboard se calcula antes de medir, así solo se compara
+el costo de render. Usa los datos reales de la base; solo hace lecturas.
+"""
+
+import statistics
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.template import engines
+from django.test import RequestFactory
+
+from core import views
+
+
+PAGINAS = [
+    ('dashboard.html', '/', views.dashboard_view),
+    ('clientes/listar.html', '/clientes/', views.cliente_listar),
+    ('mascotas/listar.html', '/mascotas/', views.mascota_listar),
+    ('citas/listar.html', '/citas/', views.cita_listar),
+    ('usuarios/listar.html', '/usuarios/', views.usuario_listar),
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark de render de dashboard.html y los listados'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeticiones', type=int, default=50,
+            help='Renders por página y configuración (default: 50)'
+        )
+        parser.add_argument('--usuario', help='Email del usuario con el que se renderiza (default: el primero activo)')
+
+    def handle(self, *args, **options):
+        repeticiones = options['repeticiones']
+        if repeticiones < 1:
+            raise CommandError('--repeticiones debe ser mayor que cero')
+
+        Usuario = get_user_model()
+        usuarios = Usuario.objects.filter(is_active=True)
+        if options['usuario']:
+            usuarios = usuarios.filter(email=options['usuario'])
+        usuario = usuarios.order_by('pk').first()
+        if usuario is None:
+            raise CommandError('No hay un usuario activo para renderizar las páginas')
+
+        loader = engines['django'].engine.template_loaders[0]
+        if not hasattr(loader, 'reset'):
+            raise CommandError('El loader de plantillas no es django.template.loaders.cached.Loader')
+
+        factory = RequestFactory()
+
+        def servir(url, vista, antes=None):
+            tiempos = []
+            for _ in range(repeticiones):
+                if antes:
+                    antes()
+                request = factory.get(url)
+                request.user = usuario
+                inicio = time.perf_counter()
+                respuesta = vista(request)
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            if respuesta.status_code != 200:
+                raise CommandError(f'{url} respondió {respuesta.status_code}')
+            return tiempos
+
+        self.stdout.write(
+            f'{"plantilla":<24}{"configuración":<16}{"media ms":>10}{"p95 ms":>10}{"KB":>8}'
+        )
+        for plantilla, url, vista in PAGINAS:
+            # Calienta el snapshot del dashboard, las versiones de las filas y el loader
+            servir(url, vista)
+
+            with mock.patch('core.context_processors.FRAGMENTOS_CACHE_TIMEOUT', 0):
+                resultados = [
+                    ('sin cache', servir(url, vista, antes=loader.reset)),
+                    ('compiladas', servir(url, vista)),
+                ]
+            resultados.append(('fragmentos', servir(url, vista)))
+
+            request = factory.get(url)
+            request.user = usuario
+            tamano = len(vista(request).content) / 1024
+            for configuracion, tiempos in resultados:
+                p95 = sorted(tiempos)[max(0, int(len(tiempos) * 0.95) - 1)]
+                self.stdout.write(
+                    f'{plantilla:<24}{configuracion:<16}'
+                    f'{statistics.mean(tiempos):>10.2f}{p95:>10.2f}{tamano:>8.1f}'
+                )
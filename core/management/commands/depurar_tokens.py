@@ -0,0 +1,56 @@
+"""
+Borra los refresh tokens vencidos de las tablas de simplejwt
+
+Uso:
+    python manage.py depurar_tokens
+    python manage.py depurar_tokens --lote 5000
+
+Con la rotación activa cada refresh agrega un token pendiente y bloquea el
+anterior, así que las tablas crecen sin límite. Un token vencido ya no pasa
+la verificación de exp, por lo que sus filas se pueden borrar. Se borra por
+lotes de ids para no bloquear las tablas en una sola transacción larga (a
+diferencia de flushexpiredtokens). Conviene correrlo a diario por cron.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from core.lista_negra import lista_negra
+
+
+class Command(BaseCommand):
+    help = 'Borra por lotes los tokens JWT vencidos y sus entradas en la lista negra'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote', type=int, default=2000,
+            help='Tokens por lote (default: 2000)'
+        )
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        if lote < 1:
+            raise CommandError('--lote debe ser mayor que cero')
+
+        ahora = timezone.now()
+        pendientes = bloqueados = 0
+        ultimo = 0
+        while True:
+            ids = list(
+                OutstandingToken.objects.filter(pk__gt=ultimo, expires_at__lte=ahora)
+                .order_by('pk').values_list('pk', flat=True)[:lote]
+            )
+            if not ids:
+                break
+
+            with transaction.atomic():
+                bloqueados += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+                pendientes += OutstandingToken.objects.filter(pk__in=ids).delete()[0]
+            ultimo = ids[-1]
+
+        lista_negra.sincronizar()
+        self.stdout.write(self.style.SUCCESS(
+            f'{pendientes} tokens vencidos borrados ({bloqueados} en lista negra)'
+        ))
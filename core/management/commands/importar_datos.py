@@ -0,0 +1,256 @@
+"""
+Importación masiva de datos de una clínica desde archivos CSV o NDJSON
+
+Uso:
+    python manage.py importar_datos --clientes clientes.csv --mascotas mascotas.csv \
+        --citas citas.ndjson --consultas consultas.csv --vacunas vacunas.csv
+
+Los archivos se procesan en orden de dependencias. Las relaciones se indican
+con claves naturales en lugar de ids:
+
+    mascotas:   cliente_dni
+    citas:      cliente_dni, mascota_nombre, veterinario_email
+    consultas:  cliente_dni, mascota_nombre, veterinario_email, cita_fecha_hora
+    vacunas:    cliente_dni, mascota_nombre, veterinario_email (opcional)
+
+El resto de las columnas deben llamarse como los campos del modelo.
+El avance de cada archivo se guarda en ProgresoImportacion dentro de la
+transacción del lote, así un lote y su avance se confirman juntos. Si la
+importación se interrumpe, volver a ejecutar el mismo comando continúa
+desde el último lote confirmado sin repetir filas.
+"""
+
+import csv
+import itertools
+import json
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+from django.utils import timezone
+
+from core.lotes import crear_lote
+from core.models import Usuario, Cliente, Mascota, Cita, Consulta, Vacuna, ProgresoImportacion
+from core.signals import cambios_masivos
+from core.telefonos import normalizar_telefono
+
+
+# Columnas de clave natural: no son campos del modelo
+COLUMNAS_RELACION = {
+    'cliente_dni', 'mascota_nombre', 'veterinario_email', 'cita_fecha_hora',
+}
+
+
+class FilaInvalida(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Importa clientes, mascotas, citas, consultas y vacunas desde CSV/NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', help='Archivo de clientes')
+        parser.add_argument('--mascotas', help='Archivo de mascotas')
+        parser.add_argument('--citas', help='Archivo de citas')
+        parser.add_argument('--consultas', help='Archivo de consultas')
+        parser.add_argument('--vacunas', help='Archivo de vacunas')
+        parser.add_argument(
+            '--lote', type=int, default=5000,
+            help='Filas por INSERT/transacción (default: 5000)'
+        )
+        parser.add_argument(
+            '--reiniciar', action='store_true',
+            help='Ignorar el progreso guardado y empezar desde la primera fila'
+        )
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('--lote debe ser mayor que cero')
+
+        etapas = [
+            ('clientes', Cliente, self.resolver_cliente),
+            ('mascotas', Mascota, self.resolver_mascota),
+            ('citas', Cita, self.resolver_cita),
+            ('consultas', Consulta, self.resolver_consulta),
+            ('vacunas', Vacuna, self.resolver_vacuna),
+        ]
+        if not any(options[nombre] for nombre, _, _ in etapas):
+            raise CommandError('Indique al menos un archivo (--clientes, --mascotas, ...)')
+
+        for nombre, model, resolver in etapas:
+            archivo = options[nombre]
+            if not archivo:
+                continue
+            ruta = Path(archivo)
+            if not ruta.exists():
+                raise CommandError(f'No existe el archivo {ruta}')
+            self.importar(nombre, model, resolver, ruta, options['lote'], options['reiniciar'])
+
+    # ---------------------------------------------
+    # Lectura y carga por lotes
+    # ---------------------------------------------
+
+    def leer_filas(self, ruta):
+        """Itera las filas del archivo como dicts sin cargarlo completo"""
+        with ruta.open(encoding='utf-8-sig', newline='') as archivo:
+            if ruta.suffix.lower() in ('.ndjson', '.jsonl'):
+                for linea in archivo:
+                    if linea.strip():
+                        yield json.loads(linea)
+            else:
+                yield from csv.DictReader(archivo)
+
+    def importar(self, nombre, model, resolver, ruta, tamano_lote, reiniciar):
+        progreso, _ = ProgresoImportacion.objects.get_or_create(
+            etapa=nombre, archivo=str(ruta.resolve())
+        )
+        if reiniciar:
+            progreso.filas = 0
+        procesadas = progreso.filas
+        if procesadas:
+            self.stdout.write(f'{nombre}: continuando desde la fila {procesadas + 1}')
+
+        self.cargar_mapas(nombre)
+        campos = self.campos_importables(model)
+
+        filas = itertools.islice(self.leer_filas(ruta), procesadas, None)
+        insertadas = errores = 0
+        while True:
+            lote = list(itertools.islice(filas, tamano_lote))
+            if not lote:
+                break
+
+            objetos = []
+            for numero, fila in enumerate(lote, start=procesadas + 1):
+                try:
+                    datos = self.convertir(fila, campos)
+                    datos.update(resolver(fila))
+                    objetos.append(model(**datos))
+                except (FilaInvalida, ValidationError, ValueError) as e:
+                    errores += 1
+                    self.stderr.write(f'{nombre} fila {numero}: {e}')
+
+            with transaction.atomic():
+                crear_lote(model, objetos, ignore_conflicts=model is Cliente)
+                progreso.filas = procesadas + len(lote)
+                progreso.save(update_fields=['filas', 'fecha_actualizacion'])
+            cambios_masivos.send(sender=model, instancias=objetos)
+
+            procesadas += len(lote)
+            insertadas += len(objetos)
+            self.stdout.write(f'{nombre}: {procesadas} filas procesadas')
+
+        progreso.delete()
+        self.stdout.write(self.style.SUCCESS(
+            f'{nombre}: {insertadas} filas válidas cargadas, {errores} con errores'
+        ))
+
+    def campos_importables(self, model):
+        """Campos concretos no relacionales que pueden venir en el archivo"""
+        return {
+            f.name: f for f in model._meta.concrete_fields
+            if not f.is_relation and not f.primary_key
+        }
+
+    def convertir(self, fila, campos):
+        datos = {}
+        for columna, valor in fila.items():
+            if columna in COLUMNAS_RELACION:
+                continue
+            field = campos.get(columna)
+            if field is None:
+                raise FilaInvalida(f'columna desconocida "{columna}"')
+            if valor in ('', None):
+                if field.null:
+                    datos[columna] = None
+                continue
+            valor = field.to_python(valor)
+            if isinstance(field, models.DateTimeField) and timezone.is_naive(valor):
+                valor = timezone.make_aware(valor)
+            datos[columna] = valor
+        return datos
+
+    # ---------------------------------------------
+    # Mapas de claves naturales
+    # ---------------------------------------------
+
+    def cargar_mapas(self, etapa):
+        """
+        Arma en memoria los mapas clave natural -> id que necesita la etapa.
+        Se recargan al comenzar cada etapa porque la anterior pudo agregar filas.
+        """
+        if etapa == 'clientes':
+            return
+        self.clientes = dict(
+            Cliente.objects.exclude(dni=None).values_list('dni', 'id').iterator()
+        )
+        if etapa == 'mascotas':
+            return
+        self.mascotas = {
+            (cliente_id, nombre): mascota_id
+            for mascota_id, cliente_id, nombre in
+            Mascota.objects.values_list('id', 'cliente_id', 'nombre').iterator()
+        }
+        self.veterinarios = dict(Usuario.objects.values_list('email', 'id'))
+        if etapa == 'consultas':
+            self.citas = {
+                (mascota_id, fecha_hora): cita_id
+                for cita_id, mascota_id, fecha_hora in
+                Cita.objects.values_list('id', 'mascota_id', 'fecha_hora').iterator()
+            }
+
+    def _cliente_id(self, fila):
+        dni = fila.get('cliente_dni')
+        if dni not in self.clientes:
+            raise FilaInvalida(f'no existe el cliente con DNI "{dni}"')
+        return self.clientes[dni]
+
+    def _mascota_id(self, fila):
+        clave = (self._cliente_id(fila), fila.get('mascota_nombre'))
+        if clave not in self.mascotas:
+            raise FilaInvalida(f'no existe la mascota "{fila.get("mascota_nombre")}"')
+        return self.mascotas[clave]
+
+    def _veterinario_id(self, fila, requerido=True):
+        email = fila.get('veterinario_email')
+        if not email and not requerido:
+            return None
+        if email not in self.veterinarios:
+            raise FilaInvalida(f'no existe el usuario "{email}"')
+        return self.veterinarios[email]
+
+    def resolver_cliente(self, fila):
+        # bulk_create no pasa por Cliente.save()
+        return {'telefono_normalizado': normalizar_telefono(fila.get('telefono'))}
+
+    def resolver_mascota(self, fila):
+        return {'cliente_id': self._cliente_id(fila)}
+
+    def resolver_cita(self, fila):
+        return {
+            'mascota_id': self._mascota_id(fila),
+            'veterinario_id': self._veterinario_id(fila),
+        }
+
+    def resolver_consulta(self, fila):
+        mascota_id = self._mascota_id(fila)
+        fecha_hora = Cita._meta.get_field('fecha_hora').to_python(fila.get('cita_fecha_hora'))
+        if fecha_hora is None:
+            raise FilaInvalida('falta cita_fecha_hora')
+        if timezone.is_naive(fecha_hora):
+            fecha_hora = timezone.make_aware(fecha_hora)
+        cita_id = self.citas.get((mascota_id, fecha_hora))
+        if cita_id is None:
+            raise FilaInvalida(f'no existe la cita del {fila.get("cita_fecha_hora")}')
+        return {
+            'mascota_id': mascota_id,
+            'veterinario_id': self._veterinario_id(fila),
+            'cita_id': cita_id,
+        }
+
+    def resolver_vacuna(self, fila):
+        return {
+            'mascota_id': self._mascota_id(fila),
+            'veterinario_id': self._veterinario_id(fila, requerido=False),
+        }
@@ -0,0 +1,57 @@
+"""
+Completa telefono_normalizado de los clientes
+
+Uso:
+    python manage.py normalizar_telefonos
+    python manage.py normalizar_telefonos --lote 5000
+
+Cliente.save() lo mantiene al día; este comando es para los clientes que ya
+existían al agregar la columna, o después de cambiar TELEFONO_CODIGO_PAIS.
+Solo escribe las filas cuyo valor cambia.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Cliente
+from core.telefonos import normalizar_telefono
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el teléfono normalizado de todos los clientes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote', type=int, default=2000,
+            help='Clientes por lote (default: 2000)'
+        )
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        if lote < 1:
+            raise CommandError('--lote debe ser mayor que cero')
+
+        revisados = actualizados = 0
+        ultimo = 0
+        while True:
+            clientes = list(
+                Cliente.objects.filter(pk__gt=ultimo).order_by('pk')
+                .only('pk', 'telefono', 'telefono_normalizado')[:lote]
+            )
+            if not clientes:
+                break
+
+            cambiados = []
+            for cliente in clientes:
+                normalizado = normalizar_telefono(cliente.telefono)
+                if cliente.telefono_normalizado != normalizado:
+                    cliente.telefono_normalizado = normalizado
+                    cambiados.append(cliente)
+            Cliente.objects.bulk_update(cambiados, ['telefono_normalizado'])
+
+            revisados += len(clientes)
+            actualizados += len(cambiados)
+            ultimo = clientes[-1].pk
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{revisados} clientes revisados, {actualizados} teléfonos actualizados'
+        ))
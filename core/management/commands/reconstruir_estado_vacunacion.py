@@ -0,0 +1,50 @@
+"""
+Reconstruye la tabla vacunacion_estado a partir de las vacunas
+
+Uso:
+    python manage.py reconstruir_estado_vacunacion
+    python manage.py reconstruir_estado_vacunacion --lote 500
+
+Normalmente la tabla se mantiene sola con las señales de Vacuna. Este
+comando sirve para la carga inicial o si se modificaron vacunas con SQL
+directo. Puede ejecutarse con el sistema en uso: procesa las mascotas por
+lotes y cada lote se recalcula en su propia transacción.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Mascota, EstadoVacunacion
+from core.vacunacion import recalcular_estado_vacunacion
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el estado de vacunación precalculado de todas las mascotas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote', type=int, default=1000,
+            help='Mascotas por lote (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        if lote < 1:
+            raise CommandError('--lote debe ser mayor que cero')
+
+        # Filas de mascotas que ya no existen no quedan: la FK es CASCADE
+        procesadas = 0
+        ultimo = 0
+        while True:
+            ids = list(
+                Mascota.objects.filter(id__gt=ultimo).order_by('id').values_list('id', flat=True)[:lote]
+            )
+            if not ids:
+                break
+            recalcular_estado_vacunacion(ids)
+            procesadas += len(ids)
+            ultimo = ids[-1]
+            self.stdout.write(f'  {procesadas} mascotas procesadas')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Estado de vacunación reconstruido: {EstadoVacunacion.objects.count()} filas'
+        ))
@@ -0,0 +1,60 @@
+"""
+Reconstruye el índice de búsqueda de clientes y mascotas
+
+Uso:
+    python manage.py reconstruir_indice_busqueda
+    python manage.py reconstruir_indice_busqueda --tipo mascota --lote 2000
+
+Normalmente el índice se mantiene solo con las señales de Cliente y
+Mascota. Este comando sirve para la carga inicial, después de cambiar la
+normalización o los campos indexados, o si se modificaron datos con SQL
+directo. Procesa los registros por lotes en orden de id.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.busqueda import INDICES, indexar
+from core.models import IndiceBusqueda
+
+
+class Command(BaseCommand):
+    help = 'Regenera el índice de búsqueda de clientes y mascotas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tipo', choices=list(INDICES), action='append',
+            help='Tipo a reconstruir; se puede repetir (default: todos)'
+        )
+        parser.add_argument(
+            '--lote', type=int, default=1000,
+            help='Registros por lote (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        if lote < 1:
+            raise CommandError('--lote debe ser mayor que cero')
+
+        for tipo in options['tipo'] or list(INDICES):
+            model = INDICES[tipo]['model']
+            # Quita filas de registros que ya no existen
+            IndiceBusqueda.objects.filter(tipo=tipo).exclude(
+                objeto_id__in=model.objects.values('pk')
+            ).delete()
+
+            procesados = 0
+            ultimo = 0
+            while True:
+                ids = list(
+                    model.objects.filter(pk__gt=ultimo).order_by('pk').values_list('pk', flat=True)[:lote]
+                )
+                if not ids:
+                    break
+                indexar(tipo, ids)
+                procesados += len(ids)
+                ultimo = ids[-1]
+
+            self.stdout.write(self.style.SUCCESS(
+                f'{tipo}: {procesados} registros indexados, '
+                f'{IndiceBusqueda.objects.filter(tipo=tipo).count()} tokens'
+            ))
@@ -0,0 +1,70 @@
+"""
+Genera y envía los recordatorios de vacunación
+
+Uso:
+    python manage.py recordatorios_vacunas                  # encola y envía
+    python manage.py recordatorios_vacunas --dias 15 --solo-encolar
+    python manage.py recordatorios_vacunas --sender core.recordatorios.ArchivoSender
+
+Pensado para ejecutarse periódicamente (cron). Es idempotente: una dosis
+se encola una sola vez y un recordatorio enviado no se vuelve a enviar.
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.models import RecordatorioVacuna
+from core.recordatorios import generar_recordatorios, enviar_pendientes, obtener_sender
+
+
+class Command(BaseCommand):
+    help = 'Encola y envía recordatorios de vacunas próximas a vencer'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias', type=int, default=30,
+            help='Avisar las dosis que vencen en los próximos N días (default: 30)'
+        )
+        parser.add_argument(
+            '--atrasadas', type=int, default=0,
+            help='Incluir también dosis vencidas hace hasta N días (default: 0)'
+        )
+        parser.add_argument(
+            '--lote', type=int, default=1000,
+            help='Vacunas leídas por consulta al generar la cola (default: 1000)'
+        )
+        parser.add_argument('--sender', help='Ruta de la clase sender (default: RECORDATORIOS_SENDER)')
+        parser.add_argument('--solo-encolar', action='store_true', help='No enviar, solo generar la cola')
+        parser.add_argument('--solo-enviar', action='store_true', help='No generar, solo enviar la cola')
+        parser.add_argument(
+            '--reintentar-errores', action='store_true',
+            help='Volver a poner en cola los recordatorios que fallaron'
+        )
+
+    def handle(self, *args, **options):
+        if options['solo_encolar'] and options['solo_enviar']:
+            raise CommandError('--solo-encolar y --solo-enviar son excluyentes')
+        if options['lote'] < 1:
+            raise CommandError('--lote debe ser mayor que cero')
+
+        if not options['solo_enviar']:
+            hoy = timezone.localdate()
+            desde = hoy - timedelta(days=options['atrasadas'])
+            hasta = hoy + timedelta(days=options['dias'])
+            revisadas, encoladas = generar_recordatorios(desde, hasta, options['lote'])
+            self.stdout.write(f'{revisadas} dosis revisadas, {encoladas} recordatorios nuevos')
+
+        if options['solo_encolar']:
+            return
+
+        if options['reintentar_errores']:
+            reintentos = RecordatorioVacuna.objects.filter(estado='error').update(estado='pendiente')
+            self.stdout.write(f'{reintentos} recordatorios con error vuelven a la cola')
+
+        sender = obtener_sender(options['sender'])
+        enviados, errores = enviar_pendientes(sender)
+        self.stdout.write(self.style.SUCCESS(
+            f'Avisos enviados: {enviados} clientes, {errores} con error'
+        ))
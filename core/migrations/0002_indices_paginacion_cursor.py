@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='cita',
+            name='citas_fecha_h_d81c1c_idx',
+        ),
+        migrations.AddIndex(
+            model_name='cita',
+            index=models.Index(fields=['fecha_hora', 'id'], name='citas_fecha_h_559181_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consulta',
+            index=models.Index(fields=['fecha_consulta', 'id'], name='consultas_fecha_c_d59971_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacuna',
+            index=models.Index(fields=['fecha_aplicacion', 'id'], name='vacunas_fecha_a_c32506_idx'),
+        ),
+    ]
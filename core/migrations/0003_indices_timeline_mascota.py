@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_indices_paginacion_cursor'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cita',
+            index=models.Index(fields=['mascota', '-fecha_hora'], name='citas_mascota_cdcd22_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacuna',
+            index=models.Index(fields=['mascota', '-fecha_aplicacion'], name='vacunas_mascota_bab45b_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_indices_timeline_mascota'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecordatorioVacuna',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('proxima_dosis', models.DateField()),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('enviado', 'Enviado'), ('error', 'Error')], default='pendiente', max_length=20)),
+                ('intentos', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_envio', models.DateTimeField(blank=True, null=True)),
+                ('cliente', models.ForeignKey(db_column='cliente_id', on_delete=django.db.models.deletion.CASCADE, related_name='recordatorios_vacunas', to='core.cliente')),
+                ('vacuna', models.ForeignKey(db_column='vacuna_id', on_delete=django.db.models.deletion.CASCADE, related_name='recordatorios', to='core.vacuna')),
+            ],
+            options={
+                'verbose_name': 'Recordatorio de Vacuna',
+                'verbose_name_plural': 'Recordatorios de Vacunas',
+                'db_table': 'recordatorios_vacunas',
+                'ordering': ['proxima_dosis'],
+                'indexes': [models.Index(fields=['estado', 'cliente'], name='recordatori_estado_5f4efc_idx')],
+                'constraints': [models.UniqueConstraint(fields=('vacuna', 'proxima_dosis'), name='recordatorio_unico_por_dosis')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_recordatorios_vacunas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadoVacunacion',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('tipo_vacuna', models.CharField(max_length=100)),
+                ('fecha_aplicacion', models.DateField()),
+                ('proxima_dosis', models.DateField(blank=True, null=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('mascota', models.ForeignKey(db_column='mascota_id', on_delete=django.db.models.deletion.CASCADE, related_name='estado_vacunacion', to='core.mascota')),
+                ('ultima_vacuna', models.ForeignKey(db_column='ultima_vacuna_id', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.vacuna')),
+            ],
+            options={
+                'verbose_name': 'Estado de Vacunación',
+                'verbose_name_plural': 'Estado de Vacunación',
+                'db_table': 'vacunacion_estado',
+                'ordering': ['mascota', 'tipo_vacuna'],
+                'indexes': [models.Index(fields=['proxima_dosis'], name='vacunacion__proxima_f495ed_idx')],
+                'constraints': [models.UniqueConstraint(fields=('mascota', 'tipo_vacuna'), name='estado_vacunacion_unico')],
+            },
+        ),
+    ]
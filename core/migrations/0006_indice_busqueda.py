@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_estado_vacunacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndiceBusqueda',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('tipo', models.CharField(max_length=10)),
+                ('objeto_id', models.IntegerField()),
+                ('token', models.CharField(max_length=60)),
+                ('peso', models.SmallIntegerField(default=1)),
+            ],
+            options={
+                'verbose_name': 'Índice de Búsqueda',
+                'verbose_name_plural': 'Índice de Búsqueda',
+                'db_table': 'indice_busqueda',
+                'indexes': [models.Index(fields=['tipo', 'token', 'objeto_id'], name='indice_busqueda_token'), models.Index(fields=['tipo', 'objeto_id'], name='indice_busqueda_objeto')],
+            },
+        ),
+    ]
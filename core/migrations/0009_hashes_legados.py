@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:02
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, identify_hasher, make_password
+from django.db import migrations
+
+
+PREFIJOS_BCRYPT = ('$2y$', '$2a$', '$2b$')
+
+
+def migrar_hashes(apps, schema_editor):
+    """
+    Los hashes bcrypt de PHP pasan al formato de BCryptLegadoPasswordHasher.
+    Las contraseñas que usuario_crear guardó en texto plano se hashean.
+    """
+    Usuario = apps.get_model('core', 'Usuario')
+    for usuario in Usuario.objects.only('pk', 'password').iterator():
+        password = usuario.password
+        if not password or password.startswith(UNUSABLE_PASSWORD_PREFIX):
+            continue
+        if password.startswith(PREFIJOS_BCRYPT):
+            usuario.password = 'bcrypt_php$' + password
+        else:
+            try:
+                identify_hasher(password)
+                continue
+            except ValueError:
+                usuario.password = make_password(password)
+        usuario.save(update_fields=['password'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_indices_listados'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrar_hashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_hashes_legados'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgresoImportacion',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('etapa', models.CharField(max_length=20)),
+                ('archivo', models.CharField(max_length=255)),
+                ('filas', models.PositiveIntegerField(default=0)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Progreso de Importación',
+                'verbose_name_plural': 'Progreso de Importación',
+                'db_table': 'importacion_progreso',
+                'constraints': [models.UniqueConstraint(fields=('etapa', 'archivo'), name='progreso_importacion_unico')],
+            },
+        ),
+    ]
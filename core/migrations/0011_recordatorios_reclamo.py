@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_progreso_importacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recordatoriovacuna',
+            name='fecha_reclamo',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='recordatoriovacuna',
+            name='estado',
+            field=models.CharField(choices=[('pendiente', 'Pendiente'), ('enviando', 'Enviando'), ('enviado', 'Enviado'), ('error', 'Error')], default='pendiente', max_length=20),
+        ),
+    ]
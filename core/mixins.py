@@ -0,0 +1,327 @@
+"""
+Mixins para los ViewSets del Sistema Veterinaria
+"""
+
+import csv
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .lotes import crear_lote
+from .signals import cambios_masivos
+
+
+# =============================================
+# PLANIFICACIÓN DE select_related / prefetch_related
+# =============================================
+
+_planes = {}
+
+
+def _recorrer_source(model, source_attrs):
+    """
+    Recorre un source con puntos (ej. 'mascota.cliente.nombre_completo') y
+    devuelve (relaciones, multiple): las relaciones que atraviesa y si alguna
+    de ellas es a-muchos.
+    """
+    relaciones, multiple = [], False
+    for attr in source_attrs:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            # Propiedad o método (nombre_completo, get_especie_display...)
+            break
+        if not field.is_relation:
+            break
+        relaciones.append(attr)
+        multiple = multiple or field.one_to_many or field.many_to_many
+        model = field.related_model
+    return relaciones, multiple
+
+
+def _recolectar(serializer, model, prefijo, en_prefetch, select, prefetch):
+    for field in serializer.fields.values():
+        if field.source == '*':
+            continue
+
+        relaciones, multiple = _recorrer_source(model, field.source_attrs)
+        if not relaciones:
+            continue
+
+        anidado = field.child if isinstance(field, serializers.ListSerializer) else field
+        es_anidado = isinstance(anidado, serializers.ModelSerializer)
+
+        # Un FK simple ('mascota') se serializa con la columna *_id y no necesita JOIN
+        if len(field.source_attrs) == len(relaciones) and not (es_anidado or multiple):
+            continue
+
+        ruta = prefijo + '__'.join(relaciones)
+        if en_prefetch or multiple:
+            prefetch.add(ruta)
+        else:
+            select.add(ruta)
+
+        if es_anidado:
+            _recolectar(anidado, anidado.Meta.model, ruta + '__',
+                        en_prefetch or multiple, select, prefetch)
+
+
+def planificar_relaciones(serializer_class):
+    """
+    Devuelve (select_related, prefetch_related) a partir de los source= con
+    puntos del serializer. El resultado se guarda por clase de serializer.
+    """
+    if serializer_class not in _planes:
+        select, prefetch = set(), set()
+        _recolectar(serializer_class(), serializer_class.Meta.model, '', False, select, prefetch)
+        # Las rutas contenidas en otras más largas son redundantes
+        select = {r for r in select if not any(o.startswith(r + '__') for o in select)}
+        _planes[serializer_class] = (sorted(select), sorted(prefetch))
+    return _planes[serializer_class]
+
+
+def aplicar_relaciones(queryset, serializer_class):
+    """Aplica al queryset el plan de relaciones del serializer"""
+    select, prefetch = planificar_relaciones(serializer_class)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+class RelacionesAutomaticasMixin:
+    """
+    Agrega a get_queryset() los select_related/prefetch_related que necesita
+    el serializer, deducidos de sus campos con source= en notación de puntos.
+
+    Las subclases que redefinen get_queryset() deben partir de
+    super().get_queryset() para conservar el plan.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        serializer_class = getattr(cls, 'serializer_class', None)
+        if serializer_class is not None:
+            planificar_relaciones(serializer_class)
+
+    def get_queryset(self):
+        return aplicar_relaciones(super().get_queryset(), self.get_serializer_class())
+
+
+# =============================================
+# EXPORTACIÓN EN STREAMING (NDJSON / CSV)
+# =============================================
+
+class _Eco:
+    """Pseudo-buffer para csv.writer: devuelve la línea en lugar de guardarla"""
+
+    def write(self, valor):
+        return valor
+
+
+def por_lotes(queryset, tamano):
+    """Recorre el queryset en orden de pk con una consulta por lote"""
+    queryset = queryset.order_by('pk')
+    ultimo = None
+    while True:
+        lote = queryset if ultimo is None else queryset.filter(pk__gt=ultimo)
+        lote = list(lote[:tamano])
+        yield from lote
+        if len(lote) < tamano:
+            return
+        ultimo = lote[-1].pk
+
+
+class ExportacionMixin:
+    """
+    Agrega la acción GET .../export/?formato=ndjson|csv, que recorre el
+    queryset filtrado por lotes de export_chunk_size filas en orden de id
+    (keyset: id > último id del lote anterior) y envía las filas a medida
+    que se serializan. No se usa .iterator(): con MySQLdb el cursor por
+    defecto trae todo el resultado a memoria antes de la primera fila. La
+    memoria usada depende del tamaño del lote, no de la cantidad de filas.
+    """
+    export_chunk_size = 2000
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Exportar todos los registros filtrados en NDJSON (por defecto) o CSV"""
+        formato = request.query_params.get('formato', 'ndjson')
+        if formato not in ('ndjson', 'csv'):
+            raise serializers.ValidationError({'formato': 'Use ndjson o csv'})
+
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer()
+        filas = (
+            serializer.to_representation(obj)
+            for obj in por_lotes(queryset, self.export_chunk_size)
+        )
+
+        nombre = self.basename if hasattr(self, 'basename') else 'export'
+        if formato == 'csv':
+            contenido = self._filas_csv(filas, list(serializer.fields))
+            content_type = 'text/csv; charset=utf-8'
+        else:
+            contenido = (json.dumps(fila, cls=JSONEncoder, ensure_ascii=False) + '\n' for fila in filas)
+            content_type = 'application/x-ndjson'
+
+        response = StreamingHttpResponse(contenido, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{nombre}.{formato}"'
+        return response
+
+    def _filas_csv(self, filas, columnas):
+        writer = csv.DictWriter(_Eco(), fieldnames=columnas, extrasaction='ignore')
+        yield writer.writeheader()
+        for fila in filas:
+            yield writer.writerow(fila)
+
+
+# =============================================
+# ALTAS Y MODIFICACIONES MASIVAS
+# =============================================
+
+class OperacionesMasivasMixin:
+    """
+    Agrega la acción .../bulk/ que recibe una lista de objetos:
+        POST   crea todos los objetos (bulk_create)
+        PATCH  actualiza objetos existentes; cada item debe incluir "id" (bulk_update)
+
+    El lote se valida completo antes de escribir. Las claves foráneas se
+    resuelven con una consulta IN por modelo relacionado y la escritura se
+    hace en una sola transacción. Si algún item es inválido no se guarda
+    nada y la respuesta (400) lista los errores por índice.
+    """
+    bulk_max_items = 500
+    bulk_batch_size = 200
+
+    def get_bulk_save_kwargs(self):
+        """Valores fijos que se asignan a cada objeto (equivalente a perform_create)"""
+        return {}
+
+    def preparar_actualizacion(self, instancia, datos):
+        """Se llama con cada objeto del PATCH antes de aplicarle los cambios"""
+
+    def guardar_lote(self, model, objetos, campos=None):
+        """
+        Escribe el lote en una transacción: bulk_create si campos es None,
+        si no bulk_update de esos campos. Las subclases pueden extenderlo
+        para validar o bloquear antes de escribir. Las altas quedan con su
+        id también en MySQL (ver core/lotes.py).
+        """
+        with transaction.atomic():
+            if campos is None:
+                return crear_lote(model, objetos, batch_size=self.bulk_batch_size)
+            model.objects.bulk_update(objetos, campos, batch_size=self.bulk_batch_size)
+            return objetos
+
+    @action(detail=False, methods=['post', 'patch'])
+    def bulk(self, request):
+        """Crear (POST) o actualizar (PATCH) una lista de objetos"""
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise serializers.ValidationError({'detail': 'Se espera una lista de objetos'})
+        if len(items) > self.bulk_max_items:
+            raise serializers.ValidationError(
+                {'detail': f'Máximo {self.bulk_max_items} objetos por lote'}
+            )
+        if any(not isinstance(item, dict) for item in items):
+            raise serializers.ValidationError({'detail': 'Cada item debe ser un objeto'})
+
+        if request.method == 'PATCH':
+            return self._bulk_actualizar(items)
+        return self._bulk_crear(items)
+
+    def _contexto_bulk(self, items):
+        """Contexto del serializer con las relaciones del lote ya resueltas"""
+        contexto = self.get_serializer_context()
+        contexto['ahora'] = timezone.now()
+        contexto['precargados'] = {}
+
+        for nombre, field in self.get_serializer().fields.items():
+            if field.read_only or not isinstance(field, serializers.PrimaryKeyRelatedField):
+                continue
+            pk_field = field.get_queryset().model._meta.pk
+            pks = set()
+            for item in items:
+                valor = item.get(nombre)
+                if valor in (None, ''):
+                    continue
+                try:
+                    pks.add(pk_field.to_python(valor))
+                except (DjangoValidationError, TypeError, ValueError):
+                    continue
+            contexto['precargados'][nombre] = field.get_queryset().in_bulk(pks)
+        return contexto
+
+    def _validar_lote(self, items, instancias=None, claves=None):
+        """Valida cada item; devuelve (serializers válidos, errores por índice)"""
+        contexto = self._contexto_bulk(items)
+        validos, errores = [], []
+        for indice, item in enumerate(items):
+            instancia = None
+            if instancias is not None:
+                instancia = instancias.get(claves[indice])
+                if instancia is None:
+                    errores.append({'indice': indice, 'errores': {'id': ['No encontrado']}})
+                    continue
+            serializer = self.get_serializer_class()(
+                instancia, data=item, partial=instancia is not None, context=contexto
+            )
+            if serializer.is_valid():
+                validos.append(serializer)
+            else:
+                errores.append({'indice': indice, 'errores': serializer.errors})
+        return validos, errores
+
+    def _bulk_crear(self, items):
+        validos, errores = self._validar_lote(items)
+        if errores:
+            return Response({'errores': errores}, status=status.HTTP_400_BAD_REQUEST)
+
+        model = self.get_queryset().model
+        extra = self.get_bulk_save_kwargs()
+        objetos = [model(**{**s.validated_data, **extra}) for s in validos]
+        objetos = self.guardar_lote(model, objetos)
+        cambios_masivos.send(sender=model, instancias=objetos)
+
+        data = self.get_serializer(objetos, many=True).data
+        return Response({'total': len(objetos), 'resultados': data}, status=status.HTTP_201_CREATED)
+
+    def _bulk_actualizar(self, items):
+        pk_field = self.get_queryset().model._meta.pk
+        claves = []
+        for item in items:
+            try:
+                claves.append(pk_field.to_python(item.get('id')))
+            except (DjangoValidationError, TypeError, ValueError):
+                claves.append(None)
+        instancias = self.get_queryset().in_bulk([pk for pk in claves if pk is not None])
+
+        validos, errores = self._validar_lote(items, instancias, claves)
+        if errores:
+            return Response({'errores': errores}, status=status.HTTP_400_BAD_REQUEST)
+
+        campos = set()
+        objetos = []
+        for s in validos:
+            self.preparar_actualizacion(s.instance, s.validated_data)
+            for attr, valor in s.validated_data.items():
+                setattr(s.instance, attr, valor)
+                campos.add(attr)
+            objetos.append(s.instance)
+
+        model = self.get_queryset().model
+        if campos:
+            self.guardar_lote(model, objetos, sorted(campos))
+            cambios_masivos.send(sender=model, instancias=objetos)
+
+        data = self.get_serializer(objetos, many=True).data
+        return Response({'total': len(objetos), 'resultados': data}, status=status.HTTP_200_OK)
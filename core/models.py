@@ -7,6 +7,8 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils import timezone
 
+from .telefonos import normalizar_telefono
+
 
 # =============================================
 # CUSTOM USER MANAGER
@@ -90,6 +92,18 @@ class Usuario(AbstractBaseUser, PermissionsMixin):
 # MODELO: CLIENTE
 # =============================================
 
+class ClienteQuerySet(models.QuerySet):
+    """QuerySet con anotaciones frecuentes para listados de clientes"""
+    
+    def con_total_mascotas(self):
+        """Anota la cantidad de mascotas activas en la misma consulta"""
+        return self.annotate(
+            total_mascotas_activas=models.Count(
+                'mascotas', filter=models.Q(mascotas__estado='activo')
+            )
+        )
+
+
 class Cliente(models.Model):
     """Propietarios de las mascotas"""
     
@@ -99,9 +113,13 @@ class Cliente(models.Model):
     dni = models.CharField(max_length=20, unique=True, null=True, blank=True)
     email = models.EmailField(max_length=150, null=True, blank=True)
     telefono = models.CharField(max_length=20)
+    # Solo dígitos del número nacional, para buscar por el número que llama
+    telefono_normalizado = models.CharField(max_length=20, blank=True, default='', editable=False)
     direccion = models.TextField(null=True, blank=True)
     estado = models.BooleanField(default=True)
     
+    objects = ClienteQuerySet.as_manager()
+    
     class Meta:
         db_table = 'clientes'
         verbose_name = 'Cliente'
@@ -110,11 +128,20 @@ class Cliente(models.Model):
         indexes = [
             models.Index(fields=['dni']),
             models.Index(fields=['telefono']),
+            models.Index(fields=['telefono_normalizado']),
+            models.Index(fields=['apellido', 'nombre', 'id']),
         ]
     
     def __str__(self):
         return f"{self.apellido}, {self.nombre}"
     
+    def save(self, *args, **kwargs):
+        self.telefono_normalizado = normalizar_telefono(self.telefono)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'telefono' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'telefono_normalizado'}
+        super().save(*args, **kwargs)
+    
     @property
     def nombre_completo(self):
         return f"{self.nombre} {self.apellido}"
@@ -175,6 +202,7 @@ class Mascota(models.Model):
         indexes = [
             models.Index(fields=['cliente']),
             models.Index(fields=['especie']),
+            models.Index(fields=['nombre', 'id']),
         ]
     
     def __str__(self):
@@ -234,8 +262,9 @@ class Cita(models.Model):
         verbose_name_plural = 'Citas'
         ordering = ['-fecha_hora']
         indexes = [
-            models.Index(fields=['fecha_hora']),
+            models.Index(fields=['fecha_hora', 'id']),
             models.Index(fields=['veterinario', 'fecha_hora']),
+            models.Index(fields=['mascota', '-fecha_hora']),
             models.Index(fields=['estado']),
         ]
     
@@ -289,6 +318,7 @@ class Consulta(models.Model):
         indexes = [
             models.Index(fields=['mascota', '-fecha_consulta']),
             models.Index(fields=['veterinario']),
+            models.Index(fields=['fecha_consulta', 'id']),
         ]
     
     def __str__(self):
@@ -331,6 +361,8 @@ class Vacuna(models.Model):
         indexes = [
             models.Index(fields=['mascota']),
             models.Index(fields=['proxima_dosis']),
+            models.Index(fields=['fecha_aplicacion', 'id']),
+            models.Index(fields=['mascota', '-fecha_aplicacion']),
         ]
     
     def __str__(self):
@@ -341,4 +373,199 @@ class Vacuna(models.Model):
         """Verifica si la próxima dosis está vencida"""
         if self.proxima_dosis:
             return self.proxima_dosis < timezone.now().date()
-        return False
\ No newline at end of file
+        return False
+
+# =============================================
+# MODELO: RECORDATORIO DE VACUNA
+# =============================================
+
+class RecordatorioVacuna(models.Model):
+    """
+    Cola de salida de recordatorios de vacunación.
+    Hay a lo sumo un recordatorio por dosis (vacuna + fecha de próxima dosis),
+    así que volver a generar la cola nunca duplica avisos. Mientras un
+    proceso lo envía queda 'enviando', con la fecha en que lo reclamó.
+    """
+    
+    ESTADO_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('enviando', 'Enviando'),
+        ('enviado', 'Enviado'),
+        ('error', 'Error'),
+    ]
+    
+    id = models.AutoField(primary_key=True)
+    vacuna = models.ForeignKey(
+        Vacuna,
+        on_delete=models.CASCADE,
+        related_name='recordatorios',
+        db_column='vacuna_id'
+    )
+    cliente = models.ForeignKey(
+        Cliente,
+        on_delete=models.CASCADE,
+        related_name='recordatorios_vacunas',
+        db_column='cliente_id'
+    )
+    proxima_dosis = models.DateField()
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='pendiente')
+    intentos = models.IntegerField(default=0)
+    error = models.TextField(null=True, blank=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_reclamo = models.DateTimeField(null=True, blank=True)
+    fecha_envio = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'recordatorios_vacunas'
+        verbose_name = 'Recordatorio de Vacuna'
+        verbose_name_plural = 'Recordatorios de Vacunas'
+        ordering = ['proxima_dosis']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['vacuna', 'proxima_dosis'],
+                name='recordatorio_unico_por_dosis'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['estado', 'cliente']),
+        ]
+    
+    def __str__(self):
+        return f"Recordatorio: {self.vacuna.nombre_vacuna} - {self.proxima_dosis.strftime('%d/%m/%Y')}"
+
+# =============================================
+# MODELO: ESTADO DE VACUNACIÓN
+# =============================================
+
+class EstadoVacunacionQuerySet(models.QuerySet):
+    """Consultas de cobertura sobre la tabla precalculada"""
+    
+    def vencidas(self, hoy=None):
+        """Vacunas cuya próxima dosis ya pasó (rango sobre el índice de proxima_dosis)"""
+        return self.filter(proxima_dosis__lt=hoy or timezone.localdate())
+    
+    def al_dia(self, hoy=None):
+        return self.exclude(proxima_dosis__lt=hoy or timezone.localdate())
+    
+    def cobertura_por_especie(self, hoy=None):
+        """Por especie: mascotas activas con al menos una vacuna y con alguna vencida"""
+        hoy = hoy or timezone.localdate()
+        return self.filter(mascota__estado='activo').values('mascota__especie').annotate(
+            mascotas=models.Count('mascota', distinct=True),
+            mascotas_vencidas=models.Count(
+                'mascota', distinct=True, filter=models.Q(proxima_dosis__lt=hoy)
+            ),
+        ).order_by('mascota__especie')
+
+
+class EstadoVacunacion(models.Model):
+    """
+    Última aplicación de cada tipo de vacuna por mascota. La mantienen las
+    señales de Vacuna (ver core/vacunacion.py); no se edita a mano.
+    La condición de vencida depende del día, por eso se consulta sobre
+    proxima_dosis en lugar de guardarse.
+    """
+    
+    id = models.AutoField(primary_key=True)
+    mascota = models.ForeignKey(
+        Mascota,
+        on_delete=models.CASCADE,
+        related_name='estado_vacunacion',
+        db_column='mascota_id'
+    )
+    tipo_vacuna = models.CharField(max_length=100)
+    ultima_vacuna = models.ForeignKey(
+        Vacuna,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+',
+        db_column='ultima_vacuna_id'
+    )
+    fecha_aplicacion = models.DateField()
+    proxima_dosis = models.DateField(null=True, blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    
+    objects = EstadoVacunacionQuerySet.as_manager()
+    
+    class Meta:
+        db_table = 'vacunacion_estado'
+        verbose_name = 'Estado de Vacunación'
+        verbose_name_plural = 'Estado de Vacunación'
+        ordering = ['mascota', 'tipo_vacuna']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['mascota', 'tipo_vacuna'],
+                name='estado_vacunacion_unico'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['proxima_dosis']),
+        ]
+    
+    def __str__(self):
+        return f"{self.mascota_id} - {self.tipo_vacuna}"
+    
+    @property
+    def esta_vencida(self):
+        """Verifica si la próxima dosis está vencida"""
+        if self.proxima_dosis:
+            return self.proxima_dosis < timezone.now().date()
+        return False
+
+# =============================================
+# MODELO: ÍNDICE DE BÚSQUEDA
+# =============================================
+
+class IndiceBusqueda(models.Model):
+    """
+    Tokens normalizados (minúsculas, sin acentos) de clientes y mascotas.
+    Lo mantienen las señales (ver core/busqueda.py); no se edita a mano.
+    """
+    
+    id = models.AutoField(primary_key=True)
+    tipo = models.CharField(max_length=10)
+    objeto_id = models.IntegerField()
+    token = models.CharField(max_length=60)
+    peso = models.SmallIntegerField(default=1)
+    
+    class Meta:
+        db_table = 'indice_busqueda'
+        verbose_name = 'Índice de Búsqueda'
+        verbose_name_plural = 'Índice de Búsqueda'
+        indexes = [
+            models.Index(fields=['tipo', 'token', 'objeto_id'], name='indice_busqueda_token'),
+            models.Index(fields=['tipo', 'objeto_id'], name='indice_busqueda_objeto'),
+        ]
+    
+    def __str__(self):
+        return f"{self.tipo} {self.objeto_id}: {self.token}"
+
+# =============================================
+# MODELO: PROGRESO DE IMPORTACIÓN
+# =============================================
+
+class ProgresoImportacion(models.Model):
+    """
+    Filas ya confirmadas de cada archivo de importar_datos. Se actualiza en
+    la misma transacción que el lote; al terminar el archivo se borra.
+    """
+    
+    id = models.AutoField(primary_key=True)
+    etapa = models.CharField(max_length=20)
+    archivo = models.CharField(max_length=255)
+    filas = models.PositiveIntegerField(default=0)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'importacion_progreso'
+        verbose_name = 'Progreso de Importación'
+        verbose_name_plural = 'Progreso de Importación'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['etapa', 'archivo'],
+                name='progreso_importacion_unico'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.etapa} {self.archivo}: {self.filas}"
@@ -0,0 +1,238 @@
+"""
+Paginación para la API REST y las vistas HTML del Sistema Veterinaria
+"""
+
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+# =============================================
+# PAGINACIÓN POR CURSOR (keyset)
+# =============================================
+
+class FechaCursorPagination(CursorPagination):
+    """
+    Paginación por cursor sobre (fecha, id), de la más reciente a la más antigua.
+    El cursor guarda la fecha y el id del último registro de la página y la
+    siguiente se filtra con la comparación de la tupla completa, así que dos
+    registros con la misma fecha nunca caen en el mismo hueco entre páginas.
+    Cada página es una consulta por rango sobre el índice, sin COUNT(*) ni
+    OFFSET, y cuesta lo mismo la primera página que la milésima.
+
+    Los clientes que necesitan el total pueden seguir usando ?page=N, que
+    delega en PageNumberPagination.
+    """
+    ordering = ('-id',)
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        # ?ordering= puede dejar solo la fecha; el id desempata
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering[-1].lstrip('-') not in ('id', 'pk'):
+            ordering += ('-id' if ordering[0].startswith('-') else 'id',)
+        return ordering
+
+    def _get_position_from_instance(self, instance, ordering):
+        return json.dumps(_valores(instance, ordering), separators=(',', ':'))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(PageNumberPagination.page_query_param) is not None:
+            self.paginacion_por_paginas = PageNumberPagination()
+            return self.paginacion_por_paginas.paginate_queryset(queryset, request, view)
+        self.paginacion_por_paginas = None
+
+        # Igual que CursorPagination.paginate_queryset, salvo el filtro: DRF
+        # compara solo el primer campo del orden y salta los empates con OFFSET
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, posicion = False, None
+        else:
+            _, reverse, posicion = self.cursor
+
+        orden = [_invertir(campo) for campo in self.ordering] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*orden)
+        if posicion is not None:
+            valores = _posicion_a_valores(posicion, queryset.model, self.ordering)
+            if valores is None:
+                raise NotFound(self.invalid_cursor_message)
+            queryset = queryset.filter(_despues_de(orden, valores))
+
+        resultados = list(queryset[:self.page_size + 1])
+        self.page = resultados[:self.page_size]
+        hay_mas = len(resultados) > len(self.page)
+        siguiente = (
+            self._get_position_from_instance(resultados[-1], self.ordering) if hay_mas else None
+        )
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = posicion is not None
+            self.has_previous = hay_mas
+            self.next_position = posicion
+            self.previous_position = siguiente
+        else:
+            self.has_next = hay_mas
+            self.has_previous = posicion is not None
+            self.next_position = siguiente
+            self.previous_position = posicion
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_paginated_response(self, data):
+        if self.paginacion_por_paginas is not None:
+            return self.paginacion_por_paginas.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.paginacion_por_paginas is not None:
+            return self.paginacion_por_paginas.to_html()
+        return super().to_html()
+
+
+class CitaCursorPagination(FechaCursorPagination):
+    ordering = ('-fecha_hora', '-id')
+
+
+class ConsultaCursorPagination(FechaCursorPagination):
+    ordering = ('-fecha_consulta', '-id')
+
+
+class VacunaCursorPagination(FechaCursorPagination):
+    ordering = ('-fecha_aplicacion', '-id')
+
+
+class VencidasCursorPagination(FechaCursorPagination):
+    """Dosis vencidas, de la que venció hace más tiempo a la más reciente"""
+    ordering = ('proxima_dosis', 'id')
+
+
+# =============================================
+# PAGINACIÓN KEYSET PARA LAS VISTAS HTML
+# =============================================
+
+class PaginaKeyset:
+    """Una página de resultados con los cursores a la siguiente y a la anterior"""
+
+    def __init__(self, objetos, siguiente, anterior):
+        self.objetos = objetos
+        self.siguiente = siguiente
+        self.anterior = anterior
+
+    def __iter__(self):
+        return iter(self.objetos)
+
+    def __len__(self):
+        return len(self.objetos)
+
+    @property
+    def hay_otras_paginas(self):
+        return bool(self.siguiente or self.anterior)
+
+
+def _valores(obj, campos):
+    """Valores de los campos del orden, serializables a JSON"""
+    valores = []
+    for campo in campos:
+        nombre = campo.lstrip('-')
+        valor = obj[nombre] if isinstance(obj, dict) else getattr(obj, nombre)
+        valores.append(valor.isoformat() if hasattr(valor, 'isoformat') else valor)
+    return valores
+
+
+def _a_python(model, campos, valores):
+    return [
+        model._meta.get_field(campo.lstrip('-')).to_python(valor)
+        for campo, valor in zip(campos, valores)
+    ]
+
+
+def _posicion_a_valores(posicion, model, campos):
+    """Valores de la posición de un cursor de la API, o None si no es válida"""
+    try:
+        valores = json.loads(posicion)
+        if not isinstance(valores, list) or len(valores) != len(campos):
+            return None
+        return _a_python(model, campos, valores)
+    except (ValueError, TypeError, ValidationError):
+        return None
+
+
+def _codificar_cursor(direccion, obj, campos):
+    texto = json.dumps([direccion, _valores(obj, campos)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(texto.encode()).decode()
+
+
+def _decodificar_cursor(cursor, model, campos):
+    """Devuelve (direccion, valores) o None si el cursor no es válido"""
+    try:
+        direccion, valores = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if direccion not in ('s', 'a') or len(valores) != len(campos):
+            return None
+        return direccion, _a_python(model, campos, valores)
+    except (ValueError, TypeError, ValidationError):
+        return None
+
+
+def _despues_de(campos, valores):
+    """
+    (a, b, id) > (va, vb, vid) respetando la dirección de cada campo:
+    a > va OR (a = va AND b > vb) OR (a = va AND b = vb AND id > vid)
+    """
+    condicion = Q()
+    iguales = Q()
+    for campo, valor in zip(campos, valores):
+        nombre = campo.lstrip('-')
+        operador = 'lt' if campo.startswith('-') else 'gt'
+        condicion |= iguales & Q(**{f'{nombre}__{operador}': valor})
+        iguales &= Q(**{nombre: valor})
+    return condicion
+
+
+def _invertir(campo):
+    return campo[1:] if campo.startswith('-') else f'-{campo}'
+
+
+def paginar_keyset(queryset, orden, cursor=None, tamano=25):
+    """
+    Pagina el queryset con el orden dado, que debe terminar en un campo
+    único (id). Cada página es una consulta por rango sobre el índice del
+    orden, sin COUNT(*) ni OFFSET: cuesta lo mismo la primera que la última.
+    Un cursor inválido se ignora y se muestra la primera página.
+    """
+    decodificado = _decodificar_cursor(cursor, queryset.model, orden) if cursor else None
+    direccion, valores = decodificado or ('s', None)
+
+    orden_consulta = orden if direccion == 's' else [_invertir(campo) for campo in orden]
+    queryset = queryset.order_by(*orden_consulta)
+    if valores is not None:
+        queryset = queryset.filter(_despues_de(orden_consulta, valores))
+
+    objetos = list(queryset[:tamano + 1])
+    hay_mas = len(objetos) > tamano
+    objetos = objetos[:tamano]
+    if direccion == 'a':
+        objetos.reverse()
+
+    siguiente = anterior = None
+    if objetos:
+        if direccion == 'a' or hay_mas:
+            siguiente = _codificar_cursor('s', objetos[-1], orden)
+        if (direccion == 's' and valores is not None) or (direccion == 'a' and hay_mas):
+            anterior = _codificar_cursor('a', objetos[0], orden)
+    return PaginaKeyset(objetos, siguiente, anterior)
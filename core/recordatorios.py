@@ -0,0 +1,214 @@
+"""
+Recordatorios de vacunación: generación de la cola y envío
+"""
+
+import json
+import sys
+from abc import ABC, abstractmethod
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Cliente, Vacuna, RecordatorioVacuna
+
+
+# Un recordatorio 'enviando' más viejo que esto es de un envío interrumpido
+RECORDATORIOS_RECLAMO_VENCE = timedelta(
+    minutes=getattr(settings, 'RECORDATORIOS_RECLAMO_MINUTOS', 30)
+)
+
+
+# =============================================
+# SENDERS
+# =============================================
+
+class Sender(ABC):
+    """
+    Interfaz de envío. enviar() recibe el cliente y sus recordatorios
+    pendientes (con vacuna y mascota cargadas) y debe lanzar una excepción
+    si el envío falla.
+    """
+
+    @abstractmethod
+    def enviar(self, cliente, recordatorios):
+        pass
+
+
+def _mensaje(cliente, recordatorios):
+    return {
+        'cliente': cliente.id,
+        'nombre': cliente.nombre_completo,
+        'email': cliente.email,
+        'telefono': cliente.telefono,
+        'dosis': [
+            {
+                'mascota': r.vacuna.mascota.nombre,
+                'vacuna': r.vacuna.nombre_vacuna,
+                'proxima_dosis': r.proxima_dosis.isoformat(),
+            }
+            for r in recordatorios
+        ],
+    }
+
+
+class ConsolaSender(Sender):
+    """Escribe cada aviso en la salida estándar (desarrollo)"""
+
+    def __init__(self, salida=None):
+        self.salida = salida or sys.stdout
+
+    def enviar(self, cliente, recordatorios):
+        dosis = ', '.join(
+            f'{r.vacuna.mascota.nombre}: {r.vacuna.nombre_vacuna} ({r.proxima_dosis:%d/%m/%Y})'
+            for r in recordatorios
+        )
+        self.salida.write(f'[recordatorio] {cliente.nombre_completo} <{cliente.telefono}> {dosis}\n')
+
+
+class ArchivoSender(Sender):
+    """Agrega cada aviso como una línea JSON a un archivo"""
+
+    def __init__(self, ruta=None):
+        self.ruta = ruta or getattr(settings, 'RECORDATORIOS_ARCHIVO', 'recordatorios.ndjson')
+
+    def enviar(self, cliente, recordatorios):
+        with open(self.ruta, 'a', encoding='utf-8') as archivo:
+            archivo.write(json.dumps(_mensaje(cliente, recordatorios), ensure_ascii=False) + '\n')
+
+
+def obtener_sender(ruta=None):
+    """Instancia el sender configurado en RECORDATORIOS_SENDER"""
+    ruta = ruta or getattr(settings, 'RECORDATORIOS_SENDER', 'core.recordatorios.ConsolaSender')
+    return import_string(ruta)()
+
+
+# =============================================
+# GENERACIÓN DE LA COLA
+# =============================================
+
+def generar_recordatorios(desde, hasta, lote=1000):
+    """
+    Recorre las vacunas con próxima dosis en [desde, hasta] por lotes, en
+    orden (proxima_dosis, id) sobre el índice, y encola un recordatorio por
+    dosis. Las dosis ya encoladas se ignoran. Devuelve (revisadas, encoladas).
+    """
+    revisadas = encoladas = 0
+    ultimo = None
+    while True:
+        vacunas = Vacuna.objects.filter(proxima_dosis__gte=desde, proxima_dosis__lte=hasta)
+        if ultimo is not None:
+            vacunas = vacunas.filter(
+                Q(proxima_dosis__gt=ultimo[0]) | Q(proxima_dosis=ultimo[0], id__gt=ultimo[1])
+            )
+        filas = list(
+            vacunas.filter(mascota__estado='activo')
+            .order_by('proxima_dosis', 'id')
+            .values_list('id', 'proxima_dosis', 'mascota__cliente_id')[:lote]
+        )
+        if not filas:
+            break
+
+        existentes = RecordatorioVacuna.objects.filter(
+            vacuna_id__in=[vacuna_id for vacuna_id, _, _ in filas]
+        ).values_list('vacuna_id', 'proxima_dosis')
+        ya_encoladas = set(existentes)
+
+        nuevos = [
+            RecordatorioVacuna(vacuna_id=vacuna_id, cliente_id=cliente_id, proxima_dosis=proxima)
+            for vacuna_id, proxima, cliente_id in filas
+            if (vacuna_id, proxima) not in ya_encoladas
+        ]
+        # La restricción única cubre también ejecuciones simultáneas
+        RecordatorioVacuna.objects.bulk_create(nuevos, ignore_conflicts=True)
+
+        revisadas += len(filas)
+        encoladas += len(nuevos)
+        vacuna_id, proxima, _ = filas[-1]
+        ultimo = (proxima, vacuna_id)
+    return revisadas, encoladas
+
+
+# =============================================
+# ENVÍO
+# =============================================
+
+def _reclamar(ultimo_cliente, lote):
+    """
+    Reclama los recordatorios pendientes del próximo lote de clientes y
+    los pasa a 'enviando'. Bloquea las filas de los clientes (SKIP LOCKED)
+    solo mientras los reclama: dos procesos no toman el mismo cliente y
+    cada uno toma todas las dosis de sus clientes. También se reclaman los
+    'enviando' de un proceso que se interrumpió hace más de
+    RECORDATORIOS_RECLAMO_MINUTOS. Devuelve (último cliente revisado,
+    recordatorios reclamados), o (None, []) si no quedan clientes.
+    """
+    ahora = timezone.now()
+    reclamables = Q(estado='pendiente') | Q(
+        estado='enviando', fecha_reclamo__lt=ahora - RECORDATORIOS_RECLAMO_VENCE
+    )
+    with transaction.atomic():
+        cliente_ids = list(
+            RecordatorioVacuna.objects.filter(reclamables, cliente_id__gt=ultimo_cliente)
+            .order_by('cliente_id')
+            .values_list('cliente_id', flat=True)
+            .distinct()[:lote]
+        )
+        if not cliente_ids:
+            return None, []
+
+        bloqueados = list(
+            Cliente.objects.select_for_update(skip_locked=True)
+            .filter(pk__in=cliente_ids)
+            .values_list('pk', flat=True)
+        )
+        recordatorios = list(
+            RecordatorioVacuna.objects.filter(reclamables, cliente_id__in=bloqueados)
+            .select_related('cliente', 'vacuna__mascota')
+            .order_by('cliente_id', 'proxima_dosis')
+        )
+        RecordatorioVacuna.objects.filter(id__in=[r.id for r in recordatorios]).update(
+            estado='enviando', fecha_reclamo=ahora
+        )
+    return cliente_ids[-1], recordatorios
+
+
+def enviar_pendientes(sender, lote=200):
+    """
+    Envía los recordatorios pendientes agrupados por cliente: un aviso por
+    cliente con todas sus dosis. Los avisos se mandan después de confirmar
+    el reclamo, sin transacción ni bloqueos abiertos mientras responde el
+    sender. Devuelve (enviados, errores) en cantidad de clientes.
+    """
+    enviados = errores = 0
+    ultimo_cliente = 0
+    while True:
+        ultimo_cliente, recordatorios = _reclamar(ultimo_cliente, lote)
+        if ultimo_cliente is None:
+            break
+
+        por_cliente = {}
+        for recordatorio in recordatorios:
+            por_cliente.setdefault(recordatorio.cliente_id, []).append(recordatorio)
+
+        ok = []
+        for recordatorios in por_cliente.values():
+            ids = [r.id for r in recordatorios]
+            try:
+                sender.enviar(recordatorios[0].cliente, recordatorios)
+            except Exception as e:
+                RecordatorioVacuna.objects.filter(id__in=ids).update(
+                    estado='error', error=str(e), intentos=F('intentos') + 1
+                )
+                errores += 1
+            else:
+                ok.extend(ids)
+                enviados += 1
+
+        RecordatorioVacuna.objects.filter(id__in=ok).update(
+            estado='enviado', fecha_envio=timezone.now(), intentos=F('intentos') + 1
+        )
+    return enviados, errores
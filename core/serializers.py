@@ -2,8 +2,36 @@
 Serializers para la API REST del Sistema Veterinaria
 """
 
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
 from .models import Usuario, Cliente, Mascota, Cita, Consulta, Vacuna
+from .agenda import validar_duracion
+
+
+# =============================================
+# CAMPOS
+# =============================================
+
+class PrecargadoPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField que primero busca el objeto en
+    context['precargados'][nombre_campo] (un dict pk -> instancia armado con
+    una sola consulta IN para todo el lote). Sin precarga se comporta igual
+    que PrimaryKeyRelatedField.
+    """
+    
+    def to_internal_value(self, data):
+        precargados = self.context.get('precargados', {}).get(self.field_name)
+        if precargados is None:
+            return super().to_internal_value(data)
+        
+        try:
+            pk = self.get_queryset().model._meta.pk.to_python(data)
+        except (DjangoValidationError, TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in precargados:
+            self.fail('does_not_exist', pk_value=data)
+        return precargados[pk]
 
 
 # =============================================
@@ -53,6 +81,17 @@ class UsuarioSerializer(serializers.ModelSerializer):
 # SERIALIZER: CLIENTE
 # =============================================
 
+def total_mascotas_activas(cliente):
+    """
+    Usa la anotación de Cliente.objects.con_total_mascotas() si está presente;
+    solo consulta la base para instancias sueltas (create/update).
+    """
+    total = getattr(cliente, 'total_mascotas_activas', None)
+    if total is None:
+        total = cliente.mascotas.filter(estado='activo').count()
+    return total
+
+
 class ClienteSerializer(serializers.ModelSerializer):
     """Serializer para el modelo Cliente"""
     
@@ -69,7 +108,7 @@ class ClienteSerializer(serializers.ModelSerializer):
     
     def get_total_mascotas(self, obj):
         """Contar las mascotas activas del cliente"""
-        return obj.mascotas.filter(estado='activo').count()
+        return total_mascotas_activas(obj)
 
 
 # =============================================
@@ -112,6 +151,8 @@ class CitaSerializer(serializers.ModelSerializer):
     veterinario_nombre = serializers.CharField(source='veterinario.nombre', read_only=True)
     estado_display = serializers.CharField(source='get_estado_display', read_only=True)
     
+    serializer_related_field = PrecargadoPrimaryKeyRelatedField
+    
     class Meta:
         model = Cita
         fields = [
@@ -127,9 +168,17 @@ class CitaSerializer(serializers.ModelSerializer):
     def validate_fecha_hora(self, value):
         """Validar que la fecha de la cita sea futura"""
         from django.utils import timezone
-        if value < timezone.now():
+        # En las cargas masivas 'ahora' se calcula una vez para todo el lote
+        ahora = self.context.get('ahora') or timezone.now()
+        if value < ahora:
             raise serializers.ValidationError("La fecha de la cita no puede ser en el pasado")
         return value
+    
+    def validate_duracion_minutos(self, value):
+        error = validar_duracion(value)
+        if error:
+            raise serializers.ValidationError(error)
+        return value
 
 
 # =============================================
@@ -144,6 +193,8 @@ class ConsultaSerializer(serializers.ModelSerializer):
     cliente_nombre = serializers.CharField(source='mascota.cliente.nombre_completo', read_only=True)
     veterinario_nombre = serializers.CharField(source='veterinario.nombre', read_only=True)
     
+    serializer_related_field = PrecargadoPrimaryKeyRelatedField
+    
     class Meta:
         model = Consulta
         fields = [
@@ -171,6 +222,8 @@ class VacunaSerializer(serializers.ModelSerializer):
     esta_vencida = serializers.ReadOnlyField()
     dias_para_refuerzo = serializers.SerializerMethodField()
     
+    serializer_related_field = PrecargadoPrimaryKeyRelatedField
+    
     class Meta:
         model = Vacuna
         fields = [
@@ -203,7 +256,7 @@ class ClienteListSerializer(serializers.ModelSerializer):
         fields = ['id', 'nombre', 'apellido', 'telefono', 'total_mascotas']
     
     def get_total_mascotas(self, obj):
-        return obj.mascotas.filter(estado='activo').count()
+        return total_mascotas_activas(obj)
 
 
 class MascotaListSerializer(serializers.ModelSerializer):
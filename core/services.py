@@ -0,0 +1,204 @@
+"""
+Servicios de dominio para Sistema Veterinaria
+Cálculos agregados reutilizados por las vistas HTML y la API
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .cache_local import ttl_invalidable
+from .models import Cliente, Mascota, Cita, Consulta, Vacuna
+from .filters import rango_dia, rango_mes, filtro_rango
+from .serializers import MascotaSerializer, CitaSerializer, ConsultaSerializer, VacunaSerializer
+
+
+# =============================================
+# SNAPSHOT DEL DASHBOARD
+# =============================================
+
+DASHBOARD_CACHE_KEY = 'dashboard:snapshot'
+DASHBOARD_CACHE_TIMEOUT = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300)
+
+
+def calcular_dashboard():
+    """
+    Calcula todas las estadísticas del dashboard. Cada contador es un
+    aggregate con Count(filter=...) sobre su tabla, y el total de mascotas
+    sale de la misma consulta que la distribución por especie: cuatro
+    consultas para los contadores. Las listas (citas de hoy, próximas
+    citas y vacunas) son consultas aparte sobre los índices de fecha.
+    Solo se ejecuta cuando el snapshot no está en cache.
+    """
+    ahora = timezone.now()
+    hoy = timezone.localdate(ahora)
+
+    # Clientes activos
+    total_clientes = Cliente.objects.aggregate(
+        total=Count('id', filter=Q(estado=True))
+    )['total']
+
+    # Mascotas activas por especie (el total sale de la misma consulta)
+    mascotas_por_especie = list(
+        Mascota.objects.filter(estado='activo')
+        .values('especie')
+        .annotate(total=Count('id'))
+        .order_by('-total')
+    )
+    total_mascotas = sum(fila['total'] for fila in mascotas_por_especie)
+
+    # Rangos semiabiertos sobre la columna para usar los índices de fecha
+    filtro_hoy = filtro_rango('fecha_hora', *rango_dia(hoy))
+
+    citas_hoy_total = Cita.objects.filter(**filtro_hoy).aggregate(
+        total=Count('id', filter=Q(estado__in=['pendiente', 'confirmada']))
+    )['total']
+
+    consultas_mes = Consulta.objects.filter(
+        **filtro_rango('fecha_consulta', *rango_mes(hoy))
+    ).aggregate(total=Count('id'))['total']
+
+    # Citas de hoy
+    citas_hoy = list(
+        Cita.objects.filter(
+            **filtro_hoy
+        ).select_related(
+            'mascota', 'mascota__cliente', 'veterinario'
+        ).order_by('fecha_hora')[:10]
+    )
+
+    # Próximas citas
+    proximas_citas = list(
+        Cita.objects.filter(
+            fecha_hora__gte=ahora,
+            estado__in=['pendiente', 'confirmada']
+        ).select_related(
+            'mascota', 'mascota__cliente', 'veterinario'
+        ).order_by('fecha_hora')[:5]
+    )
+
+    # Vacunas próximas a vencer (próximos 30 días)
+    fecha_limite = hoy + timedelta(days=30)
+    vacunas_proximas = list(
+        Vacuna.objects.filter(
+            **filtro_rango('proxima_dosis', hoy, fecha_limite + timedelta(days=1), model=Vacuna)
+        ).select_related(
+            'mascota', 'mascota__cliente'
+        ).order_by('proxima_dosis')[:5]
+    )
+
+    return {
+        'fecha': hoy,
+        # Cuando empieza la primera de las próximas citas la lista deja de valer
+        'vence': proximas_citas[0].fecha_hora if proximas_citas else None,
+        'stats': {
+            'total_clientes': total_clientes,
+            'total_mascotas': total_mascotas,
+            'citas_hoy': citas_hoy_total,
+            'consultas_mes': consultas_mes,
+        },
+        'citas_hoy': citas_hoy,
+        'proximas_citas': proximas_citas,
+        'vacunas_proximas': vacunas_proximas,
+        'mascotas_por_especie': mascotas_por_especie,
+    }
+
+
+def obtener_dashboard():
+    """
+    Devuelve el snapshot del dashboard desde la cache.
+    Solo se recalcula si fue invalidado, si cambió el día o si ya empezó
+    una de las próximas citas; sin cache compartida vence a los
+    CACHE_LOCAL_TTL segundos.
+    """
+    ahora = timezone.now()
+    snapshot = cache.get(DASHBOARD_CACHE_KEY)
+    if (
+        snapshot is None
+        or snapshot['fecha'] != timezone.localdate(ahora)
+        or (snapshot.get('vence') is not None and snapshot['vence'] <= ahora)
+    ):
+        snapshot = calcular_dashboard()
+        cache.set(DASHBOARD_CACHE_KEY, snapshot, ttl_invalidable(DASHBOARD_CACHE_TIMEOUT))
+    return snapshot
+
+
+def invalidar_dashboard():
+    """Descarta el snapshot del dashboard"""
+    cache.delete(DASHBOARD_CACHE_KEY)
+
+
+# =============================================
+# HISTORIAL CLÍNICO VERSIONADO
+# =============================================
+
+HISTORIAL_VERSION_KEY = 'historial:version:{}'
+HISTORIAL_CACHE_TIMEOUT = getattr(settings, 'HISTORIAL_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def version_historial(mascota_id):
+    """
+    Versión actual del historial de la mascota. Es una marca de tiempo, así
+    una versión recreada después de una expulsión de la cache nunca coincide
+    con una anterior. Sin cache compartida vence a los CACHE_LOCAL_TTL
+    segundos (ver core/cache_local.py).
+    """
+    clave = HISTORIAL_VERSION_KEY.format(mascota_id)
+    version = cache.get(clave)
+    if version is None:
+        cache.add(clave, time.time_ns(), ttl_invalidable(None))
+        version = cache.get(clave)
+    return version
+
+
+def invalidar_historial(mascota_ids):
+    """Cambia la versión del historial de cada mascota indicada"""
+    version = time.time_ns()
+    cache.set_many(
+        {HISTORIAL_VERSION_KEY.format(mascota_id): version for mascota_id in set(mascota_ids)},
+        ttl_invalidable(None)
+    )
+
+
+def etag_historial(mascota_id):
+    """
+    ETag del historial. Incluye la fecha porque la edad y los días para el
+    refuerzo de las vacunas cambian al cambiar el día.
+    """
+    return f'"historial-{mascota_id}-{version_historial(mascota_id)}-{timezone.localdate():%Y%m%d}"'
+
+
+def construir_historial(mascota):
+    """
+    Arma el historial con costo fijo: una consulta por lista. La mascota
+    debe venir con select_related('cliente'); las consultas, vacunas y citas
+    la reciben del related manager sin volver a buscarla.
+    """
+    consultas = mascota.consultas.select_related('veterinario').order_by('-fecha_consulta')[:10]
+    vacunas = mascota.vacunas.select_related('veterinario').order_by('-fecha_aplicacion')
+    citas = mascota.citas.select_related('veterinario').order_by('-fecha_hora')[:5]
+
+    return {
+        'mascota': MascotaSerializer(mascota).data,
+        'consultas': ConsultaSerializer(consultas, many=True).data,
+        'vacunas': VacunaSerializer(vacunas, many=True).data,
+        'citas': CitaSerializer(citas, many=True).data,
+    }
+
+
+def obtener_historial(mascota_id, cargar_mascota):
+    """
+    Devuelve (etag, datos) del historial desde la cache. cargar_mascota()
+    solo se llama si hay que construirlo.
+    """
+    etag = etag_historial(mascota_id)
+    clave = f'historial:{etag}'
+    datos = cache.get(clave)
+    if datos is None:
+        datos = construir_historial(cargar_mascota())
+        cache.set(clave, datos, ttl_invalidable(HISTORIAL_CACHE_TIMEOUT))
+    return etag, datos
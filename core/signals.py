@@ -0,0 +1,216 @@
+"""
+Señales del Sistema Veterinaria
+Mantienen sincronizadas las caches cuando cambian los datos
+"""
+
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from .models import Usuario, Cliente, Mascota, Cita, Consulta, Vacuna
+from .services import invalidar_dashboard, invalidar_historial
+from .vacunacion import recalcular_estado_vacunacion
+from .busqueda import indexar, desindexar
+from .autocompletar import cache_autocompletar
+from .fragmentos import invalidar_filas
+from .autenticacion import invalidar_usuario
+from .conexiones import metricas as metricas_conexiones
+
+
+# Enviada después de bulk_create/bulk_update, que no disparan post_save.
+# Argumentos: sender (modelo) e instancias (lista de objetos afectados).
+cambios_masivos = Signal()
+
+
+# =============================================
+# INVALIDACIÓN DEL DASHBOARD
+# =============================================
+
+@receiver(post_save, sender=Cliente)
+@receiver(post_delete, sender=Cliente)
+@receiver(post_save, sender=Mascota)
+@receiver(post_delete, sender=Mascota)
+@receiver(post_save, sender=Cita)
+@receiver(post_delete, sender=Cita)
+@receiver(post_save, sender=Consulta)
+@receiver(post_delete, sender=Consulta)
+@receiver(post_save, sender=Vacuna)
+@receiver(post_delete, sender=Vacuna)
+@receiver(cambios_masivos)
+def invalidar_dashboard_al_cambiar(sender, **kwargs):
+    """Cualquier alta, baja o modificación invalida el snapshot del dashboard"""
+    invalidar_dashboard()
+
+
+# =============================================
+# INVALIDACIÓN DEL HISTORIAL DE MASCOTAS
+# =============================================
+
+@receiver(post_save, sender=Mascota)
+@receiver(post_delete, sender=Mascota)
+def invalidar_historial_mascota(sender, instance, **kwargs):
+    invalidar_historial([instance.pk])
+
+
+@receiver(post_save, sender=Cita)
+@receiver(post_delete, sender=Cita)
+@receiver(post_save, sender=Consulta)
+@receiver(post_delete, sender=Consulta)
+@receiver(post_save, sender=Vacuna)
+@receiver(post_delete, sender=Vacuna)
+def invalidar_historial_registro(sender, instance, **kwargs):
+    invalidar_historial([instance.mascota_id])
+
+
+@receiver(post_save, sender=Cliente)
+def invalidar_historial_cliente(sender, instance, created, **kwargs):
+    """El historial muestra el nombre y teléfono del dueño"""
+    if not created:
+        invalidar_historial(instance.mascotas.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Usuario)
+def invalidar_historial_veterinario(sender, instance, created, update_fields=None, **kwargs):
+    """El historial muestra el nombre del veterinario de cada registro"""
+    if created or (update_fields is not None and 'nombre' not in update_fields):
+        # Los logins guardan solo last_login
+        return
+    mascota_ids = set()
+    for model in (Cita, Consulta, Vacuna):
+        mascota_ids.update(
+            model.objects.filter(veterinario=instance).values_list('mascota_id', flat=True).distinct()
+        )
+    invalidar_historial(mascota_ids)
+
+
+@receiver(cambios_masivos)
+def invalidar_historial_masivo(sender, instancias, **kwargs):
+    if sender in (Cita, Consulta, Vacuna):
+        invalidar_historial(obj.mascota_id for obj in instancias)
+
+
+# =============================================
+# ESTADO DE VACUNACIÓN
+# =============================================
+
+@receiver(post_save, sender=Vacuna)
+@receiver(post_delete, sender=Vacuna)
+def actualizar_estado_vacunacion(sender, instance, **kwargs):
+    """
+    _mascota_id_original lo dejan las vistas de edición (VacunaViewSet,
+    VacunaAdmin) para recalcular también la mascota anterior si cambia
+    """
+    recalcular_estado_vacunacion({instance.mascota_id, instance.__dict__.pop('_mascota_id_original', None)})
+
+
+@receiver(cambios_masivos)
+def actualizar_estado_vacunacion_masivo(sender, instancias, **kwargs):
+    if sender is Vacuna:
+        mascota_ids = set()
+        for obj in instancias:
+            mascota_ids.update((obj.mascota_id, obj.__dict__.pop('_mascota_id_original', None)))
+        recalcular_estado_vacunacion(mascota_ids)
+
+
+# =============================================
+# ÍNDICE DE BÚSQUEDA
+# =============================================
+
+@receiver(post_save, sender=Cliente)
+def indexar_cliente(sender, instance, created, **kwargs):
+    indexar('cliente', [instance.pk])
+    if not created:
+        # Las mascotas se buscan también por el nombre del dueño
+        indexar('mascota', instance.mascotas.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Mascota)
+def indexar_mascota(sender, instance, **kwargs):
+    indexar('mascota', [instance.pk])
+
+
+@receiver(post_delete, sender=Cliente)
+@receiver(post_delete, sender=Mascota)
+def desindexar_registro(sender, instance, **kwargs):
+    desindexar(sender._meta.model_name, [instance.pk])
+
+
+@receiver(cambios_masivos)
+def indexar_masivo(sender, instancias, **kwargs):
+    if sender in (Cliente, Mascota):
+        # Las altas traen su id también en MySQL (core/lotes.py); con
+        # ignore_conflicts las filas que ya existían quedan sin id y no cambian
+        indexar(sender._meta.model_name, [obj.pk for obj in instancias if obj.pk is not None])
+
+
+# =============================================
+# CACHE DE AUTOCOMPLETADO
+# =============================================
+
+@receiver(post_save, sender=Usuario)
+@receiver(post_delete, sender=Usuario)
+def limpiar_autocompletar_veterinarios(sender, **kwargs):
+    cache_autocompletar.limpiar('veterinarios')
+
+
+@receiver(post_save, sender=Cliente)
+@receiver(post_delete, sender=Cliente)
+@receiver(post_save, sender=Mascota)
+@receiver(post_delete, sender=Mascota)
+@receiver(cambios_masivos)
+def limpiar_autocompletar(sender, **kwargs):
+    """Las opciones de mascotas muestran el nombre del dueño"""
+    if sender is Cliente:
+        cache_autocompletar.limpiar('clientes')
+    if sender in (Cliente, Mascota):
+        cache_autocompletar.limpiar('mascotas')
+
+
+# =============================================
+# CACHE DE FILAS DE LOS LISTADOS HTML
+# =============================================
+
+@receiver(post_save, sender=Usuario)
+@receiver(post_delete, sender=Usuario)
+@receiver(post_save, sender=Cliente)
+@receiver(post_delete, sender=Cliente)
+@receiver(post_save, sender=Mascota)
+@receiver(post_delete, sender=Mascota)
+@receiver(post_save, sender=Cita)
+@receiver(post_delete, sender=Cita)
+def invalidar_fila(sender, instance, **kwargs):
+    invalidar_filas(sender, [instance.pk])
+
+
+@receiver(cambios_masivos)
+def invalidar_filas_masivo(sender, instancias, **kwargs):
+    if sender in (Usuario, Cliente, Mascota, Cita):
+        invalidar_filas(sender, (obj.pk for obj in instancias if obj.pk is not None))
+
+
+# =============================================
+# CACHE DE USUARIOS AUTENTICADOS
+# =============================================
+
+@receiver(post_save, sender=Usuario)
+@receiver(post_delete, sender=Usuario)
+def invalidar_usuario_autenticado(sender, instance, **kwargs):
+    """Un cambio de rol, estado o contraseña se aplica en la próxima request"""
+    invalidar_usuario(instance.pk)
+
+
+# =============================================
+# MÉTRICAS DE CONEXIONES A LA BASE
+# =============================================
+
+@receiver(request_started)
+def contar_request(sender, **kwargs):
+    metricas_conexiones.sumar('requests')
+
+
+@receiver(connection_created)
+def contar_conexion_abierta(sender, connection, **kwargs):
+    """Con pool, connection_created también se envía al reutilizar: cuenta el pool"""
+    if getattr(connection, 'pool', None) is None:
+        metricas_conexiones.sumar('abiertas')
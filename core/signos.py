@@ -0,0 +1,155 @@
+"""
+Series de signos vitales (peso, temperatura, frecuencia cardíaca)
+con reducción de puntos en el servidor
+"""
+
+from datetime import timezone as tz
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Avg, Count, Max, Min
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+from .models import Consulta
+
+
+# =============================================
+# MÉTRICAS
+# =============================================
+
+METRICAS = ['peso_actual', 'temperatura', 'frecuencia_cardiaca']
+
+INTERVALOS = {
+    'dia': TruncDay,
+    'semana': TruncWeek,
+    'mes': TruncMonth,
+}
+
+
+# =============================================
+# REDUCCIÓN DE PUNTOS
+# =============================================
+
+def lttb(xs, ys, umbral):
+    """
+    Largest-Triangle-Three-Buckets: elige `umbral` puntos que conservan la
+    forma visual de la serie. Siempre incluye el primero y el último.
+    """
+    n = len(xs)
+    if umbral >= n or umbral < 3:
+        return list(xs), list(ys)
+
+    elegidos = [0]
+    tamano = (n - 2) / (umbral - 2)
+    a = 0
+    for i in range(umbral - 2):
+        # Promedio del bucket siguiente
+        inicio_sig = int((i + 1) * tamano) + 1
+        fin_sig = min(int((i + 2) * tamano) + 1, n)
+        cantidad = fin_sig - inicio_sig
+        x_prom = sum(xs[inicio_sig:fin_sig]) / cantidad
+        y_prom = sum(ys[inicio_sig:fin_sig]) / cantidad
+
+        # Punto del bucket actual que forma el triángulo de mayor área
+        inicio = int(i * tamano) + 1
+        fin = int((i + 1) * tamano) + 1
+        mejor, mejor_area = inicio, -1.0
+        for j in range(inicio, fin):
+            area = abs(
+                (xs[a] - x_prom) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (y_prom - ys[a])
+            )
+            if area > mejor_area:
+                mejor, mejor_area = j, area
+        elegidos.append(mejor)
+        a = mejor
+    elegidos.append(n - 1)
+    return [xs[i] for i in elegidos], [ys[i] for i in elegidos]
+
+
+def buckets(xs, ys, cantidad):
+    """Divide la serie en `cantidad` tramos consecutivos y resume cada uno (min/max/promedio)"""
+    n = len(xs)
+    if n == 0:
+        return {'t': [], 'min': [], 'max': [], 'mean': []}
+    cantidad = max(1, min(cantidad, n))
+    resultado = {'t': [], 'min': [], 'max': [], 'mean': []}
+    for i in range(cantidad):
+        inicio = i * n // cantidad
+        fin = (i + 1) * n // cantidad
+        tramo = ys[inicio:fin]
+        resultado['t'].append(xs[inicio])
+        resultado['min'].append(min(tramo))
+        resultado['max'].append(max(tramo))
+        resultado['mean'].append(round(sum(tramo) / len(tramo), 2))
+    return resultado
+
+
+# =============================================
+# SERIES
+# =============================================
+
+def series_mascota(mascota_id, metricas, filtros_fecha, puntos, metodo='lttb'):
+    """
+    Series de la mascota en formato de columnas, una por métrica:
+        {'peso_actual': {'t': [epoch, ...], 'v': [...]}, ...}
+    Con metodo='buckets' cada serie trae 't', 'min', 'max' y 'mean'.
+    Los timestamps son segundos epoch (UTC).
+    """
+    filas = Consulta.objects.filter(
+        mascota_id=mascota_id, **filtros_fecha
+    ).order_by('fecha_consulta').values_list('fecha_consulta', *metricas)
+
+    columnas = {metrica: ([], []) for metrica in metricas}
+    for fila in filas.iterator():
+        t = int(fila[0].timestamp())
+        for metrica, valor in zip(metricas, fila[1:]):
+            if valor is not None:
+                columnas[metrica][0].append(t)
+                columnas[metrica][1].append(float(valor))
+
+    series = {}
+    for metrica, (xs, ys) in columnas.items():
+        if metodo == 'buckets':
+            series[metrica] = buckets(xs, ys, puntos)
+        else:
+            t, v = lttb(xs, ys, puntos)
+            series[metrica] = {'t': t, 'v': v}
+    return series
+
+
+def series_especie(especie, metrica, filtros_fecha, intervalo='mes'):
+    """
+    Agregado por período de una métrica para todas las mascotas de una
+    especie. El agrupamiento y los promedios se calculan en la base.
+
+    Los períodos se truncan en UTC: en MySQL truncar en la zona local
+    necesita las tablas de zonas horarias cargadas en el servidor, y sin
+    ellas el período vuelve NULL. Se informa por su fecha UTC.
+    """
+    periodos = Consulta.objects.filter(
+        mascota__especie=especie, **filtros_fecha
+    ).exclude(
+        **{f'{metrica}__isnull': True}
+    ).annotate(
+        periodo=INTERVALOS[intervalo]('fecha_consulta', tzinfo=tz.utc)
+    ).values('periodo').annotate(
+        mean=Avg(metrica),
+        min=Min(metrica),
+        max=Max(metrica),
+        n=Count('id'),
+        mascotas=Count('mascota', distinct=True),
+    ).order_by('periodo')
+
+    resultado = {'t': [], 'mean': [], 'min': [], 'max': [], 'n': [], 'mascotas': []}
+    for fila in periodos:
+        if fila['periodo'] is None:
+            raise ImproperlyConfigured(
+                'La base devolvió un período NULL al truncar fecha_consulta; '
+                'revise la zona horaria de la conexión (TIME_ZONE de DATABASES)'
+            )
+        resultado['t'].append(fila['periodo'].date())
+        resultado['mean'].append(round(float(fila['mean']), 2))
+        resultado['min'].append(float(fila['min']))
+        resultado['max'].append(float(fila['max']))
+        resultado['n'].append(fila['n'])
+        resultado['mascotas'].append(fila['mascotas'])
+    return resultado
@@ -0,0 +1,81 @@
+/*
+ * Carga diferida de opciones para los <select> de los formularios.
+ *
+ * Uso: un input de búsqueda con data-autocompletar="<url>" y
+ * data-destino="<selector del select>". Al escribir se piden las opciones
+ * a /api/autocompletar/... y se reemplazan las del select. Con
+ * data-cargar-al-enfocar se cargan también sin texto (veterinarios); sin
+ * él se espera a tener MINIMO letras, igual que en el servidor.
+ */
+(function () {
+    'use strict';
+
+    var ESPERA_MS = 250;
+    var MINIMO = 2;
+
+    // Conserva el placeholder y la opción elegida aunque no esté entre los resultados
+    function reemplazarOpciones(select, opciones) {
+        var elegida = select.value ? select.options[select.selectedIndex] : null;
+        var placeholder = select.querySelector('option[value=""]');
+        select.innerHTML = '';
+        if (placeholder) {
+            select.appendChild(placeholder);
+        }
+        if (elegida) {
+            select.appendChild(elegida);
+        }
+        opciones.forEach(function (opcion) {
+            if (elegida && String(opcion.id) === elegida.value) {
+                return;
+            }
+            var elemento = document.createElement('option');
+            elemento.value = opcion.id;
+            elemento.textContent = opcion.texto;
+            select.appendChild(elemento);
+        });
+        if (elegida) {
+            select.value = elegida.value;
+        } else if (opciones.length === 1) {
+            select.value = String(opciones[0].id);
+        }
+    }
+
+    function iniciar(input) {
+        var select = document.querySelector(input.dataset.destino);
+        var temporizador = null;
+        var ultimaConsulta = null;
+        var controlador = null;
+
+        function cargar() {
+            var texto = input.value.trim();
+            if (texto === ultimaConsulta) {
+                return;
+            }
+            if (texto.length < MINIMO && !input.hasAttribute('data-cargar-al-enfocar')) {
+                return;
+            }
+            ultimaConsulta = texto;
+            if (controlador) {
+                controlador.abort();
+            }
+            controlador = new AbortController();
+
+            var url = input.dataset.autocompletar + '?q=' + encodeURIComponent(texto);
+            fetch(url, {credentials: 'same-origin', signal: controlador.signal})
+                .then(function (respuesta) { return respuesta.ok ? respuesta.json() : []; })
+                .then(function (opciones) { reemplazarOpciones(select, opciones); })
+                .catch(function () {});
+        }
+
+        input.addEventListener('input', function () {
+            clearTimeout(temporizador);
+            temporizador = setTimeout(cargar, ESPERA_MS);
+        });
+        if (input.hasAttribute('data-cargar-al-enfocar')) {
+            input.addEventListener('focus', cargar);
+            select.addEventListener('focus', cargar);
+        }
+    }
+
+    document.querySelectorAll('[data-autocompletar]').forEach(iniciar);
+})();
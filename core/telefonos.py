@@ -0,0 +1,53 @@
+"""
+Normalización de teléfonos para buscar clientes por el número que llama
+"""
+
+from django.conf import settings
+
+
+TELEFONO_CODIGO_PAIS = getattr(settings, 'TELEFONO_CODIGO_PAIS', '54')
+
+# Largo del número nacional (código de área + abonado) y mínimo de dígitos
+# para buscar por terminación (números guardados sin código de área)
+TELEFONO_LARGO_NACIONAL = getattr(settings, 'TELEFONO_LARGO_NACIONAL', 10)
+TELEFONO_LARGO_MINIMO = getattr(settings, 'TELEFONO_LARGO_MINIMO', 6)
+
+
+def normalizar_telefono(telefono):
+    """
+    Número nacional en dígitos, sin prefijo internacional, código de país,
+    9 de celular, 0 de larga distancia ni 15 de celular:
+
+        '+54 9 387 411-1222'  -> '3874111222'
+        '0387 15 411-1222'    -> '3874111222'
+        '4111222'             -> '4111222'   (sin código de área queda igual)
+    """
+    digitos = ''.join(c for c in str(telefono or '') if c.isdigit())
+    if digitos.startswith('00'):
+        digitos = digitos[2:]
+    if digitos.startswith(TELEFONO_CODIGO_PAIS) and len(digitos) > TELEFONO_LARGO_NACIONAL:
+        digitos = digitos[len(TELEFONO_CODIGO_PAIS):]
+        if digitos.startswith('9') and len(digitos) > TELEFONO_LARGO_NACIONAL:
+            digitos = digitos[1:]
+    digitos = digitos.lstrip('0')
+
+    # Formato viejo de celular: área + 15 + abonado (2 dígitos de más).
+    # Los códigos de área tienen de 2 a 4 dígitos.
+    if len(digitos) == TELEFONO_LARGO_NACIONAL + 2:
+        for largo_area in (4, 3, 2):
+            if digitos[largo_area:largo_area + 2] == '15':
+                digitos = digitos[:largo_area] + digitos[largo_area + 2:]
+                break
+    return digitos[:20]
+
+
+def candidatos_telefono(telefono):
+    """
+    Valores de telefono_normalizado que pueden corresponder al número: el
+    número completo y sus terminaciones, por si el cliente lo tiene cargado
+    sin código de área. Se buscan todos juntos con un IN sobre el índice.
+    """
+    normalizado = normalizar_telefono(telefono)
+    if len(normalizado) < TELEFONO_LARGO_MINIMO:
+        return []
+    return [normalizado[i:] for i in range(len(normalizado) - TELEFONO_LARGO_MINIMO + 1)]
@@ -0,0 +1,44 @@
+"""
+Utilidades para tests del Sistema Veterinaria
+"""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+# =============================================
+# CONTEO DE CONSULTAS POR ENDPOINT
+# =============================================
+
+class ConsultasConstantesMixin:
+    """
+    Mixin para TestCase que verifica que un endpoint de listado no tenga N+1:
+    la cantidad de consultas no debe crecer al agregar filas.
+
+    Uso:
+        class CitaApiTests(ConsultasConstantesMixin, APITestCase):
+            def test_listado(self):
+                self.assertConsultasConstantes('/api/citas/', self.crear_cita)
+    """
+
+    def contar_consultas(self, url, **params):
+        """Ejecuta un GET sobre url y devuelve la cantidad de consultas SQL"""
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        return len(contexto.captured_queries)
+
+    def assertConsultasConstantes(self, url, crear_fila, filas=5, **params):
+        """
+        Mide las consultas con una fila y con `filas` filas adicionales
+        (creadas llamando a crear_fila) y exige que sean iguales.
+        """
+        crear_fila()
+        inicial = self.contar_consultas(url, **params)
+        for _ in range(filas):
+            crear_fila()
+        final = self.contar_consultas(url, **params)
+        self.assertEqual(
+            inicial, final,
+            f'{url}: {inicial} consultas con 1 fila, {final} con {filas + 1} (posible N+1)'
+        )
@@ -1,3 +1,685 @@
-from django.test import TestCase
+"""
+Tests del Sistema Veterinaria
+"""
 
-# Create your tests here.
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import DateTimeField, Value
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+
+from .models import (
+    Usuario, Cliente, Mascota, Cita, Consulta, Vacuna, EstadoVacunacion, ProgresoImportacion,
+    RecordatorioVacuna,
+)
+from . import vacunacion
+from .autocompletar import autocompletar, cache_autocompletar
+from .busqueda import buscar
+from .signos import series_especie
+from .recordatorios import Sender, enviar_pendientes, generar_recordatorios
+from .services import calcular_dashboard, obtener_dashboard
+from .limites import buckets_login
+from .testing import ConsultasConstantesMixin
+from .views import VacunaViewSet
+from .fragmentos import anotar_versiones
+from .context_processors import navegacion
+
+
+class DatosMixin:
+    """Un veterinario, un cliente y una mascota para cada test"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.veterinario = Usuario.objects.create_user(
+            'vet@vet.com', 'clave-segura-1', nombre='Vet', rol='admin'
+        )
+        cls.cliente = Cliente.objects.create(
+            nombre='Ana', apellido='Pérez', dni='30111222', telefono='387-4111222'
+        )
+        cls.mascota = Mascota.objects.create(
+            cliente=cls.cliente, nombre='Toby', especie='perro', sexo='macho'
+        )
+
+
+# =============================================
+# ESTADO DE VACUNACIÓN
+# =============================================
+
+class EstadoVacunacionTests(DatosMixin, TestCase):
+
+    def crear_vacuna(self, nombre, aplicada, proxima=None):
+        return Vacuna.objects.create(
+            mascota=self.mascota, nombre_vacuna=nombre,
+            fecha_aplicacion=aplicada, proxima_dosis=proxima,
+        )
+
+    def test_guardar_vacuna_actualiza_el_estado(self):
+        hoy = date.today()
+        self.crear_vacuna('Antirrábica', hoy - timedelta(days=400), hoy - timedelta(days=35))
+        ultima = self.crear_vacuna('antirrábica ', hoy, hoy + timedelta(days=365))
+
+        estado = EstadoVacunacion.objects.get(mascota=self.mascota)
+        self.assertEqual(estado.tipo_vacuna, 'antirrábica')
+        self.assertEqual(estado.ultima_vacuna_id, ultima.id)
+
+        ultima.proxima_dosis = hoy + timedelta(days=30)
+        ultima.save()
+        self.assertEqual(EstadoVacunacion.objects.get(mascota=self.mascota).proxima_dosis, hoy + timedelta(days=30))
+
+        Vacuna.objects.filter(mascota=self.mascota).delete()
+        self.assertFalse(EstadoVacunacion.objects.filter(mascota=self.mascota).exists())
+
+    def test_upsert_sin_unique_fields_si_el_backend_no_lo_admite(self):
+        # MySQL: ON DUPLICATE KEY UPDATE no acepta columnas de conflicto
+        with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False), \
+                mock.patch.object(EstadoVacunacion.objects, 'bulk_create') as bulk_create:
+            vacunacion.recalcular_estado_vacunacion([self.mascota.id])
+        self.assertTrue(bulk_create.call_args.kwargs['update_conflicts'])
+        self.assertNotIn('unique_fields', bulk_create.call_args.kwargs)
+
+
+class VacunasApiTests(DatosMixin, APITestCase):
+
+    def setUp(self):
+        self.client.force_authenticate(self.veterinario)
+        self.otra = Mascota.objects.create(cliente=self.cliente, nombre='Mora', especie='gato', sexo='hembra')
+        hoy = date.today()
+        self.vacuna = Vacuna.objects.create(
+            mascota=self.mascota, nombre_vacuna='Antirrábica',
+            fecha_aplicacion=hoy - timedelta(days=400), proxima_dosis=hoy - timedelta(days=35),
+        )
+
+    def test_cambiar_de_mascota_recalcula_las_dos(self):
+        for metodo, url, datos in (
+            ('patch', f'/api/vacunas/{self.vacuna.id}/', {'mascota': self.otra.id}),
+            ('patch', '/api/vacunas/bulk/', [{'id': self.vacuna.id, 'mascota': self.mascota.id}]),
+        ):
+            response = getattr(self.client, metodo)(url, datos, format='json')
+            self.assertEqual(response.status_code, 200, response.data)
+            self.assertEqual(
+                list(EstadoVacunacion.objects.values_list('mascota_id', flat=True)),
+                [Vacuna.objects.get().mascota_id],
+            )
+
+    def test_vencidas_paginadas(self):
+        response = self.client.get('/api/vacunas/vencidas/', {'page_size': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([fila['mascota'] for fila in response.data['results']], [self.mascota.id])
+        self.assertIsNone(response.data['next'])
+
+
+# =============================================
+# PAGINACIÓN POR CURSOR
+# =============================================
+
+class PaginacionCursorTests(DatosMixin, APITestCase):
+
+    def setUp(self):
+        self.client.force_authenticate(self.veterinario)
+        self.fecha = timezone.now().replace(microsecond=0)
+
+    def nueva_cita(self, fecha_hora):
+        return Cita.objects.create(
+            mascota=self.mascota, veterinario=self.veterinario, fecha_hora=fecha_hora, motivo='Control',
+        )
+
+    def recorrer(self, url, datos):
+        ids = []
+        response = self.client.get(url, datos)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids += [fila['id'] for fila in response.data['results']]
+            if response.data['next'] is None:
+                return ids, response
+            response = self.client.get(response.data['next'])
+
+    def test_fechas_repetidas_entre_paginas(self):
+        citas = [self.nueva_cita(self.fecha) for _ in range(5)]
+        citas.append(self.nueva_cita(self.fecha - timedelta(hours=1)))
+
+        with CaptureQueriesContext(connection) as consultas:
+            ids, _ = self.recorrer('/api/citas/', {'page_size': 2})
+        # (-fecha_hora, -id): las cinco de la misma hora, de la última creada a la primera
+        self.assertEqual(ids, [cita.id for cita in citas[4::-1]] + [citas[5].id])
+        self.assertFalse(any('OFFSET' in c['sql'].upper() for c in consultas.captured_queries))
+
+    def test_volver_a_la_pagina_anterior(self):
+        citas = [self.nueva_cita(self.fecha) for _ in range(5)]
+        _, ultima = self.recorrer('/api/citas/', {'page_size': 2})
+        anterior = self.client.get(ultima.data['previous'])
+        self.assertEqual(
+            [fila['id'] for fila in anterior.data['results']], [citas[2].id, citas[1].id]
+        )
+
+    def test_vencidas_con_la_misma_fecha(self):
+        vencio = date.today() - timedelta(days=10)
+        for i in range(3):
+            Vacuna.objects.create(
+                mascota=self.mascota, nombre_vacuna=f'Vacuna {i}',
+                fecha_aplicacion=vencio - timedelta(days=365), proxima_dosis=vencio,
+            )
+        ids, _ = self.recorrer('/api/vacunas/vencidas/', {'page_size': 1})
+        self.assertEqual(ids, list(EstadoVacunacion.objects.order_by('id').values_list('id', flat=True)))
+
+    def test_cursor_invalido(self):
+        response = self.client.get('/api/citas/', {'cursor': 'no-es-un-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+# =============================================
+# HISTORIAL CON ETAG
+# =============================================
+
+@mock.patch('core.views.cache_compartida', return_value=True)
+class HistorialEtagTests(DatosMixin, APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.veterinario)
+        self.url = f'/api/mascotas/{self.mascota.id}/historial/'
+
+    def test_304_solo_con_un_etag_exacto(self, _):
+        etag = self.client.get(self.url)['ETag']
+
+        respuesta = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"otro", {etag}')
+        self.assertEqual(respuesta.status_code, 304)
+
+        # Un prefijo del ETag vigente no es el mismo ETag
+        respuesta = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'{etag[:-2]}"')
+        self.assertEqual(respuesta.status_code, 200)
+        respuesta = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"x{etag[1:-1]}x"')
+        self.assertEqual(respuesta.status_code, 200)
+
+    def test_304_respeta_el_queryset(self, _):
+        etag = self.client.get(self.url)['ETag']
+        Mascota.objects.filter(pk=self.mascota.pk).update(estado='inactivo')
+        respuesta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 404)
+
+    def test_cambio_de_nombre_del_veterinario(self, _):
+        Vacuna.objects.create(
+            mascota=self.mascota, veterinario=self.veterinario,
+            nombre_vacuna='Antirrábica', fecha_aplicacion=date.today(),
+        )
+        etag = self.client.get(self.url)['ETag']
+
+        # Un login guarda solo last_login: no invalida
+        self.veterinario.save(update_fields=['last_login'])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.veterinario.nombre = 'Dra. Vet'
+        self.veterinario.save()
+        respuesta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn('Dra. Vet', respuesta.content.decode())
+
+    def test_sin_cache_compartida_no_hay_etag(self, cache_compartida):
+        cache_compartida.return_value = False
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotIn('ETag', respuesta)
+
+
+# =============================================
+# VERSIONES DE FILAS
+# =============================================
+
+class VersionesFilasTests(DatosMixin, TestCase):
+
+    def test_sin_cache_compartida_todo_vence(self):
+        cache.clear()
+        with mock.patch.object(cache, 'set_many', wraps=cache.set_many) as set_many, \
+                mock.patch('core.cache_local.CACHE_LOCAL_TTL', 30):
+            anotar_versiones([self.mascota], 'cliente')
+            self.assertEqual(set_many.call_args.args[1], 30)
+            self.assertEqual(navegacion(mock.Mock(path='/'))['fragmentos_timeout'], 30)
+
+    def test_con_cache_compartida_usa_los_timeouts_configurados(self):
+        with mock.patch('core.cache_local.cache_compartida', return_value=True):
+            self.assertEqual(navegacion(mock.Mock(path='/'))['fragmentos_timeout'], 60 * 60 * 24)
+
+
+# =============================================
+# DASHBOARD
+# =============================================
+
+class DashboardTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_contadores(self):
+        Cita.objects.create(
+            mascota=self.mascota, veterinario=self.veterinario,
+            fecha_hora=timezone.now(), motivo='Control', estado='pendiente',
+        )
+        Cita.objects.create(
+            mascota=self.mascota, veterinario=self.veterinario,
+            fecha_hora=timezone.now(), motivo='Control', estado='cancelada',
+        )
+        with self.assertNumQueries(7):
+            stats = calcular_dashboard()['stats']
+        self.assertEqual(stats, {'total_clientes': 1, 'total_mascotas': 1, 'citas_hoy': 1, 'consultas_mes': 0})
+
+    def test_snapshot_sin_consultas_hasta_que_cambian_los_datos(self):
+        obtener_dashboard()
+        with self.assertNumQueries(0):
+            obtener_dashboard()
+        Cliente.objects.create(nombre='Luis', apellido='Gómez', dni='30999888', telefono='387-4999888')
+        self.assertEqual(obtener_dashboard()['stats']['total_clientes'], 2)
+
+    def test_cita_que_empieza_vence_el_snapshot(self):
+        inicio = timezone.now() + timedelta(minutes=10)
+        Cita.objects.create(
+            mascota=self.mascota, veterinario=self.veterinario,
+            fecha_hora=inicio, motivo='Control', estado='pendiente',
+        )
+        self.assertEqual(len(obtener_dashboard()['proximas_citas']), 1)
+        with mock.patch('django.utils.timezone.now', return_value=inicio + timedelta(minutes=1)):
+            self.assertEqual(obtener_dashboard()['proximas_citas'], [])
+
+
+# =============================================
+# LÍMITE DE LOGIN
+# =============================================
+
+class LoginThrottleTests(APITestCase):
+
+    def setUp(self):
+        buckets_login.limpiar()
+
+    @mock.patch('core.limites.LOGIN_LIMITE_IP', (2, 1))
+    def test_x_forwarded_for_no_cambia_la_ip(self):
+        for i in range(2):
+            response = self.client.post(
+                '/api/login/', {'email': f'user{i}@vet.com', 'password': 'x'},
+                HTTP_X_FORWARDED_FOR=f'10.0.0.{i}',
+            )
+            self.assertEqual(response.status_code, 401)
+        response = self.client.post(
+            '/api/login/', {'email': 'otro@vet.com', 'password': 'x'},
+            HTTP_X_FORWARDED_FOR='10.0.0.99',
+        )
+        self.assertEqual(response.status_code, 429)
+
+
+# =============================================
+# ALTAS MASIVAS
+# =============================================
+
+class AltasMasivasTests(DatosMixin, APITestCase):
+
+    def setUp(self):
+        self.client.force_authenticate(self.veterinario)
+
+    def test_alta_masiva_devuelve_ids_sin_returning(self):
+        hoy = date.today().isoformat()
+        items = [
+            {'mascota': self.mascota.id, 'nombre_vacuna': nombre, 'fecha_aplicacion': hoy}
+            for nombre in ('Antirrábica', 'Séxtuple')
+        ]
+        # Otra vacuna ya cargada no debe confundirse con las nuevas
+        existente = Vacuna.objects.create(
+            mascota=self.mascota, nombre_vacuna='Antirrábica', fecha_aplicacion=date.today()
+        )
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False), \
+                mock.patch('core.signals.recalcular_estado_vacunacion') as recalcular, \
+                self.assertNumQueries(7):
+            response = self.client.post('/api/vacunas/bulk/', items, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        # Un solo INSERT y un solo recálculo para todo el lote
+        self.assertEqual(recalcular.call_count, 1)
+        ids = [fila['id'] for fila in response.data['resultados']]
+        self.assertNotIn(None, ids)
+        self.assertEqual(set(ids), set(Vacuna.objects.exclude(pk=existente.pk).values_list('id', flat=True)))
+
+
+# =============================================
+# IMPORTACIÓN
+# =============================================
+
+class ImportarDatosTests(DatosMixin, TestCase):
+
+    def test_reanudar_no_repite_filas(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = Path(directorio) / 'mascotas.csv'
+            ruta.write_text(
+                'cliente_dni,nombre,especie,sexo\n'
+                + ''.join(f'30111222,Mascota {i},gato,hembra\n' for i in range(3)),
+                encoding='utf-8',
+            )
+            salida = {'stdout': mock.MagicMock(), 'stderr': mock.MagicMock()}
+            # Se interrumpe después de confirmar el segundo lote
+            with mock.patch(
+                'core.management.commands.importar_datos.cambios_masivos.send',
+                side_effect=[None, RuntimeError('interrumpido')],
+            ):
+                with self.assertRaises(RuntimeError):
+                    call_command('importar_datos', mascotas=str(ruta), lote=1, **salida)
+            self.assertEqual(ProgresoImportacion.objects.get().filas, 2)
+
+            call_command('importar_datos', mascotas=str(ruta), lote=1, **salida)
+
+        nombres = Mascota.objects.filter(especie='gato').values_list('nombre', flat=True)
+        self.assertEqual(sorted(nombres), ['Mascota 0', 'Mascota 1', 'Mascota 2'])
+        self.assertFalse(ProgresoImportacion.objects.exists())
+
+    def test_clientes_sin_dni_quedan_indexados(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = Path(directorio) / 'clientes.csv'
+            ruta.write_text(
+                'nombre,apellido,dni,telefono\n'
+                'Zoe,Quiroga,,387-4000001\n'
+                'Ana,Pérez,30111222,387-4111222\n',
+                encoding='utf-8',
+            )
+            salida = {'stdout': mock.MagicMock(), 'stderr': mock.MagicMock()}
+            with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+                call_command('importar_datos', clientes=str(ruta), **salida)
+
+        quiroga = Cliente.objects.get(apellido='Quiroga')
+        self.assertEqual(buscar('cliente', 'quiroga'), [quiroga.id])
+        self.assertEqual(Cliente.objects.count(), 2)
+
+
+# =============================================
+# AGENDA
+# =============================================
+
+class CitaCrearTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        self.vet = Usuario.objects.create_user(
+            'turnos@vet.com', 'clave-segura-1', nombre='Turnos', rol='veterinario'
+        )
+        self.client.force_login(self.veterinario)
+
+    def datos(self, **extra):
+        fecha_hora = timezone.localtime() + timedelta(days=1)
+        return {
+            'mascota': self.mascota.id, 'veterinario': self.vet.id,
+            'fecha_hora': fecha_hora.strftime('%Y-%m-%dT%H:%M'), 'motivo': 'Control',
+            **extra,
+        }
+
+    def test_duracion_invalida_no_crea_la_cita(self):
+        for duracion in ('abc', '-30', '100000'):
+            response = self.client.post('/citas/crear/', self.datos(duracion_minutos=duracion))
+            self.assertRedirects(response, '/citas/crear/', fetch_redirect_response=False)
+        self.assertFalse(Cita.objects.exists())
+
+    def test_crea_la_cita(self):
+        response = self.client.post('/citas/crear/', self.datos(duracion_minutos='45'))
+        self.assertRedirects(response, '/citas/', fetch_redirect_response=False)
+        cita = Cita.objects.get()
+        self.assertEqual((cita.estado, cita.duracion_minutos), ('pendiente', 45))
+
+
+class DisponibilidadTests(DatosMixin, APITestCase):
+
+    url = '/api/citas/disponibilidad/'
+
+    def setUp(self):
+        self.client.force_authenticate(self.veterinario)
+
+    def test_rango_de_31_dias_como_maximo(self):
+        desde = date.today() + timedelta(days=1)
+        for dias, esperado in ((31, 200), (32, 400)):
+            hasta = desde + timedelta(days=dias - 1)
+            response = self.client.get(self.url, {'desde': desde.isoformat(), 'hasta': hasta.isoformat()})
+            self.assertEqual(response.status_code, esperado, dias)
+
+    def test_veterinario_invalido(self):
+        response = self.client.get(self.url, {'desde': date.today().isoformat(), 'veterinario': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ReservasConcurrentesTests(TransactionTestCase):
+    """Varias reservas del mismo turno a la vez: solo una puede ganar"""
+
+    reservas = 8
+
+    def test_un_solo_turno_para_reservas_simultaneas(self):
+        vet = Usuario.objects.create_user(
+            'turnos@vet.com', 'clave-segura-1', nombre='Turnos', rol='veterinario'
+        )
+        cliente = Cliente.objects.create(
+            nombre='Ana', apellido='Pérez', dni='30111222', telefono='387-4111222'
+        )
+        mascota = Mascota.objects.create(cliente=cliente, nombre='Toby', especie='perro', sexo='macho')
+        datos = {
+            'mascota': mascota.id, 'veterinario': vet.id, 'motivo': 'Control',
+            'fecha_hora': (timezone.now() + timedelta(days=1)).isoformat(), 'duracion_minutos': 30,
+        }
+        barrera = threading.Barrier(self.reservas)
+        respuestas = []
+
+        def reservar():
+            cliente_api = APIClient()
+            cliente_api.force_authenticate(vet)
+            try:
+                barrera.wait()
+                respuestas.append(cliente_api.post('/api/citas/', datos, format='json').status_code)
+            finally:
+                connection.close()
+
+        hilos = [threading.Thread(target=reservar) for _ in range(self.reservas)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(sorted(respuestas), [201] + [409] * (self.reservas - 1))
+        self.assertEqual(Cita.objects.filter(veterinario=vet).count(), 1)
+
+
+# =============================================
+# CONSULTAS POR LISTADO (N+1)
+# =============================================
+
+class ListadosConsultasTests(ConsultasConstantesMixin, DatosMixin, APITestCase):
+    """Cada fila tiene su propio cliente, mascota y veterinario"""
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.veterinario)
+        self.filas = 0
+
+    def nueva_mascota(self, cliente=None):
+        self.filas += 1
+        if cliente is None:
+            cliente = Cliente.objects.create(
+                nombre='Cliente', apellido=str(self.filas), dni=f'40{self.filas:06d}',
+                telefono=f'387-5{self.filas:06d}',
+            )
+        return Mascota.objects.create(
+            cliente=cliente, nombre=f'Mascota {self.filas}', especie='gato', sexo='hembra'
+        )
+
+    def nuevo_veterinario(self):
+        return Usuario.objects.create_user(
+            f'vet{self.filas}@vet.com', 'clave-segura-1', nombre=f'Vet {self.filas}', rol='veterinario'
+        )
+
+    def nueva_cita(self):
+        mascota = self.nueva_mascota()
+        return Cita.objects.create(
+            mascota=mascota, veterinario=self.nuevo_veterinario(),
+            fecha_hora=timezone.now() + timedelta(days=self.filas), motivo='Control',
+        )
+
+    def nueva_consulta(self):
+        cita = self.nueva_cita()
+        Consulta.objects.create(
+            cita=cita, mascota=cita.mascota, veterinario=cita.veterinario,
+            fecha_consulta=cita.fecha_hora, motivo_consulta='Control',
+        )
+
+    def nueva_vacuna(self):
+        Vacuna.objects.create(
+            mascota=self.nueva_mascota(), veterinario=self.nuevo_veterinario(),
+            nombre_vacuna='Antirrábica', fecha_aplicacion=date.today(),
+        )
+
+    def test_mascotas(self):
+        self.assertConsultasConstantes('/api/mascotas/', self.nueva_mascota)
+
+    def test_mascotas_de_un_cliente(self):
+        url = f'/api/clientes/{self.cliente.id}/mascotas/'
+        self.assertConsultasConstantes(url, lambda: self.nueva_mascota(self.cliente))
+
+    def test_citas(self):
+        self.assertConsultasConstantes('/api/citas/', self.nueva_cita)
+
+    def test_consultas(self):
+        self.assertConsultasConstantes('/api/consultas/', self.nueva_consulta)
+
+    def test_vacunas(self):
+        self.assertConsultasConstantes('/api/vacunas/', self.nueva_vacuna)
+
+
+# =============================================
+# AUTOCOMPLETADO
+# =============================================
+
+class AutocompletarTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        cache_autocompletar.limpiar()
+
+    def test_prefijo_minimo(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(autocompletar('clientes', 'p'), [])
+            self.assertEqual(autocompletar('mascotas', ' t  '), [])
+        opciones = autocompletar('clientes', 'pé')
+        self.assertEqual([opcion['id'] for opcion in opciones], [self.cliente.id])
+
+
+# =============================================
+# RECORDATORIOS
+# =============================================
+
+class SenderDePrueba(Sender):
+    """Anota cada envío; falla para los clientes de `fallar`"""
+
+    def __init__(self, fallar=()):
+        self.fallar = fallar
+        self.envios = []
+
+    def enviar(self, cliente, recordatorios):
+        estados = set(RecordatorioVacuna.objects.filter(cliente=cliente).values_list('estado', flat=True))
+        self.envios.append((cliente.id, len(recordatorios), len(connection.atomic_blocks), estados))
+        if cliente.id in self.fallar:
+            raise ConnectionError('sin servicio')
+
+
+class RecordatoriosTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        hoy = date.today()
+        for nombre in ('Antirrábica', 'Séxtuple'):
+            Vacuna.objects.create(
+                mascota=self.mascota, nombre_vacuna=nombre,
+                fecha_aplicacion=hoy - timedelta(days=300), proxima_dosis=hoy + timedelta(days=10),
+            )
+        generar_recordatorios(hoy, hoy + timedelta(days=30))
+
+    def test_sender_abstracto(self):
+        with self.assertRaises(TypeError):
+            Sender()
+
+    def test_envia_fuera_de_la_transaccion(self):
+        sender = SenderDePrueba()
+        abiertas = len(connection.atomic_blocks)
+        self.assertEqual(enviar_pendientes(sender), (1, 0))
+
+        # Un aviso con las dos dosis, ya reclamadas y sin transacción abierta
+        self.assertEqual(sender.envios, [(self.cliente.id, 2, abiertas, {'enviando'})])
+        self.assertEqual(
+            set(RecordatorioVacuna.objects.values_list('estado', flat=True)), {'enviado'}
+        )
+        self.assertEqual(enviar_pendientes(sender), (0, 0))
+
+    def test_error_y_reclamo_vencido(self):
+        self.assertEqual(enviar_pendientes(SenderDePrueba(fallar=[self.cliente.id])), (0, 1))
+        self.assertEqual(set(RecordatorioVacuna.objects.values_list('estado', flat=True)), {'error'})
+
+        # Un envío interrumpido hace rato se vuelve a reclamar; uno reciente no
+        RecordatorioVacuna.objects.update(estado='enviando', fecha_reclamo=timezone.now())
+        self.assertEqual(enviar_pendientes(SenderDePrueba()), (0, 0))
+        RecordatorioVacuna.objects.update(fecha_reclamo=timezone.now() - timedelta(hours=1))
+        self.assertEqual(enviar_pendientes(SenderDePrueba()), (1, 0))
+
+
+# =============================================
+# EXPORTACIÓN
+# =============================================
+
+class ExportacionTests(DatosMixin, APITestCase):
+
+    def setUp(self):
+        self.client.force_authenticate(self.veterinario)
+
+    def exportar(self):
+        """(filas, consultas) de /api/vacunas/export/ leyendo todo el stream"""
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get('/api/vacunas/export/')
+            lineas = b''.join(response.streaming_content).splitlines()
+        return len(lineas), len(contexto.captured_queries)
+
+    @mock.patch.object(VacunaViewSet, 'export_chunk_size', 2)
+    def test_una_consulta_por_lote(self):
+        for _ in range(2):
+            Vacuna.objects.create(mascota=self.mascota, nombre_vacuna='Antirrábica', fecha_aplicacion=date.today())
+        filas, consultas = self.exportar()
+        self.assertEqual(filas, 2)
+
+        for _ in range(4):
+            Vacuna.objects.create(mascota=self.mascota, nombre_vacuna='Antirrábica', fecha_aplicacion=date.today())
+        filas, consultas_6 = self.exportar()
+        self.assertEqual(filas, 6)
+        # Dos lotes más, una consulta cada uno
+        self.assertEqual(consultas_6 - consultas, 2)
+
+
+# =============================================
+# SIGNOS VITALES
+# =============================================
+
+class SeriesEspecieTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        cita = Cita.objects.create(
+            mascota=self.mascota, veterinario=self.veterinario,
+            fecha_hora=timezone.now(), motivo='Control',
+        )
+        for dia, peso in ((3, 10), (20, 12)):
+            Consulta.objects.create(
+                cita=cita, mascota=self.mascota, veterinario=self.veterinario, motivo_consulta='Control',
+                fecha_consulta=datetime(2026, 3, dia, 12, tzinfo=dt_timezone.utc), peso_actual=peso,
+            )
+
+    def test_periodos_por_mes(self):
+        serie = series_especie('perro', 'peso_actual', {})
+        self.assertEqual(serie['t'], [date(2026, 3, 1)])
+        self.assertEqual((serie['mean'], serie['n']), ([11.0], [2]))
+
+    def test_periodo_nulo_es_un_error(self):
+        def nulo(campo, tzinfo=None):
+            return Value(None, output_field=DateTimeField())
+
+        with mock.patch.dict('core.signos.INTERVALOS', {'mes': nulo}):
+            with self.assertRaises(ImproperlyConfigured):
+                series_especie('perro', 'peso_actual', {})
@@ -0,0 +1,119 @@
+"""
+Línea de tiempo clínica de una mascota: consultas, citas y vacunas
+intercaladas en un único listado, del más reciente al más antiguo
+"""
+
+import base64
+import heapq
+from datetime import datetime, time
+
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from .serializers import CitaSerializer, ConsultaSerializer, VacunaSerializer
+
+
+# =============================================
+# FUENTES
+# =============================================
+
+# (tipo, related_name en Mascota, campo de fecha, serializer).
+# El orden de la lista desempata registros con la misma fecha.
+FUENTES = [
+    ('consulta', 'consultas', 'fecha_consulta', ConsultaSerializer),
+    ('cita', 'citas', 'fecha_hora', CitaSerializer),
+    ('vacuna', 'vacunas', 'fecha_aplicacion', VacunaSerializer),
+]
+
+
+def _como_datetime(valor):
+    """Las fechas sin hora (vacunas) se ubican al comienzo del día local"""
+    if isinstance(valor, datetime):
+        return valor
+    return timezone.make_aware(datetime.combine(valor, time.min))
+
+
+# =============================================
+# CURSOR
+# =============================================
+
+def codificar_cursor(fecha, orden, pk):
+    texto = f'{fecha.isoformat()}|{orden}|{pk}'
+    return base64.urlsafe_b64encode(texto.encode()).decode()
+
+
+def decodificar_cursor(cursor):
+    try:
+        fecha, orden, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(fecha), int(orden), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise serializers.ValidationError({'cursor': 'Cursor inválido'})
+
+
+def _despues_del_cursor(campo, es_fecha, orden, cursor):
+    """
+    Condición para los registros de una fuente que van después del cursor en
+    el orden (fecha desc, fuente, id desc). Compara la columna directamente
+    para que la consulta sea un rango sobre el índice (mascota, fecha).
+    """
+    fecha, orden_cursor, pk = cursor
+
+    if es_fecha:
+        dia = timezone.localdate(fecha)
+        if _como_datetime(dia) != fecha:
+            # El cursor está dentro del día: todo ese día ya es anterior
+            return Q(**{f'{campo}__lte': dia})
+        fecha = dia
+
+    if orden > orden_cursor:
+        return Q(**{f'{campo}__lte': fecha})
+    if orden == orden_cursor:
+        return Q(**{f'{campo}__lt': fecha}) | Q(**{campo: fecha, 'id__lt': pk})
+    return Q(**{f'{campo}__lt': fecha})
+
+
+# =============================================
+# MERGE
+# =============================================
+
+def timeline_mascota(mascota, limite, cursor=None):
+    """
+    Devuelve (items, siguiente_cursor). Cada fuente aporta como mucho
+    limite + 1 registros en orden de índice y se intercalan con un k-way
+    merge, así nunca se carga el historial completo en memoria.
+    """
+    if cursor is not None:
+        cursor = decodificar_cursor(cursor)
+
+    fuentes = []
+    for orden, (tipo, relacion, campo, serializer_class) in enumerate(FUENTES):
+        queryset = getattr(mascota, relacion).select_related('veterinario')
+        if cursor is not None:
+            es_fecha = queryset.model._meta.get_field(campo).get_internal_type() == 'DateField'
+            queryset = queryset.filter(_despues_del_cursor(campo, es_fecha, orden, cursor))
+        registros = queryset.order_by(f'-{campo}', '-id')[:limite + 1]
+        # Clave de orden: (fecha, -fuente, id), todo descendente
+        fuentes.append([
+            ((_como_datetime(getattr(obj, campo)), -orden, obj.pk), tipo, obj, serializer_class)
+            for obj in registros
+        ])
+
+    pagina = []
+    siguiente = None
+    for entrada in heapq.merge(*fuentes, key=lambda entrada: entrada[0], reverse=True):
+        if len(pagina) == limite:
+            fecha, orden_negativo, pk = pagina[-1][0]
+            siguiente = codificar_cursor(fecha, -orden_negativo, pk)
+            break
+        pagina.append(entrada)
+
+    items = [
+        {
+            'tipo': tipo,
+            'fecha': timezone.localtime(clave[0]),
+            'datos': serializer_class(obj).data,
+        }
+        for clave, tipo, obj, serializer_class in pagina
+    ]
+    return items, siguiente
@@ -3,10 +3,11 @@ from .views import (
     login_view, logout_view, dashboard_view
 )
 from rest_framework.routers import DefaultRouter
+from rest_framework_simplejwt.views import TokenRefreshView
 from .views import (
     UsuarioViewSet, ClienteViewSet, MascotaViewSet,
     CitaViewSet, ConsultaViewSet, VacunaViewSet,
-    api_login, api_logout, api_me, usuario_listar, usuario_crear, usuario_editar,
+    api_login, api_logout, api_me, api_autocompletar, api_conexiones, usuario_listar, usuario_crear, usuario_editar,
     cliente_listar, cliente_crear, cliente_editar,
     mascota_listar, mascota_crear, mascota_editar, mascota_eliminar,
     cita_eliminar, cita_listar, cita_crear, cita_editar,
@@ -27,10 +28,13 @@ urlpatterns = [
     path('login/', login_view, name='login'),
     path('logout/', logout_view, name='logout'),
 
-    # API simple JWT login/logout/me
+    # API simple JWT login/logout/refresh/me
     path('api/login/', api_login, name='api_login'),
     path('api/logout/', api_logout, name='api_logout'),
+    path('api/token/refresh/', TokenRefreshView.as_view(), name='api_token_refresh'),
     path('api/me/', api_me, name='api_me'),
+    path('api/autocompletar/<str:tipo>/', api_autocompletar, name='api_autocompletar'),
+    path('api/sistema/conexiones/', api_conexiones, name='api_conexiones'),
 
     # API REST Framework
     path('api/', include(router.urls)),
@@ -48,7 +52,7 @@ urlpatterns = [
     # MASCOTAS
     path('mascotas/', mascota_listar, name='mascota_listar'),
     path('mascotas/crear/', mascota_crear, name='mascota_crear'),
-    path('mascotas/editar/<int:id>/', mascota_editar, name='mascota_editar'),
+    path('mascotas/editar/<int:mascota_id>/', mascota_editar, name='mascota_editar'),
 
     # --- CITAS ---
     path('citas/', cita_listar, name='cita_listar'),
@@ -0,0 +1,64 @@
+"""
+Estado de vacunación precalculado: última aplicación de cada tipo de
+vacuna por mascota, mantenido en forma incremental
+"""
+
+from django.db import connection, transaction
+
+from .models import Vacuna, EstadoVacunacion
+
+
+def tipo_vacuna(nombre):
+    """Clave del tipo de vacuna: 'Antirrábica ' y 'antirrábica' son la misma"""
+    return ' '.join(nombre.split()).lower()
+
+
+def recalcular_estado_vacunacion(mascota_ids):
+    """
+    Recalcula las filas de vacunacion_estado de las mascotas indicadas.
+    Lee sus vacunas en una consulta (índice por mascota) y escribe con un
+    upsert; borra los tipos que ya no tienen aplicaciones.
+    """
+    mascota_ids = {pk for pk in mascota_ids if pk is not None}
+    if not mascota_ids:
+        return
+
+    vacunas = Vacuna.objects.filter(mascota_id__in=mascota_ids).order_by(
+        'mascota_id', 'fecha_aplicacion', 'id'
+    ).values_list('id', 'mascota_id', 'nombre_vacuna', 'fecha_aplicacion', 'proxima_dosis')
+
+    # Como vienen en orden cronológico, la última que se ve de cada clave gana
+    ultimas = {}
+    for vacuna_id, mascota_id, nombre, aplicada, proxima in vacunas.iterator():
+        ultimas[(mascota_id, tipo_vacuna(nombre))] = (vacuna_id, aplicada, proxima)
+
+    filas = [
+        EstadoVacunacion(
+            mascota_id=mascota_id,
+            tipo_vacuna=tipo,
+            ultima_vacuna_id=vacuna_id,
+            fecha_aplicacion=aplicada,
+            proxima_dosis=proxima,
+        )
+        for (mascota_id, tipo), (vacuna_id, aplicada, proxima) in ultimas.items()
+    ]
+
+    with transaction.atomic():
+        existentes = EstadoVacunacion.objects.filter(
+            mascota_id__in=mascota_ids
+        ).values_list('id', 'mascota_id', 'tipo_vacuna')
+        obsoletas = [pk for pk, mascota_id, tipo in existentes if (mascota_id, tipo) not in ultimas]
+        if obsoletas:
+            EstadoVacunacion.objects.filter(id__in=obsoletas).delete()
+
+        # MySQL no acepta unique_fields: su ON DUPLICATE KEY UPDATE usa la
+        # restricción única (mascota, tipo_vacuna) por sí solo
+        conflicto = {}
+        if connection.features.supports_update_conflicts_with_target:
+            conflicto['unique_fields'] = ['mascota', 'tipo_vacuna']
+        EstadoVacunacion.objects.bulk_create(
+            filas,
+            update_conflicts=True,
+            update_fields=['ultima_vacuna', 'fecha_aplicacion', 'proxima_dosis', 'fecha_actualizacion'],
+            **conflicto
+        )
@@ -3,26 +3,51 @@ Views para Sistema Veterinaria
 Incluye autenticación, dashboard y API endpoints
 """
 
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Count, Q
+from django.db.models import F, Prefetch, Q
 from django.utils import timezone
+from django.utils.http import parse_etags
+import math
+from copy import copy
 from datetime import timedelta
 from .forms import CitaForm
 
-from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, permission_classes, action
+from rest_framework import viewsets, status, serializers
+from rest_framework.decorators import api_view, permission_classes, throttle_classes, action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.utils.urls import replace_query_param
 
-from .models import Usuario, Cliente, Mascota, Cita, Consulta, Vacuna
+from .models import Usuario, Cliente, Mascota, Cita, Consulta, Vacuna, EstadoVacunacion
 from .serializers import (
     UsuarioSerializer, ClienteSerializer, MascotaSerializer,
     CitaSerializer, ConsultaSerializer, VacunaSerializer
 )
+from .services import obtener_dashboard, etag_historial, obtener_historial
+from .cache_local import cache_compartida
+from .filters import rango_dia, filtro_rango, parsear_fecha, rango_desde_parametros
+from .timeline import timeline_mascota
+from .autenticacion import tokens_para_usuario
+from .lista_negra import RefreshTokenRotativo
+from .limites import LoginThrottle
+from .conexiones import metricas as metricas_conexiones
+from .fragmentos import anotar_versiones
+from .telefonos import TELEFONO_LARGO_MINIMO, candidatos_telefono
+from .autocompletar import (
+    TIPOS as TIPOS_AUTOCOMPLETAR, AUTOCOMPLETAR_LIMITE, AUTOCOMPLETAR_LIMITE_MAXIMO, autocompletar
+)
+from .signos import METRICAS, INTERVALOS, series_mascota, series_especie
+from .agenda import calcular_disponibilidad, agenda_bloqueada, verificar_turnos, TurnoOcupado
+from .mixins import (
+    RelacionesAutomaticasMixin, ExportacionMixin, OperacionesMasivasMixin, aplicar_relaciones
+)
+from .pagination import (
+    CitaCursorPagination, ConsultaCursorPagination, VacunaCursorPagination, VencidasCursorPagination,
+    paginar_keyset
+)
 
 
 # =============================================
@@ -37,6 +62,15 @@ def login_view(request):
         return redirect('dashboard')
     
     if request.method == 'POST':
+        # Límite de intentos, antes de calcular ningún hash
+        throttle = LoginThrottle()
+        if not throttle.allow_request(request, None):
+            espera = math.ceil(throttle.wait())
+            messages.error(request, f'Demasiados intentos de inicio de sesión. Intente nuevamente en {espera} segundos.')
+            response = render(request, 'registration/login.html', status=429)
+            response['Retry-After'] = str(espera)
+            return response
+
         email = request.POST.get('email')
         password = request.POST.get('password')
         
@@ -72,60 +106,15 @@ def logout_view(request):
 def dashboard_view(request):
     """Dashboard principal del sistema"""
     
-    # Obtener fecha actual
-    hoy = timezone.now().date()
-    
-    # Estadísticas generales
-    stats = {
-        'total_clientes': Cliente.objects.filter(estado=True).count(),
-        'total_mascotas': Mascota.objects.filter(estado='activo').count(),
-        'citas_hoy': Cita.objects.filter(
-            fecha_hora__date=hoy,
-            estado__in=['pendiente', 'confirmada']
-        ).count(),
-        'consultas_mes': Consulta.objects.filter(
-            fecha_consulta__month=hoy.month,
-            fecha_consulta__year=hoy.year
-        ).count(),
-    }
-    
-    # Citas de hoy
-    citas_hoy = Cita.objects.filter(
-        fecha_hora__date=hoy
-    ).select_related(
-        'mascota', 'mascota__cliente', 'veterinario'
-    ).order_by('fecha_hora')[:10]
-    
-    # Próximas citas
-    proximas_citas = Cita.objects.filter(
-        fecha_hora__gte=timezone.now(),
-        estado__in=['pendiente', 'confirmada']
-    ).select_related(
-        'mascota', 'mascota__cliente', 'veterinario'
-    ).order_by('fecha_hora')[:5]
-    
-    # Vacunas próximas a vencer (próximos 30 días)
-    fecha_limite = hoy + timedelta(days=30)
-    vacunas_proximas = Vacuna.objects.filter(
-        proxima_dosis__gte=hoy,
-        proxima_dosis__lte=fecha_limite
-    ).select_related(
-        'mascota', 'mascota__cliente'
-    ).order_by('proxima_dosis')[:5]
-    
-    # Distribución de mascotas por especie
-    mascotas_por_especie = Mascota.objects.filter(
-        estado='activo'
-    ).values('especie').annotate(
-        total=Count('id')
-    ).order_by('-total')
+    # Snapshot cacheado; se invalida por señales al cambiar los datos
+    snapshot = obtener_dashboard()
     
     context = {
-        'stats': stats,
-        'citas_hoy': citas_hoy,
-        'proximas_citas': proximas_citas,
-        'vacunas_proximas': vacunas_proximas,
-        'mascotas_por_especie': mascotas_por_especie,
+        'stats': snapshot['stats'],
+        'citas_hoy': snapshot['citas_hoy'],
+        'proximas_citas': snapshot['proximas_citas'],
+        'vacunas_proximas': snapshot['vacunas_proximas'],
+        'mascotas_por_especie': snapshot['mascotas_por_especie'],
         'usuario': request.user,
     }
     
@@ -138,6 +127,7 @@ def dashboard_view(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginThrottle])
 def api_login(request):
     """
     API endpoint para login con JWT
@@ -162,8 +152,8 @@ def api_login(request):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Generar tokens JWT
-        refresh = RefreshToken.for_user(user)
+        # Generar tokens JWT (con rol y estado como claims)
+        refresh = tokens_para_usuario(user)
         
         return Response({
             'refresh': str(refresh),
@@ -192,7 +182,7 @@ def api_logout(request):
     try:
         refresh_token = request.data.get('refresh')
         if refresh_token:
-            token = RefreshToken(refresh_token)
+            token = RefreshTokenRotativo(refresh_token)
             token.blacklist()
         return Response({'message': 'Logout exitoso'}, status=status.HTTP_200_OK)
     except Exception as e:
@@ -206,10 +196,44 @@ def api_me(request):
     API endpoint para obtener datos del usuario actual
     GET /api/me/
     """
-    serializer = UsuarioSerializer(request.user)
+    usuario = request.user
+    if getattr(usuario, 'desde_token', False):
+        # Armado desde los claims del token: faltan teléfono y fechas
+        usuario = Usuario.objects.get(pk=usuario.pk)
+    serializer = UsuarioSerializer(usuario)
     return Response(serializer.data)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_autocompletar(request, tipo):
+    """
+    Opciones para los selectores de los formularios
+    GET /api/autocompletar/<clientes|mascotas|veterinarios>/?q=texto&limite=10
+    """
+    if tipo not in TIPOS_AUTOCOMPLETAR:
+        return Response({'error': 'Tipo inválido'}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        limite = min(int(request.query_params.get('limite', AUTOCOMPLETAR_LIMITE)), AUTOCOMPLETAR_LIMITE_MAXIMO)
+    except ValueError:
+        return Response({'limite': 'Debe ser un número'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    opciones = autocompletar(tipo, request.query_params.get('q', ''), max(limite, 1))
+    return Response(opciones, headers={'Cache-Control': 'private, max-age=30'})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_conexiones(request):
+    """
+    Métricas de conexiones a la base del proceso que atiende la request
+    GET /api/sistema/conexiones/ (solo admin)
+    """
+    if request.user.rol != 'admin':
+        return Response({'error': 'Solo administradores'}, status=status.HTTP_403_FORBIDDEN)
+    return Response(metricas_conexiones.resumen())
+
+
 # =============================================
 # VIEWSETS PARA CRUD COMPLETO
 # =============================================
@@ -227,122 +251,407 @@ class UsuarioViewSet(viewsets.ModelViewSet):
         return Usuario.objects.filter(id=self.request.user.id)
 
 
-class ClienteViewSet(viewsets.ModelViewSet):
+class ClienteViewSet(RelacionesAutomaticasMixin, ExportacionMixin, viewsets.ModelViewSet):
     """ViewSet para gestión de clientes"""
     queryset = Cliente.objects.filter(estado=True)
     serializer_class = ClienteSerializer
     permission_classes = [IsAuthenticated]
-    search_fields = ['nombre', 'apellido', 'dni', 'telefono']
+    search_index = 'cliente'
     ordering_fields = ['apellido', 'nombre']
     
+    def get_queryset(self):
+        """Anotar el total de mascotas activas para evitar una consulta por fila"""
+        # Las consultas con GROUP BY no aplican Meta.ordering; se ordena explícitamente
+        return super().get_queryset().con_total_mascotas().order_by('apellido', 'nombre')
+    
     @action(detail=True, methods=['get'])
     def mascotas(self, request, pk=None):
         """Obtener todas las mascotas de un cliente"""
         cliente = self.get_object()
-        mascotas = cliente.mascotas.filter(estado='activo')
+        mascotas = aplicar_relaciones(cliente.mascotas.filter(estado='activo'), MascotaSerializer)
         serializer = MascotaSerializer(mascotas, many=True)
         return Response(serializer.data)
-
-
-class MascotaViewSet(viewsets.ModelViewSet):
+    
+    @action(detail=False, methods=['get'], url_path='por-telefono')
+    def por_telefono(self, request):
+        """
+        Identificar a quien llama: clientes con ese teléfono, sus mascotas
+        activas y las citas de hoy. Son tres consultas sin importar cuántos
+        clientes o mascotas coincidan.
+        GET /api/clientes/por-telefono/?telefono=+54 9 387 411-1222
+        """
+        candidatos = candidatos_telefono(request.query_params.get('telefono', ''))
+        if not candidatos:
+            return Response(
+                {'telefono': f'Ingrese al menos {TELEFONO_LARGO_MINIMO} dígitos'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        citas_hoy = Cita.objects.filter(
+            **filtro_rango('fecha_hora', *rango_dia(timezone.localdate()))
+        ).select_related('veterinario').order_by('fecha_hora')
+        clientes = list(
+            Cliente.objects.filter(estado=True, telefono_normalizado__in=candidatos)
+            .con_total_mascotas()
+            .order_by('apellido', 'nombre')
+            .prefetch_related(
+                Prefetch('mascotas', queryset=Mascota.objects.filter(estado='activo'), to_attr='activas'),
+                Prefetch('activas__citas', queryset=citas_hoy, to_attr='citas_hoy'),
+            )
+        )
+        
+        # Si el número coincide completo no se muestran las coincidencias parciales
+        if clientes:
+            mejor = max(len(cliente.telefono_normalizado) for cliente in clientes)
+            clientes = [cliente for cliente in clientes if len(cliente.telefono_normalizado) == mejor]
+        
+        datos = []
+        for cliente in clientes:
+            fila = ClienteSerializer(cliente).data
+            fila['mascotas'] = MascotaSerializer(cliente.activas, many=True).data
+            fila['citas_hoy'] = CitaSerializer(
+                [cita for mascota in cliente.activas for cita in mascota.citas_hoy], many=True
+            ).data
+            datos.append(fila)
+        return Response(datos)
+
+
+class MascotaViewSet(RelacionesAutomaticasMixin, viewsets.ModelViewSet):
     """ViewSet para gestión de mascotas"""
     queryset = Mascota.objects.filter(estado='activo')
     serializer_class = MascotaSerializer
     permission_classes = [IsAuthenticated]
-    search_fields = ['nombre', 'cliente__nombre', 'cliente__apellido']
+    search_index = 'mascota'
     filterset_fields = ['especie', 'sexo', 'cliente']
     
     @action(detail=True, methods=['get'])
     def historial(self, request, pk=None):
-        """Obtener historial médico completo de una mascota"""
+        """
+        Obtener historial médico completo de una mascota.
+        Se sirve desde la cache mientras no cambien sus datos; con
+        If-None-Match y el ETag vigente responde 304 sin armarlo.
+        El ETag solo se envía con una cache compartida: con una por proceso
+        la versión no se invalida en los demás workers.
+        """
+        # Aplica el queryset y los permisos también a las respuestas 304
+        mascota = self.get_object()
+        if not cache_compartida():
+            return Response(obtener_historial(mascota.id, lambda: mascota)[1])
+        
+        etag = etag_historial(mascota.id)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        
+        etag, datos = obtener_historial(mascota.id, lambda: mascota)
+        return Response(datos, headers={'ETag': etag})
+    
+    @action(detail=True, methods=['get'])
+    def timeline(self, request, pk=None):
+        """
+        Consultas, citas y vacunas de la mascota en un solo listado, de la más
+        reciente a la más antigua, paginado por cursor
+        GET /api/mascotas/{id}/timeline/?cursor=...&page_size=20
+        """
         mascota = self.get_object()
+        try:
+            limite = min(int(request.query_params.get('page_size', 20)), 100)
+        except ValueError:
+            limite = 20
+        limite = max(limite, 1)
         
-        # Consultas
-        consultas = mascota.consultas.all().order_by('-fecha_consulta')[:10]
-        consultas_data = ConsultaSerializer(consultas, many=True).data
+        items, siguiente = timeline_mascota(mascota, limite, request.query_params.get('cursor'))
+        next_url = None
+        if siguiente:
+            next_url = replace_query_param(request.build_absolute_uri(), 'cursor', siguiente)
+        return Response({'next': next_url, 'results': items})
+    
+    @action(detail=True, methods=['get'])
+    def signos(self, request, pk=None):
+        """
+        Series de signos vitales de la mascota, reducidas a ~puntos valores
+        GET /api/mascotas/{id}/signos/?metricas=peso_actual,temperatura&desde=&hasta=&puntos=200&metodo=lttb|buckets
+        """
+        mascota = self.get_object()
+        params = request.query_params
+        
+        metricas = [m for m in params.get('metricas', ','.join(METRICAS)).split(',') if m]
+        if not metricas or any(m not in METRICAS for m in metricas):
+            return Response(
+                {'error': f'Métricas válidas: {", ".join(METRICAS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        metodo = params.get('metodo', 'lttb')
+        if metodo not in ('lttb', 'buckets'):
+            return Response(
+                {'error': 'El método debe ser lttb o buckets'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            puntos = min(max(int(params.get('puntos', 200)), 3), 2000)
+        except ValueError:
+            puntos = 200
         
-        # Vacunas
-        vacunas = mascota.vacunas.all().order_by('-fecha_aplicacion')
-        vacunas_data = VacunaSerializer(vacunas, many=True).data
+        filtros = filtro_rango('fecha_consulta', *rango_desde_parametros(params))
+        return Response({
+            'mascota': mascota.id,
+            'metodo': metodo,
+            'series': series_mascota(mascota.id, metricas, filtros, puntos, metodo),
+        })
+    
+    @action(detail=False, methods=['get'], url_path='signos-especie')
+    def signos_especie(self, request):
+        """
+        Promedio, mínimo y máximo por período de una métrica para toda una especie
+        GET /api/mascotas/signos-especie/?especie=perro&metrica=peso_actual&intervalo=mes&desde=&hasta=
+        """
+        params = request.query_params
+        especie = params.get('especie')
+        metrica = params.get('metrica', 'peso_actual')
+        intervalo = params.get('intervalo', 'mes')
         
-        # Citas
-        citas = mascota.citas.all().order_by('-fecha_hora')[:5]
-        citas_data = CitaSerializer(citas, many=True).data
+        if especie not in dict(Mascota.ESPECIE_CHOICES):
+            return Response({'error': 'Especie inválida'}, status=status.HTTP_400_BAD_REQUEST)
+        if metrica not in METRICAS:
+            return Response(
+                {'error': f'Métricas válidas: {", ".join(METRICAS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if intervalo not in INTERVALOS:
+            return Response(
+                {'error': f'Intervalos válidos: {", ".join(INTERVALOS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
+        filtros = filtro_rango('fecha_consulta', *rango_desde_parametros(params))
         return Response({
-            'mascota': MascotaSerializer(mascota).data,
-            'consultas': consultas_data,
-            'vacunas': vacunas_data,
-            'citas': citas_data,
+            'especie': especie,
+            'metrica': metrica,
+            'intervalo': intervalo,
+            'serie': series_especie(especie, metrica, filtros, intervalo),
         })
 
 
-class CitaViewSet(viewsets.ModelViewSet):
+class CitaViewSet(RelacionesAutomaticasMixin, ExportacionMixin, OperacionesMasivasMixin,
+                  viewsets.ModelViewSet):
     """ViewSet para gestión de citas"""
     queryset = Cita.objects.all()
     serializer_class = CitaSerializer
     permission_classes = [IsAuthenticated]
     filterset_fields = ['estado', 'veterinario', 'mascota']
     ordering_fields = ['fecha_hora']
+    date_range_field = 'fecha_hora'
+    pagination_class = CitaCursorPagination
     
     def get_queryset(self):
         """Filtrar citas según rol del usuario"""
-        queryset = Cita.objects.all()
+        queryset = super().get_queryset()
         
         # Si es veterinario, solo sus citas
         if self.request.user.rol == 'veterinario':
             queryset = queryset.filter(veterinario=self.request.user)
         
-        # Filtrar por fecha si se proporciona
-        fecha = self.request.query_params.get('fecha', None)
-        if fecha:
-            queryset = queryset.filter(fecha_hora__date=fecha)
+        # El filtro por fecha (?fecha, ?semana, ?mes, ?desde/?hasta) lo aplica RangoFechasFilter
+        return queryset
+    
+    def _guardar_sin_superposicion(self, serializer):
+        """Guarda la cita con la agenda del veterinario bloqueada; 409 si se superpone"""
+        cita = copy(serializer.instance) if serializer.instance else Cita()
+        for attr, value in serializer.validated_data.items():
+            setattr(cita, attr, value)
         
-        return queryset.select_related('mascota', 'mascota__cliente', 'veterinario')
+        with agenda_bloqueada([cita.veterinario_id]):
+            verificar_turnos([cita])
+            serializer.save()
+    
+    def perform_create(self, serializer):
+        self._guardar_sin_superposicion(serializer)
+    
+    def perform_update(self, serializer):
+        self._guardar_sin_superposicion(serializer)
+    
+    def guardar_lote(self, model, objetos, campos=None):
+        """Las altas/modificaciones masivas también se validan contra la agenda"""
+        with agenda_bloqueada([cita.veterinario_id for cita in objetos]):
+            verificar_turnos(objetos)
+            return super().guardar_lote(model, objetos, campos)
     
     @action(detail=False, methods=['get'])
     def hoy(self, request):
         """Obtener citas de hoy"""
-        hoy = timezone.now().date()
-        citas = self.get_queryset().filter(fecha_hora__date=hoy)
+        desde, hasta = rango_dia(timezone.localdate())
+        citas = self.get_queryset().filter(**filtro_rango('fecha_hora', desde, hasta))
         serializer = self.get_serializer(citas, many=True)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    def disponibilidad(self, request):
+        """
+        Turnos libres por veterinario
+        GET /api/citas/disponibilidad/?desde=AAAA-MM-DD&hasta=AAAA-MM-DD&veterinario=ID&duracion=30
+        """
+        params = request.query_params
+        if not params.get('desde'):
+            return Response(
+                {'error': 'El parámetro desde es requerido'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        desde = parsear_fecha(params['desde'], 'desde')
+        hasta = parsear_fecha(params.get('hasta') or params['desde'], 'hasta')
+        # desde y hasta se incluyen: hasta - desde es un día menos que el rango
+        if hasta < desde or (hasta - desde).days >= 31:
+            return Response(
+                {'error': 'El rango debe ser de 1 a 31 días'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            duracion = int(params.get('duracion', 30))
+        except ValueError:
+            duracion = 0
+        if not 5 <= duracion <= 480:
+            return Response(
+                {'error': 'La duración debe ser de 5 a 480 minutos'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        veterinarios = Usuario.objects.filter(rol='veterinario', estado=True).only('id', 'nombre')
+        if params.get('veterinario'):
+            if not params['veterinario'].isdigit():
+                return Response(
+                    {'error': 'El parámetro veterinario debe ser un id'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            veterinarios = veterinarios.filter(id=params['veterinario'])
+        
+        disponibilidad = calcular_disponibilidad(
+            list(veterinarios), desde, hasta + timedelta(days=1), duracion
+        )
+        return Response(disponibilidad)
 
 
-class ConsultaViewSet(viewsets.ModelViewSet):
+class ConsultaViewSet(RelacionesAutomaticasMixin, ExportacionMixin, OperacionesMasivasMixin,
+                      viewsets.ModelViewSet):
     """ViewSet para gestión de consultas médicas"""
     queryset = Consulta.objects.all()
     serializer_class = ConsultaSerializer
     permission_classes = [IsAuthenticated]
     filterset_fields = ['mascota', 'veterinario']
     ordering_fields = ['fecha_consulta']
+    date_range_field = 'fecha_consulta'
+    pagination_class = ConsultaCursorPagination
     
     def perform_create(self, serializer):
         """Asignar veterinario automáticamente al crear consulta"""
         serializer.save(veterinario=self.request.user)
+    
+    def get_bulk_save_kwargs(self):
+        """Igual que perform_create: el veterinario es el usuario actual"""
+        return {'veterinario': self.request.user}
 
 
-class VacunaViewSet(viewsets.ModelViewSet):
+class VacunaViewSet(RelacionesAutomaticasMixin, ExportacionMixin, OperacionesMasivasMixin,
+                    viewsets.ModelViewSet):
     """ViewSet para gestión de vacunas"""
     queryset = Vacuna.objects.all()
     serializer_class = VacunaSerializer
     permission_classes = [IsAuthenticated]
     filterset_fields = ['mascota']
     ordering_fields = ['fecha_aplicacion']
+    date_range_field = 'fecha_aplicacion'
+    pagination_class = VacunaCursorPagination
+    
+    def perform_update(self, serializer):
+        self.preparar_actualizacion(serializer.instance, serializer.validated_data)
+        serializer.save()
+    
+    def preparar_actualizacion(self, vacuna, datos):
+        """Si cambia la mascota, también se recalcula el estado de vacunación de la anterior"""
+        vacuna._mascota_id_original = vacuna.mascota_id
     
     @action(detail=False, methods=['get'])
     def proximas(self, request):
         """Obtener vacunas próximas a vencer"""
-        hoy = timezone.now().date()
+        hoy = timezone.localdate()
         fecha_limite = hoy + timedelta(days=30)
         
         vacunas = self.get_queryset().filter(
-            proxima_dosis__gte=hoy,
-            proxima_dosis__lte=fecha_limite
-        ).select_related('mascota', 'mascota__cliente')
+            **filtro_rango('proxima_dosis', hoy, fecha_limite + timedelta(days=1), model=Vacuna)
+        )
         
         serializer = self.get_serializer(vacunas, many=True)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'], pagination_class=VencidasCursorPagination)
+    def vencidas(self, request):
+        """
+        Mascotas activas con la última dosis de algún tipo de vacuna vencida.
+        Se lee de la tabla precalculada vacunacion_estado. Acepta ?especie=.
+        Paginado por cursor, de la dosis vencida hace más tiempo a la más reciente.
+        """
+        estados = EstadoVacunacion.objects.vencidas().filter(mascota__estado='activo')
+        if request.query_params.get('especie'):
+            estados = estados.filter(mascota__especie=request.query_params['especie'])
+        
+        datos = estados.values(
+            'id', 'mascota', 'tipo_vacuna', 'ultima_vacuna', 'fecha_aplicacion', 'proxima_dosis',
+            mascota_nombre=F('mascota__nombre'),
+            especie=F('mascota__especie'),
+            cliente=F('mascota__cliente'),
+        )
+        return self.get_paginated_response(self.paginate_queryset(datos))
+    
+    @action(detail=False, methods=['get'])
+    def cobertura(self, request):
+        """Por especie: mascotas vacunadas y cuántas tienen alguna dosis vencida"""
+        datos = [
+            {
+                'especie': fila['mascota__especie'],
+                'mascotas': fila['mascotas'],
+                'mascotas_vencidas': fila['mascotas_vencidas'],
+                'mascotas_al_dia': fila['mascotas'] - fila['mascotas_vencidas'],
+            }
+            for fila in EstadoVacunacion.objects.cobertura_por_especie()
+        ]
+        return Response(datos)
+
+# --------------------------
+# LISTADOS HTML
+# --------------------------
+
+LISTADO_TAMANO_PAGINA = 25
+
+
+def _listado(request, template, queryset, ordenes, contexto=None, relaciones=()):
+    """
+    Renderiza una página de un listado con paginación keyset.
+    `ordenes` es {clave: (etiqueta, campos)}; la primera clave es la default
+    y los campos de cada orden deben terminar en 'id'. `relaciones` son los
+    objetos relacionados que muestra cada fila, para la clave de su cache.
+    """
+    orden = request.GET.get('orden')
+    if orden not in ordenes:
+        orden = next(iter(ordenes))
+    pagina = paginar_keyset(
+        queryset, ordenes[orden][1], request.GET.get('cursor'), LISTADO_TAMANO_PAGINA
+    )
+    anotar_versiones(pagina.objetos, *relaciones)
+
+    parametros = request.GET.copy()
+    parametros.pop('cursor', None)
+    return render(request, template, {
+        **(contexto or {}),
+        'pagina': pagina,
+        'orden': orden,
+        'ordenes': [(clave, etiqueta) for clave, (etiqueta, _) in ordenes.items()],
+        'filtros': request.GET,
+        'parametros': parametros.urlencode(),
+    })
+
+
+def _filtro_opcion(request, parametro, choices):
+    """Valor del parámetro si es una de las opciones válidas, si no None"""
+    valor = request.GET.get(parametro)
+    return valor if valor in dict(choices) else None
+
 
 # --------------------------
 # CRUD CLIENTES
@@ -350,8 +659,18 @@ class VacunaViewSet(viewsets.ModelViewSet):
 
 @login_required
 def cliente_listar(request):
-    clientes = Cliente.objects.filter(estado=True)
-    return render(request, 'clientes/listar.html', {'clientes': clientes})
+    clientes = Cliente.objects.only('id', 'nombre', 'apellido', 'dni', 'email', 'telefono')
+
+    estado = request.GET.get('estado', 'activos')
+    if estado == 'activos':
+        clientes = clientes.filter(estado=True)
+    elif estado == 'inactivos':
+        clientes = clientes.filter(estado=False)
+
+    return _listado(request, 'clientes/listar.html', clientes, {
+        'apellido': ('Apellido', ['apellido', 'nombre', 'id']),
+        'recientes': ('Más recientes', ['-id']),
+    })
 
 
 @login_required
@@ -403,17 +722,29 @@ def cliente_eliminar(request, pk):
 
 @login_required
 def usuario_listar(request):
-    usuarios = Usuario.objects.all()
-    return render(request, 'usuarios/listar.html', {'usuarios': usuarios})
+    usuarios = Usuario.objects.only('id', 'nombre', 'email', 'rol', 'telefono', 'estado')
+
+    rol = _filtro_opcion(request, 'rol', Usuario.ROL_CHOICES)
+    if rol:
+        usuarios = usuarios.filter(rol=rol)
+    estado = request.GET.get('estado')
+    if estado in ('activos', 'inactivos'):
+        usuarios = usuarios.filter(estado=estado == 'activos')
+
+    return _listado(request, 'usuarios/listar.html', usuarios, {
+        'nombre': ('Nombre', ['nombre', 'id']),
+        'recientes': ('Más recientes', ['-id']),
+    }, {'roles': Usuario.ROL_CHOICES})
 
 
 @login_required
 def usuario_crear(request):
     if request.method == "POST":
-        Usuario.objects.create(
-            nombre=request.POST['nombre'],
+        # create_user guarda la contraseña hasheada
+        Usuario.objects.create_user(
             email=request.POST['email'],
             password=request.POST['password'],
+            nombre=request.POST['nombre'],
             rol=request.POST['rol'],
             estado=True
         )
@@ -443,14 +774,25 @@ def usuario_editar(request, id):
 
 @login_required
 def mascota_listar(request):
-    mascotas = Mascota.objects.select_related("cliente").all()
-    return render(request, "mascotas/listar.html", {"mascotas": mascotas})
+    mascotas = Mascota.objects.select_related("cliente").only(
+        "id", "nombre", "especie", "estado", "cliente__nombre", "cliente__apellido"
+    )
+
+    especie = _filtro_opcion(request, "especie", Mascota.ESPECIE_CHOICES)
+    if especie:
+        mascotas = mascotas.filter(especie=especie)
+    estado = _filtro_opcion(request, "estado", Mascota.ESTADO_CHOICES)
+    if estado:
+        mascotas = mascotas.filter(estado=estado)
+
+    return _listado(request, "mascotas/listar.html", mascotas, {
+        "nombre": ("Nombre", ["nombre", "id"]),
+        "recientes": ("Más recientes", ["-id"]),
+    }, {"especies": Mascota.ESPECIE_CHOICES, "estados": Mascota.ESTADO_CHOICES}, relaciones=["cliente"])
 
 
 @login_required
 def mascota_crear(request):
-    clientes = Cliente.objects.all()
-
     if request.method == "POST":
         Mascota.objects.create(
             cliente_id=request.POST["cliente"],
@@ -469,13 +811,12 @@ def mascota_crear(request):
         messages.success(request, "Mascota creada correctamente")
         return redirect("mascota_listar")
 
-    return render(request, "mascotas/crear.html", {"clientes": clientes})
+    return render(request, "mascotas/crear.html")
 
 
 @login_required
 def mascota_editar(request, mascota_id):
-    mascota = get_object_or_404(Mascota, pk=mascota_id)
-    clientes = Cliente.objects.all()
+    mascota = get_object_or_404(Mascota.objects.select_related('cliente'), pk=mascota_id)
 
     if request.method == "POST":
         mascota.cliente_id = request.POST["cliente"]
@@ -496,7 +837,7 @@ def mascota_editar(request, mascota_id):
         messages.success(request, "Mascota actualizada correctamente")
         return redirect("mascota_listar")
 
-    return render(request, "mascotas/editar.html", {"mascota": mascota, "clientes": clientes})
+    return render(request, "mascotas/editar.html", {"mascota": mascota})
 
 
 @login_required
@@ -508,42 +849,72 @@ def mascota_eliminar(request, mascota_id):
 
 @login_required
 def cita_listar(request):
-    citas = Cita.objects.select_related('mascota', 'veterinario').all()
-    return render(request, 'citas/listar.html', {'citas': citas})
+    citas = Cita.objects.select_related('mascota__cliente', 'veterinario').only(
+        'id', 'fecha_hora', 'motivo', 'estado',
+        'mascota__nombre', 'mascota__cliente__nombre', 'mascota__cliente__apellido',
+        'veterinario__nombre',
+    )
 
-def cita_crear(request):
-    mascotas = Mascota.objects.filter(estado="activo").select_related("cliente")
-    veterinarios = Usuario.objects.filter(rol="veterinario")
+    try:
+        desde, hasta = rango_desde_parametros(request.GET)
+    except serializers.ValidationError as e:
+        messages.error(request, ' '.join(str(error) for errores in e.detail.values() for error in errores))
+    else:
+        citas = citas.filter(**filtro_rango('fecha_hora', desde, hasta))
+    veterinario = request.GET.get('veterinario', '')
+    if veterinario.isdigit():
+        citas = citas.filter(veterinario_id=veterinario)
+    estado = _filtro_opcion(request, 'estado', Cita.ESTADO_CHOICES)
+    if estado:
+        citas = citas.filter(estado=estado)
+
+    return _listado(request, 'citas/listar.html', citas, {
+        'recientes': ('Más recientes', ['-fecha_hora', '-id']),
+        'proximas': ('Más antiguas primero', ['fecha_hora', 'id']),
+    }, {
+        'estados': Cita.ESTADO_CHOICES,
+        'veterinarios': Usuario.objects.filter(rol='veterinario').only('id', 'nombre').order_by('nombre'),
+    }, relaciones=['mascota', 'mascota.cliente', 'veterinario'])
+
+# Mensajes de cita_crear para los campos que vienen de una lista
+MENSAJES_CITA = {
+    "mascota": "Seleccione una mascota de la lista.",
+    "veterinario": "Seleccione un veterinario de la lista.",
+    "fecha_hora": "La fecha y hora no son válidas.",
+}
 
+@login_required
+def cita_crear(request):
     if request.method == "POST":
-        mascota_id = request.POST.get("mascota")
-        veterinario_id = request.POST.get("veterinario")
-        fecha_hora = request.POST.get("fecha_hora")
-        motivo = request.POST.get("motivo")
-        observaciones = request.POST.get("observaciones")
-        duracion_minutos = request.POST.get("duracion_minutos") or 30
-
-        if not mascota_id or not veterinario_id or not fecha_hora or not motivo:
+        datos = request.POST.copy()
+        if not all(datos.get(campo) for campo in ("mascota", "veterinario", "fecha_hora", "motivo")):
             messages.error(request, "Todos los campos obligatorios deben completarse.")
             return redirect("cita_crear")
 
-        Cita.objects.create(
-            mascota_id=mascota_id,
-            veterinario_id=1,
-            fecha_hora=fecha_hora,
-            motivo=motivo,
-            estado=True,
-            observaciones=observaciones,
-            duracion_minutos=duracion_minutos,
-        )
+        datos["estado"] = "pendiente"
+        datos["duracion_minutos"] = datos.get("duracion_minutos") or 30
+        form = CitaForm(datos)
+        form.fields["mascota"].queryset = Mascota.objects.filter(estado="activo")
+        form.fields["veterinario"].queryset = Usuario.objects.filter(rol="veterinario")
+        if not form.is_valid():
+            for campo, errores in form.errors.items():
+                messages.error(request, MENSAJES_CITA.get(campo) or errores[0])
+            return redirect("cita_crear")
+        cita = form.instance
+
+        # Verificar superposición con la agenda del veterinario bloqueada
+        try:
+            with agenda_bloqueada([cita.veterinario_id]):
+                verificar_turnos([cita])
+                form.save()
+        except TurnoOcupado as e:
+            messages.error(request, e.mensaje)
+            return redirect("cita_crear")
 
         messages.success(request, "Cita creada correctamente.")
         return redirect("cita_listar")
 
-    return render(request, "citas/crear.html", {
-        "mascotas": mascotas,
-        "veterinarios": veterinarios,
-    })
+    return render(request, "citas/crear.html")
 
     return render(request, 'citas/crear.html', {'form': form})
 
@@ -554,9 +925,15 @@ def cita_editar(request, id):
     if request.method == "POST":
         form = CitaForm(request.POST, instance=cita)
         if form.is_valid():
-            form.save()
-            messages.success(request, "Cita actualizada correctamente")
-            return redirect('cita_listar')
+            try:
+                with agenda_bloqueada([cita.veterinario_id]):
+                    verificar_turnos([form.instance])
+                    form.save()
+            except TurnoOcupado as e:
+                form.add_error('fecha_hora', e.mensaje)
+            else:
+                messages.success(request, "Cita actualizada correctamente")
+                return redirect('cita_listar')
     else:
         form = CitaForm(instance=cita)
 
@@ -29,6 +29,7 @@ INSTALLED_APPS = [
     # Third party apps
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     
     # Local apps
@@ -52,31 +53,51 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.navegacion',
+            ],
+            # Las plantillas se compilan una vez por proceso. Con DEBUG el
+            # autoreloader limpia esta cache cuando cambia un archivo.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
             ],
         },
     },
 ]
 
+# Cache de fragmentos de plantillas (menú lateral y filas de listados), en segundos
+FRAGMENTOS_CACHE_TIMEOUT = config('FRAGMENTOS_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+
 WSGI_APPLICATION = 'veterinaria_project.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Conexiones persistentes: cada hilo reutiliza su conexión durante
+# DB_CONN_MAX_AGE segundos y la verifica antes de usarla en cada request.
+# Con DB_POOL_MAX > 0 se usa en cambio un pool acotado por proceso, para
+# despliegues con hilos o ASGI (ver core/conexiones.py).
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=60, cast=int)
+DB_POOL_MAX = config('DB_POOL_MAX', default=0, cast=int)
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        'ENGINE': 'core.backends.mysql' if DB_POOL_MAX else 'django.db.backends.mysql',
         'NAME': config('DB_NAME', default='veterinaria'),
         'USER': config('DB_USER', default='root'),
         'PASSWORD': config('DB_PASSWORD', default='root'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='3306'),
+        'CONN_MAX_AGE': 0 if DB_POOL_MAX else DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
         'OPTIONS': {
             'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
             'charset': 'utf8mb4',
@@ -84,6 +105,26 @@ DATABASES = {
     }
 }
 
+if DB_POOL_MAX:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'max_size': DB_POOL_MAX,
+        'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+        # Menor que el wait_timeout del servidor MySQL
+        'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=3600, cast=int),
+    }
+
+# Cache. Con varios workers conviene una cache compartida (Redis, Memcached):
+# con la LocMemCache de cada proceso las invalidaciones que hacen las señales
+# solo llegan al worker que guardó el dato (ver core/cache_local.py).
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='veterinaria'),
+    }
+}
+# Sin cache compartida, lo que invalidan las señales vence a los N segundos
+CACHE_LOCAL_TTL = config('CACHE_LOCAL_TTL', default=30, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -103,6 +144,24 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashers (ver core/hashers.py). El primero es el objetivo: al iniciar
+# sesión, las contraseñas guardadas con otro hasher o factor se rehashean.
+PASSWORD_HASHER_OBJETIVO = config('PASSWORD_HASHER_OBJETIVO', default='core.hashers.PBKDF2ConfigurablePasswordHasher')
+# Factores de trabajo; 0 = el valor por defecto de Django
+PASSWORD_PBKDF2_ITERACIONES = config('PASSWORD_PBKDF2_ITERACIONES', default=0, cast=int)
+PASSWORD_BCRYPT_RONDAS = config('PASSWORD_BCRYPT_RONDAS', default=0, cast=int)
+
+PASSWORD_HASHERS = list(dict.fromkeys([
+    PASSWORD_HASHER_OBJETIVO,
+    'core.hashers.PBKDF2ConfigurablePasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'core.hashers.BCryptSHA256ConfigurablePasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+    # Hashes $2y$ de PHP importados con DML.sql (requiere el paquete bcrypt)
+    'core.hashers.BCryptLegadoPasswordHasher',
+]))
+
 # Internationalization
 LANGUAGE_CODE = 'es-ar'
 TIME_ZONE = 'America/Argentina/Salta'
@@ -134,18 +193,26 @@ CORS_ALLOW_CREDENTIALS = True
 # REST Framework Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.autenticacion.UsuarioCacheadoJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_FILTER_BACKENDS': [
+        'core.filters.RangoFechasFilter',
+        'core.filters.CamposFilter',
+        'core.filters.BusquedaFilter',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
+    # Proxies delante de la app. Con 0 la IP del cliente es REMOTE_ADDR y
+    # X-Forwarded-For se ignora (lo puede mandar cualquiera)
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
 }
 
 # JWT Settings
@@ -169,8 +236,29 @@ SIMPLE_JWT = {
     
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+
+    # Refresh con la lista negra en memoria (ver core/lista_negra.py)
+    'TOKEN_REFRESH_SERIALIZER': 'core.autenticacion.RefreshRotativoSerializer',
 }
 
+# Cache del usuario autenticado por JWT (ver core/autenticacion.py)
+AUTH_USUARIO_CACHE_TTL = config('AUTH_USUARIO_CACHE_TTL', default=30, cast=int)
+# Alias de CACHES compartido entre procesos (p. ej. 'default' con Redis); vacío = solo local
+AUTH_USUARIO_CACHE_COMPARTIDA = config('AUTH_USUARIO_CACHE_COMPARTIDA', default='') or None
+# Armar el usuario desde los claims del token sin consultar la base
+JWT_USUARIO_DESDE_CLAIMS = config('JWT_USUARIO_DESDE_CLAIMS', default=False, cast=bool)
+
+# Cada cuántos segundos se leen los tokens bloqueados por otros procesos
+TOKENS_LISTA_NEGRA_SINCRONIZACION = config('TOKENS_LISTA_NEGRA_SINCRONIZACION', default=5, cast=int)
+
+# Límite de intentos de login (ver core/limites.py): ráfaga y recarga por minuto
+LOGIN_LIMITE_IP_RAFAGA = config('LOGIN_LIMITE_IP_RAFAGA', default=20, cast=int)
+LOGIN_LIMITE_IP_POR_MINUTO = config('LOGIN_LIMITE_IP_POR_MINUTO', default=10, cast=int)
+LOGIN_LIMITE_EMAIL_RAFAGA = config('LOGIN_LIMITE_EMAIL_RAFAGA', default=5, cast=int)
+LOGIN_LIMITE_EMAIL_POR_MINUTO = config('LOGIN_LIMITE_EMAIL_POR_MINUTO', default=2, cast=int)
+# Alias de CACHES para compartir los buckets entre procesos; vacío = solo local
+LOGIN_LIMITE_CACHE_COMPARTIDA = config('LOGIN_LIMITE_CACHE_COMPARTIDA', default='') or None
+
 
 AUTH_USER_MODEL = 'core.Usuario'
 